@@ -9,6 +9,18 @@
 ## Especificando el tamaño de la muestra:
 ## python3 02datavalidation.py --sample_size 100
 
+#Si la etapa 1 se ejecutó con --formato parquet, se usa el .parquet más reciente leyendo solo las
+#columnas necesarias. Para muestrear solo algunos géneros (el filtro se aplica al leer el Parquet):
+#python3 02datavalidation.py --generos desconocido femenino
+
+## Muestras por método de asignación (o por género y método a la vez):
+## python3 02datavalidation.py --estratos metodo_asignacion --sample_size 50
+## python3 02datavalidation.py --estratos ambos --sample_size 20
+
+## Selección activa: reparte un presupuesto total de filas a validar entre métodos de asignación
+## según sus tasas de error pasadas (métricas más recientes de 03ground_truth/):
+## python3 02datavalidation.py --seleccion activa --presupuesto 300
+
 #Especificando el directorio de entrada y el archivo de salida (si es necesario):
 #python generar_muestras_validacion.py --input_dir mi_otra_carpeta_out --sample_size 200 --output_file data_validation/mis_muestras_custom.csv
 
@@ -16,18 +28,28 @@
 #¿Qué hace el script?
 
 #Encuentra el archivo de resultados más reciente: Busca en la carpeta data_out (o la que especifiques) el último archivo que termine en _resultados_completos.csv (este es el nombre que sugerí para el archivo principal en el script anterior).
-#Lee el archivo: Carga los datos de ese CSV.
-#Identifica Géneros: Encuentra todas las categorías únicas en la columna GENERO (deberían ser 'masculino', 'femenino', 'desconocido').
-#Toma Muestras: Para cada categoría de género:
-#Filtra los registros correspondientes a ese género.
-#Si hay suficientes registros, toma una muestra aleatoria del tamaño especificado (sample_size).
-#Si hay menos registros que sample_size, toma todos los registros disponibles para ese género.
-#Usa random_state=42 para que si ejecutas el script múltiples veces con los mismos datos de entrada, obtengas la misma muestra (esto es bueno para la reproducibilidad).
-#Combina las Muestras: Une todas las muestras en un solo DataFrame.
+#Lee el archivo por lotes: Recorre el CSV (o Parquet) una sola vez, por bloques de --chunk_size filas, sin cargarlo entero en memoria.
+#Si el CSV tiene índice de filas (<fecha>_resultados_completos.indice.npz, lo genera la etapa 1), no lo recorre: elige las filas de la
+#muestra con los conteos por metodo_asignacion/GENERO del índice y lee solo esas líneas (la muestra es la misma que recorriéndolo).
+#Define los estratos: Por GENERO (por defecto), por metodo_asignacion o por ambos (--estratos GENERO|metodo_asignacion|ambos).
+#Toma Muestras: Muestreo de reservorio por estrato:
+#A cada registro se le asigna una clave aleatoria y en cada estrato se conservan los sample_size registros de clave más pequeña.
+#Si hay menos registros que sample_size en un estrato, toma todos los registros disponibles de ese estrato.
+#Usa --semilla (42 por defecto) para que si ejecutas el script múltiples veces con los mismos datos de entrada, obtengas la misma muestra (esto es bueno para la reproducibilidad).
+#Combina las Muestras: Une todas las muestras en un solo DataFrame, ordenado por estrato.
 #Prepara para Validación:
 #Añade una nueva columna llamada GENERO_VALIDADO, que estará vacía.
 #Selecciona las columnas más relevantes para la validación: nombre_original, GENERO (el inferido por tu script), metodo_asignacion, y GENERO_VALIDADO.
 #Guarda el Archivo de Salida: Guarda este DataFrame en un nuevo archivo CSV (por defecto, en la carpeta data_validation con un nombre que incluye la fecha y hora).
+
+#Selección activa (--seleccion activa): en lugar de sample_size filas por estrato, reparte --presupuesto filas entre
+#los metodo_asignacion con asignación de Neyman (n_h proporcional a N_h * S_h). S_h = raíz(p_h (1 - p_h)), donde p_h es la
+#tasa de error de la regla en el archivo de métricas más reciente de 03ground_truth (suavizada; sin historial, la global).
+#Así casi no se gastan filas en reglas que casi siempre aciertan (dic_completo) y la accuracy estimada es la más precisa
+#posible por fila validada. Dentro de cada método se toma como mucho una fila por primer nombre (se muestrean primeros
+#nombres por muestreo de prioridad, según cuántas filas tiene cada uno, y una fila al azar de cada nombre), para no validar
+#"maria xxx" 200 veces.
+#La columna 'peso' (inversa de la probabilidad de inclusión) permite a 03ground_truth.py reponderar a estimaciones de toda la población.
 #-------------------------------------------------------------
 
 #Siguiente Paso: Validación Manual
@@ -41,95 +63,303 @@
 
 
 
+import numpy as np
 import pandas as pd
 import os
 import argparse
 from datetime import datetime
+from inferir_genero.columnar import columnas_resultados, extensiones_resultados, iterar_resultados
+from inferir_genero.indice_filas import IndiceFilas, leer_ultimo_resultado
+from inferir_genero.metricas import asignacion_neyman, leer_seccion_metricas
+from inferir_genero.normalizacion import normalizar_lista
+
+# Definiciones de estrato disponibles para --estratos
+estratos_disponibles = {
+    'GENERO': ['GENERO'],
+    'metodo_asignacion': ['metodo_asignacion'],
+    'ambos': ['GENERO', 'metodo_asignacion'],
+}
+
+# Columnas de resultados que se usan para las muestras (proyección al leer)
+columnas_lectura = ['nombre_original', 'GENERO', 'metodo_asignacion']
+
+# Selección activa: filas mínimas por método (para poder estimar su varianza) y sección de métricas con el historial
+MINIMO_POR_ESTRATO_ACTIVO = 2
+seccion_metricas_por_metodo = 'Metricas por metodo_asignacion:'
 
 def encontrar_archivo_resultados_mas_reciente(directorio_data_out):
     """
     Encuentra el archivo de resultados más reciente en la carpeta data_out
-    basado en el prefijo de fecha y el sufijo '_resultados_completos.csv'.
+    basado en el prefijo de fecha y el sufijo '_resultados_completos.csv' o '.parquet'.
+    Si una misma ejecución generó ambos formatos, se prefiere el Parquet.
+    Si la etapa 1 dejó anotada su última ejecución (ultimo_resultado.json), se usa esa
+    anotación sin listar la carpeta, prefiriendo el CSV con índice de filas.
     """
     archivos_candidatos = []
     if not os.path.exists(directorio_data_out):
         print(f"❌ Error: El directorio '{directorio_data_out}' no existe.")
         return None
 
+    ultimo_resultado = leer_ultimo_resultado(directorio_data_out)
+    if ultimo_resultado:
+        return ultimo_resultado
+
     for nombre_archivo in os.listdir(directorio_data_out):
-        if nombre_archivo.endswith('_resultados_completos.csv'): # Asegúrate que coincide con el nombre del archivo principal
-            archivos_candidatos.append(nombre_archivo)
+        for prioridad, extension in enumerate(extensiones_resultados):
+            if nombre_archivo.endswith('_resultados_completos' + extension): # Asegúrate que coincide con el nombre del archivo principal
+                archivos_candidatos.append((nombre_archivo[:-len(extension)], -prioridad, nombre_archivo))
 
     if not archivos_candidatos:
-        print(f"❌ Error: No se encontraron archivos '*_resultados_completos.csv' en '{directorio_data_out}'.")
+        print(f"❌ Error: No se encontraron archivos '*_resultados_completos.csv' ni '.parquet' en '{directorio_data_out}'.")
         return None
 
     # Ordenar para obtener el más reciente (asumiendo formato YYYYMMDDHHMMSS al inicio)
     archivos_candidatos.sort(reverse=True)
-    return os.path.join(directorio_data_out, archivos_candidatos[0])
+    return os.path.join(directorio_data_out, archivos_candidatos[0][2])
+
+def muestrear_por_estratos(lotes, columnas_estrato, tamano_por_estrato, semilla=42):
+    """
+    Muestreo estratificado de reservorio en una sola pasada y memoria constante.
+
+    A cada fila se le asigna una clave aleatoria uniforme y en cada estrato se conservan
+    las tamano_por_estrato filas de clave más pequeña: es una muestra aleatoria simple sin
+    reemplazo de cada estrato. Las claves salen de un generador con semilla en el orden de
+    lectura, de modo que la muestra no depende del tamaño de los lotes ni del formato.
+    Devuelve (muestras, tamaños de cada estrato en el archivo).
+    """
+    generador = np.random.default_rng(semilla)
+    reservorio = None
+    tamanos_estratos = None
+    for lote in lotes:
+        lote = lote.astype({col: object for col in columnas_estrato}) # Categóricas de distintos lotes no se concatenan bien
+        lote = lote.assign(_clave=generador.random(len(lote)))
+        conteo = lote.groupby(columnas_estrato, sort=False, dropna=False).size()
+        tamanos_estratos = conteo if tamanos_estratos is None else tamanos_estratos.add(conteo, fill_value=0)
+        combinado = lote if reservorio is None else pd.concat([reservorio, lote], ignore_index=True)
+        reservorio = (combinado.sort_values('_clave', kind='stable')
+                               .groupby(columnas_estrato, sort=False, dropna=False)
+                               .head(tamano_por_estrato))
+
+    if reservorio is None:
+        return pd.DataFrame(), pd.Series(dtype='int64')
+    muestras = reservorio.sort_values(columnas_estrato + ['_clave']).drop(columns='_clave')
+    return muestras, tamanos_estratos.astype('int64').sort_index()
+
+def muestrear_con_indice(indice, columnas, columnas_estrato, tamano_por_estrato, generos=None, semilla=42):
+    """
+    Misma muestra que muestrear_por_estratos sobre el archivo completo, pero usando el
+    índice de filas: las claves se generan por grupo en el orden del archivo (los grupos
+    son rangos contiguos), se eligen las filas de clave más pequeña de cada estrato y solo
+    esas filas se leen con seek. Devuelve (muestras, tamaños de cada estrato en el archivo).
+    """
+    generador = np.random.default_rng(semilla)
+    grupos = indice.grupos
+    if generos:
+        grupos = grupos[grupos['GENERO'].isin(generos)]
+    if grupos.empty:
+        return pd.DataFrame(), pd.Series(dtype='int64')
+
+    elegidas = {} # estrato -> (claves, filas) de las tamano_por_estrato claves más pequeñas
+    for grupo in grupos.itertuples(index=False):
+        claves = generador.random(grupo.filas)
+        filas = np.arange(grupo.primera_fila, grupo.primera_fila + grupo.filas)
+        estrato = tuple(getattr(grupo, col) for col in columnas_estrato)
+        if estrato in elegidas:
+            claves = np.concatenate([elegidas[estrato][0], claves])
+            filas = np.concatenate([elegidas[estrato][1], filas])
+        if len(claves) > tamano_por_estrato:
+            menores = np.argpartition(claves, tamano_por_estrato - 1)[:tamano_por_estrato]
+            claves, filas = claves[menores], filas[menores]
+        elegidas[estrato] = (claves, filas)
+
+    claves = np.concatenate([c for c, _ in elegidas.values()])
+    filas = np.concatenate([f for _, f in elegidas.values()])
+    orden = np.argsort(filas)
+    muestras = indice.leer_filas(filas[orden], columnas).assign(_clave=claves[orden])
+    muestras = muestras.astype({col: object for col in columnas_estrato})
+    muestras = muestras.sort_values(columnas_estrato + ['_clave']).drop(columns='_clave')
+    tamanos_estratos = grupos.groupby(columnas_estrato)['filas'].sum()
+    return muestras, tamanos_estratos.astype('int64').sort_index()
+
+def encontrar_archivo_metricas_mas_reciente(directorio_metricas):
+    """Último '*_ground_truth_metrics.csv' de la carpeta de métricas, o None si no hay."""
+    if not os.path.isdir(directorio_metricas):
+        return None
+    archivos = sorted(a for a in os.listdir(directorio_metricas) if a.endswith('_ground_truth_metrics.csv'))
+    return os.path.join(directorio_metricas, archivos[-1]) if archivos else None
 
-def generar_muestras_para_validacion(archivo_entrada, tamano_muestra_por_genero, archivo_salida):
+def tasas_error_previas(archivo_metricas):
+    """
+    Tasa de error por metodo_asignacion según un archivo de métricas de 03ground_truth,
+    suavizada ((errores + 1) / (registros + 2)) para que una regla con pocas validaciones
+    y ningún error no quede con varianza cero. Devuelve (dict metodo -> tasa, tasa global).
+    """
+    df = leer_seccion_metricas(archivo_metricas, seccion_metricas_por_metodo) if archivo_metricas else None
+    if df is None or df.empty:
+        return {}, 0.5
+    errores = df['registros'] - df['aciertos']
+    tasas = (errores + 1) / (df['registros'] + 2)
+    return dict(zip(df['metodo_asignacion'].astype(str), tasas)), float((errores.sum() + 1) / (df['registros'].sum() + 2))
+
+def _primer_token(nombres):
+    return [n.split(' ', 1)[0] for n in normalizar_lista(nombres)]
+
+def _claves_token(tokens, semilla):
+    """Clave uniforme en [0, 1) por token, fija para cada token y semilla (hash, no orden de lectura)."""
+    hashes = pd.util.hash_array(np.asarray(tokens, dtype=object), hash_key=f'{semilla:016d}'[-16:])
+    return (hashes >> np.uint64(11)).astype(np.float64) / 2.0**53
+
+def muestrear_activo(lotes, presupuesto, tasas_error, tasa_global, semilla=42):
     """
-    Lee el archivo de resultados, toma muestras aleatorias por género y
-    guarda un nuevo archivo para validación manual.
+    Selección activa en una sola pasada: reparte 'presupuesto' filas entre los
+    metodo_asignacion con asignación de Neyman y toma como mucho una fila por primer nombre
+    en cada método.
+
+    Por cada (método, primer nombre) se conserva una fila al azar (la de menor clave
+    aleatoria) y su número de filas M_t; al final, en cada método se eligen n_h nombres por
+    muestreo de prioridad (prioridad M_t / u_t, con u_t uniforme fija por nombre). Con
+    umbral tau_h (la prioridad n_h+1), el peso max(M_t, tau_h) de cada fila elegida da
+    estimaciones insesgadas de totales y es casi constante salvo para los nombres muy
+    frecuentes, que entran con seguridad. Los pesos se calibran para que los de cada método
+    sumen exactamente sus filas N_h. La memoria crece con los nombres distintos por método,
+    no con las filas del archivo.
+    Devuelve (muestras con 'peso', tabla de asignación por método).
     """
+    generador = np.random.default_rng(semilla)
+    columnas_clave = ['metodo_asignacion', '_token']
+    candidatos = None
+    conteos = None
+    for lote in lotes:
+        lote = lote.astype({'metodo_asignacion': object})
+        lote = lote.assign(_token=_primer_token(lote['nombre_original'].to_numpy(dtype=object)),
+                           _clave=generador.random(len(lote)))
+        conteo = lote.groupby(columnas_clave, sort=False, dropna=False).size()
+        conteos = conteo if conteos is None else conteos.add(conteo, fill_value=0)
+        combinado = lote if candidatos is None else pd.concat([candidatos, lote], ignore_index=True)
+        candidatos = combinado.sort_values('_clave', kind='stable').drop_duplicates(columnas_clave)
+
+    if candidatos is None:
+        return pd.DataFrame(), pd.DataFrame()
+    conteos = conteos.astype('int64')
+    por_metodo = conteos.groupby(level='metodo_asignacion', dropna=False)
+    asignacion = pd.DataFrame({'registros': por_metodo.sum(), 'nombres_distintos': por_metodo.size()})
+    asignacion['tasa_error_previa'] = [tasas_error.get(str(m), tasa_global) for m in asignacion.index]
+    desviaciones = np.sqrt(asignacion['tasa_error_previa'] * (1 - asignacion['tasa_error_previa']))
+    asignacion['muestra'] = asignacion_neyman(asignacion['registros'], desviaciones, presupuesto,
+                                              maximos=asignacion['nombres_distintos'], minimo=MINIMO_POR_ESTRATO_ACTIVO)
+
+    filas_token = conteos.reindex(pd.MultiIndex.from_frame(candidatos[columnas_clave])).to_numpy()
+    candidatos = candidatos.assign(_filas=filas_token, _prioridad=filas_token / _claves_token(candidatos['_token'], semilla))
+    candidatos = candidatos.sort_values('_prioridad', ascending=False, kind='stable')
+    posicion = candidatos.groupby('metodo_asignacion', sort=False, dropna=False).cumcount().to_numpy()
+    muestra_h = candidatos['metodo_asignacion'].map(asignacion['muestra']).to_numpy()
+    # Umbral de cada método: la prioridad del primer nombre que queda fuera (0 si entran todos)
+    umbrales = candidatos.loc[posicion == muestra_h].set_index('metodo_asignacion')['_prioridad']
+    muestras = candidatos[posicion < muestra_h]
+    tau = muestras['metodo_asignacion'].map(umbrales).fillna(0).to_numpy()
+    peso = np.maximum(muestras['_filas'].to_numpy(), tau)
+    registros_h = muestras['metodo_asignacion'].map(asignacion['registros']).to_numpy()
+    calibracion = registros_h / pd.Series(peso).groupby(muestras['metodo_asignacion'].to_numpy()).transform('sum').to_numpy()
+    muestras = muestras.assign(peso=peso * calibracion)
+    muestras = muestras.sort_values(['metodo_asignacion', '_prioridad'], ascending=[True, False])
+    return muestras.drop(columns=['_token', '_clave', '_filas', '_prioridad']), asignacion
+
+def generar_muestras_para_validacion(archivo_entrada, tamano_muestra_por_estrato, archivo_salida, generos=None,
+                                     columnas_estrato=('GENERO',), semilla=42, tamano_lote=100_000,
+                                     seleccion='aleatoria', archivo_metricas=None):
+    """
+    Recorre el archivo de resultados por lotes, toma muestras aleatorias por estrato
+    (GENERO, metodo_asignacion o ambos) y guarda un nuevo archivo para validación manual.
+    Con generos, solo se leen y muestrean esos géneros.
+    Con seleccion='activa', tamano_muestra_por_estrato es el presupuesto total, repartido
+    entre métodos según las tasas de error de archivo_metricas (ver muestrear_activo).
+    """
+    columnas_estrato = ['metodo_asignacion'] if seleccion == 'activa' else list(columnas_estrato)
     try:
-        df = pd.read_csv(archivo_entrada)
-        print(f"✅ Archivo de entrada '{archivo_entrada}' leído correctamente. Columnas: {df.columns.tolist()}")
+        columnas_archivo = columnas_resultados(archivo_entrada)
     except FileNotFoundError:
         print(f"❌ Error: No se pudo encontrar el archivo de entrada '{archivo_entrada}'.")
         return
     except Exception as e:
-        print(f"❌ Error al leer el archivo CSV '{archivo_entrada}': {e}")
+        print(f"❌ Error al leer el archivo de resultados '{archivo_entrada}': {e}")
         return
 
-    if 'GENERO' not in df.columns or 'nombre_original' not in df.columns:
-        print("❌ Error: El archivo de entrada debe contener las columnas 'GENERO' y 'nombre_original'.")
-        return
+    for col in ['GENERO', 'nombre_original'] + columnas_estrato:
+        if col not in columnas_archivo:
+            print(f"❌ Error: El archivo de entrada debe contener la columna '{col}'.")
+            return
+    print(f"✅ Archivo de entrada '{archivo_entrada}' encontrado. Columnas: {columnas_archivo}")
 
-    generos_unicos = df['GENERO'].unique()
-    print(f"ℹ️ Géneros encontrados en el archivo: {generos_unicos}")
-
-    lista_muestras = []
-
-    for genero in generos_unicos:
-        df_genero = df[df['GENERO'] == genero]
-        n_registros_genero = len(df_genero)
+    if tamano_muestra_por_estrato <= 0:
+        print("❌ El tamaño de muestra debe ser mayor que 0.")
+        return
 
-        if n_registros_genero == 0:
-            print(f"ℹ️ No hay registros para el género '{genero}'. Se omitirá.")
-            continue
+    columnas = [col for col in columnas_lectura if col in columnas_archivo]
+    if seleccion == 'activa':
+        tasas_error, tasa_global = tasas_error_previas(archivo_metricas)
+        if tasas_error:
+            print(f"ℹ️ Tasas de error previas de {len(tasas_error)} métodos leídas de '{archivo_metricas}'.")
+        else:
+            print("⚠️ Advertencia: No hay métricas por metodo_asignacion previas; el presupuesto se reparte según el tamaño de cada método.")
 
-        # Ajustar el tamaño de la muestra si hay menos registros que el solicitado
-        tamano_real_muestra = min(tamano_muestra_por_genero, n_registros_genero)
+    indice = None
+    if seleccion == 'aleatoria' and archivo_entrada.endswith('.csv'):
+        try:
+            indice = IndiceFilas.abrir(archivo_entrada)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Advertencia: {e} Se recorrerá el archivo completo.")
 
-        if tamano_real_muestra > 0 :
-            muestra = df_genero.sample(n=tamano_real_muestra, random_state=42) # random_state para reproducibilidad
-            lista_muestras.append(muestra)
-            print(f"ℹ️ Muestra tomada para '{genero}': {len(muestra)} registros.")
+    try:
+        lotes = None
+        if indice is None:
+            lotes = iterar_resultados(archivo_entrada, columnas=columnas, filtros={'GENERO': generos} if generos else None,
+                                      filas_por_lote=tamano_lote)
+        if indice is not None:
+            df_muestras_combinadas, tamanos_estratos = muestrear_con_indice(
+                indice, columnas, columnas_estrato, tamano_muestra_por_estrato, generos=generos, semilla=semilla
+            )
+        elif seleccion == 'activa':
+            df_muestras_combinadas, asignacion = muestrear_activo(lotes, tamano_muestra_por_estrato, tasas_error,
+                                                                  tasa_global, semilla=semilla)
         else:
-            print(f"ℹ️ No se tomaron muestras para '{genero}' (0 registros disponibles o tamaño de muestra 0).")
-
+            df_muestras_combinadas, tamanos_estratos = muestrear_por_estratos(
+                lotes, columnas_estrato, tamano_muestra_por_estrato, semilla=semilla
+            )
+    except Exception as e:
+        print(f"❌ Error al leer el archivo de resultados '{archivo_entrada}': {e}")
+        return
 
-    if not lista_muestras:
+    if df_muestras_combinadas.empty:
         print("❌ No se pudo generar ninguna muestra. Verifique los datos de entrada.")
         return
 
-    df_muestras_combinadas = pd.concat(lista_muestras)
+    if seleccion == 'activa':
+        print(f"ℹ️ {int(asignacion['registros'].sum())} registros leídos en una pasada, {len(asignacion)} métodos de asignación.")
+        print("ℹ️ Asignación de Neyman del presupuesto (una fila como mucho por primer nombre en cada método):")
+        print(asignacion.sort_values('muestra', ascending=False).to_string())
+    else:
+        if indice is not None:
+            print(f"ℹ️ Índice de filas: {int(tamanos_estratos.sum())} registros en {len(tamanos_estratos)} estratos por {' + '.join(columnas_estrato)}; "
+                  f"solo se leyeron las {len(df_muestras_combinadas)} filas de la muestra.")
+        else:
+            print(f"ℹ️ {int(tamanos_estratos.sum())} registros leídos en una pasada, {len(tamanos_estratos)} estratos por {' + '.join(columnas_estrato)}.")
+        tomadas = df_muestras_combinadas.groupby(columnas_estrato, sort=False).size()
+        for estrato, n_registros in tamanos_estratos.items():
+            print(f"ℹ️ Muestra tomada para {estrato!r}: {tomadas.get(estrato, 0)} de {n_registros} registros.")
 
     # Añadir columna para la validación manual
     df_muestras_combinadas['GENERO_VALIDADO'] = '' # Inicialmente vacía
 
     # Seleccionar y reordenar columnas para el archivo de salida
-    columnas_salida = ['nombre_original', 'GENERO', 'metodo_asignacion', 'GENERO_VALIDADO']
+    columnas_salida = ['nombre_original', 'GENERO', 'metodo_asignacion', 'GENERO_VALIDADO', 'peso']
     # Asegurarse de que todas las columnas de salida existan en df_muestras_combinadas
     columnas_existentes_para_salida = [col for col in columnas_salida if col in df_muestras_combinadas.columns]
-    
+
     # Si falta 'metodo_asignacion' (por ejemplo, si el archivo de entrada no lo tiene), lo omitimos de la salida
-    if 'metodo_asignacion' not in df_muestras_combinadas.columns and 'metodo_asignacion' in columnas_salida:
+    if 'metodo_asignacion' not in df_muestras_combinadas.columns:
         print("⚠️ Advertencia: La columna 'metodo_asignacion' no se encontró en los datos. Se omitirá de la salida de validación.")
-        columnas_existentes_para_salida.remove('metodo_asignacion')
-
 
     df_final_muestras = df_muestras_combinadas[columnas_existentes_para_salida]
 
@@ -152,7 +382,25 @@ if __name__ == "__main__":
         "--sample_size",
         type=int,
         default=500,
-        help="Número de registros a muestrear por cada categoría de género (por defecto: 500)."
+        help="Número de registros a muestrear por cada estrato (por defecto: 500)."
+    )
+    parser.add_argument(
+        "--estratos",
+        choices=list(estratos_disponibles),
+        default="GENERO",
+        help="Definición de los estratos: GENERO, metodo_asignacion o ambos (por defecto: GENERO)."
+    )
+    parser.add_argument(
+        "--semilla",
+        type=int,
+        default=42,
+        help="Semilla del muestreo para que la muestra sea reproducible (por defecto: 42)."
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=100_000,
+        help="Filas leídas por lote; la memoria usada no depende del tamaño del archivo (por defecto: 100000)."
     )
     parser.add_argument(
         "--output_file",
@@ -160,6 +408,30 @@ if __name__ == "__main__":
         default=f"02data_validation/{datetime.now().strftime('%Y%m%d%H%M%S')}_muestras_para_validacion.csv",
         help="Nombre del archivo CSV de salida para las muestras."
     )
+    parser.add_argument(
+        "--seleccion",
+        choices=["aleatoria", "activa"],
+        default="aleatoria",
+        help="aleatoria: sample_size filas por estrato; activa: reparte --presupuesto filas entre métodos de asignación según sus errores pasados (por defecto: aleatoria)."
+    )
+    parser.add_argument(
+        "--presupuesto",
+        type=int,
+        default=500,
+        help="Con --seleccion activa, total de filas a validar (por defecto: 500)."
+    )
+    parser.add_argument(
+        "--metricas_dir",
+        type=str,
+        default="03ground_truth",
+        help="Con --seleccion activa, carpeta con los archivos de métricas de 03ground_truth.py; se usa el más reciente (por defecto: 03ground_truth)."
+    )
+    parser.add_argument(
+        "--generos",
+        nargs="+",
+        default=None,
+        help="Muestrear solo estos géneros (ej. --generos desconocido femenino). Por defecto, todos."
+    )
 
     args = parser.parse_args()
 
@@ -174,7 +446,12 @@ if __name__ == "__main__":
 
     if archivo_resultados_principal:
         print(f"ℹ️ Usando el archivo de resultados más reciente: '{archivo_resultados_principal}'")
-        generar_muestras_para_validacion(archivo_resultados_principal, args.sample_size, args.output_file)
+        activa = args.seleccion == 'activa'
+        generar_muestras_para_validacion(archivo_resultados_principal, args.presupuesto if activa else args.sample_size,
+                                         args.output_file, args.generos,
+                                         columnas_estrato=estratos_disponibles[args.estratos], semilla=args.semilla,
+                                         tamano_lote=args.chunk_size, seleccion=args.seleccion,
+                                         archivo_metricas=encontrar_archivo_metricas_mas_reciente(args.metricas_dir) if activa else None)
     else:
         print("🚫 No se pudo proceder sin un archivo de entrada.")
 
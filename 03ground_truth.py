@@ -6,13 +6,21 @@
 #Puedes también usar los argumentos si tus carpetas se llaman diferente:
 #python3 03ground_truth.py --validation_dir mi_carpeta_de_validacion --output_dir mi_carpeta_de_metricas
 
+#Para evaluar todas las rondas de validación de la carpeta (o archivos concretos) en una sola pasada:
+#python3 03ground_truth.py --todos
+#python3 03ground_truth.py --archivos ronda1_muestras_para_validacion.csv ronda2_muestras_para_validacion.parquet
+
+#Intervalos de confianza bootstrap (por defecto 1000 remuestreos al 95%; 0 los desactiva), en varios procesos:
+#python3 03ground_truth.py --todos --remuestreos 10000 --workers 4
+
 #-------------------------------------------------------------
 #¿Qué hace el script?
 
-#Encuentra el archivo de validación: Busca en data_validation/ (o el directorio especificado) el archivo *_muestras_para_validacion.csv más reciente.
-#Lee los datos validados: Carga el archivo y se asegura de que existan las columnas GENERO (predicción de tu script original) y GENERO_VALIDADO (tu entrada manual).
+#Encuentra el archivo de validación: Busca en data_validation/ (o el directorio especificado) el archivo *_muestras_para_validacion.csv más reciente (con --todos, todos ellos).
+#Lee los datos validados: Carga el archivo y se asegura de que existan las columnas GENERO (predicción de tu script original) y GENERO_VALIDADO (tu entrada manual); metodo_asignacion se usa si está.
 #Filtra validados: Solo considera las filas donde GENERO_VALIDADO tenga un valor (es decir, las que realmente validaste).
-#Calcula Métricas (usando scikit-learn):
+#Calcula Métricas (con NumPy, sin scikit-learn): las etiquetas se codifican como enteros y un único np.bincount
+#produce la matriz de confusión de cada (archivo, metodo_asignacion); todas las métricas se derivan de esas matrices.
 #Accuracy: El porcentaje total de predicciones correctas.
 #Classification Report: Proporciona precisión, recall, F1-score y "support" (número de ocurrencias reales) para cada clase ('masculino', 'femenino', 'desconocido', y cualquier otra que hayas usado en GENERO_VALIDADO).
 #Precisión (por clase): De los que el sistema dijo que eran (ej. masculinos), cuántos realmente lo eran. (TP / (TP + FP))
@@ -29,6 +37,12 @@
 #Información general (archivo fuente, fecha, total validados, accuracy).
 #El reporte de clasificación detallado.
 #La matriz de confusión.
+#Las métricas por metodo_asignacion: precisión de cada regla (de los nombres que asignó, cuántos acertó).
+#Las métricas por archivo, si se evaluó más de uno.
+#Los intervalos de confianza bootstrap de accuracy, precisión, recall y F1 (general) y de la precisión de cada metodo_asignacion.
+#Si las muestras vienen de la selección activa de 02datavalidation.py (columna 'peso'), la estimación ponderada de toda la
+#población: accuracy con su error estándar e intervalo, reporte de clasificación ponderado y accuracy por metodo_asignacion.
+#La muestra activa sobrerrepresenta a propósito las reglas que más fallan, así que las métricas sin ponderar no son las de la población.
 #-------------------------------------------------------------
 
 #-------------------------------------------------------------
@@ -46,62 +60,109 @@
 #-------------------------------------------------------------
 
 
-#!pip install scikit-learn 
 import pandas as pd
+import numpy as np
 import os
 import argparse
+import time
 from datetime import datetime
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from inferir_genero.columnar import columnas_resultados, extensiones_resultados, leer_resultados
+from inferir_genero.metricas import (CONFIANZA_POR_DEFECTO, REMUESTREOS_POR_DEFECTO, codificar, formatear_reporte,
+                                     estimacion_estratificada, intervalos_confianza, matrices_bootstrap, matrices_confusion,
+                                     metricas_por_grupo, reporte_clasificacion)
 
-def encontrar_archivo_validacion_mas_reciente(directorio_data_validation):
+sufijos_validacion = tuple('_muestras_para_validacion' + ext for ext in extensiones_resultados)
+
+def encontrar_archivos_validacion(directorio_data_validation):
     """
-    Encuentra el archivo de validación más reciente en la carpeta especificada
-    basado en el sufijo '_muestras_para_validacion.csv'.
+    Devuelve los archivos '*_muestras_para_validacion.csv' (o '.parquet') de la carpeta,
+    del más reciente al más antiguo.
     """
     archivos_candidatos = []
     if not os.path.exists(directorio_data_validation):
         print(f"❌ Error: El directorio '{directorio_data_validation}' no existe.")
-        return None
+        return []
 
     for nombre_archivo in os.listdir(directorio_data_validation):
-        if nombre_archivo.endswith('_muestras_para_validacion.csv'):
+        if nombre_archivo.endswith(sufijos_validacion):
             archivos_candidatos.append(os.path.join(directorio_data_validation, nombre_archivo))
 
     if not archivos_candidatos:
         print(f"❌ Error: No se encontraron archivos '*_muestras_para_validacion.csv' en '{directorio_data_validation}'.")
         print("   Asegúrate de haber ejecutado primero el script 'generar_muestras_validacion.py' y completado la validación manual.")
-        return None
+        return []
 
-    # Ordenar por fecha de modificación para obtener el más reciente
-    # o por nombre si el nombre contiene la fecha al inicio
-    # Asumimos que el nombre contiene la fecha y hora, por lo que el sort alfabético inverso funciona
+    # Asumimos que el nombre empieza por la fecha y hora, por lo que el sort alfabético inverso funciona
     archivos_candidatos.sort(key=os.path.basename, reverse=True)
-    return archivos_candidatos[0]
+    return archivos_candidatos
 
-def calcular_y_guardar_metricas(archivo_validacion, directorio_salida_metricas):
+def encontrar_archivo_validacion_mas_reciente(directorio_data_validation):
     """
-    Lee el archivo de validación completado, calcula métricas y guarda los resultados.
+    Encuentra el archivo de validación más reciente en la carpeta especificada
+    basado en el sufijo '_muestras_para_validacion.csv' (o '.parquet').
     """
-    try:
-        df_val = pd.read_csv(archivo_validacion)
-        print(f"✅ Archivo de validación '{archivo_validacion}' leído correctamente.")
-    except FileNotFoundError:
-        print(f"❌ Error: No se pudo encontrar el archivo de validación '{archivo_validacion}'.")
-        return
-    except Exception as e:
-        print(f"❌ Error al leer el archivo CSV '{archivo_validacion}': {e}")
-        return
+    archivos = encontrar_archivos_validacion(directorio_data_validation)
+    return archivos[0] if archivos else None
 
-    # Verificar columnas necesarias
-    columnas_necesarias = ['GENERO', 'GENERO_VALIDADO']
-    for col in columnas_necesarias:
-        if col not in df_val.columns:
-            print(f"❌ Error: La columna requerida '{col}' no se encuentra en el archivo de validación.")
+def leer_validados(archivos_validacion):
+    """
+    Lee GENERO, GENERO_VALIDADO y, si existen, metodo_asignacion y peso de cada archivo
+    (proyección) y devuelve las filas validadas de todos con la columna 'archivo'.
+    Los archivos que no se pueden leer o no tienen las columnas requeridas se omiten con un aviso.
+    """
+    partes = []
+    for archivo in archivos_validacion:
+        try:
+            columnas = ['GENERO', 'GENERO_VALIDADO']
+            columnas += [col for col in ('metodo_asignacion', 'peso') if col in columnas_resultados(archivo)]
+            # Solo se leen las columnas necesarias (proyección)
+            df_val = leer_resultados(archivo, columnas=columnas)
+            print(f"✅ Archivo de validación '{archivo}' leído correctamente.")
+        except FileNotFoundError:
+            print(f"❌ Error: No se pudo encontrar el archivo de validación '{archivo}'.")
+            continue
+        except (ValueError, KeyError) as e:
+            # La proyección falla si falta alguna de las columnas requeridas
+            print(f"❌ Error: Faltan columnas requeridas en el archivo de validación '{archivo}': {e}")
             print("   Asegúrate de que el archivo de validación contiene las columnas 'GENERO' (predicción) y 'GENERO_VALIDADO' (manual).")
-            return
+            continue
+        except Exception as e:
+            print(f"❌ Error al leer el archivo de validación '{archivo}': {e}")
+            continue
+
+        df_val = df_val.astype(object)
+        if 'metodo_asignacion' not in df_val.columns:
+            df_val['metodo_asignacion'] = 'sin_metodo'
+        if 'peso' in df_val.columns:
+            # Si no se validaron todas las filas de un método, los pesos de las validadas se
+            # reescalan para que el método siga representando a todas sus filas
+            peso = pd.to_numeric(df_val['peso'], errors='coerce')
+            total = peso.groupby(df_val['metodo_asignacion']).transform('sum')
+            validado = peso.where(df_val['GENERO_VALIDADO'].notna()).groupby(df_val['metodo_asignacion']).transform('sum')
+            df_val['peso'] = peso * total / validado
+        else:
+            df_val['peso'] = np.nan
+        # Filtrar filas donde GENERO_VALIDADO no esté vacío (es decir, que fueron validadas)
+        df_val = df_val.dropna(subset=['GENERO_VALIDADO'])
+        if df_val.empty:
+            print(f"⚠️ El archivo '{archivo}' no tiene filas con 'GENERO_VALIDADO' completado; se omite.")
+            continue
+        df_val['archivo'] = os.path.basename(archivo)
+        partes.append(df_val)
+    if not partes:
+        return pd.DataFrame(columns=['GENERO', 'GENERO_VALIDADO', 'metodo_asignacion', 'peso', 'archivo'])
+    return pd.concat(partes, ignore_index=True)
 
-    # Filtrar filas donde GENERO_VALIDADO no esté vacío (es decir, que fueron validadas)
-    df_val_completado = df_val.dropna(subset=['GENERO_VALIDADO'])
+def calcular_y_guardar_metricas(archivos_validacion, directorio_salida_metricas, remuestreos=REMUESTREOS_POR_DEFECTO,
+                                confianza=CONFIANZA_POR_DEFECTO, workers=1, semilla=42):
+    """
+    Lee uno o varios archivos de validación completados, calcula las métricas globales,
+    por metodo_asignacion y por archivo en una sola pasada y guarda los resultados.
+    Con remuestreos > 0 añade intervalos de confianza bootstrap (general y por metodo_asignacion).
+    """
+    if isinstance(archivos_validacion, str):
+        archivos_validacion = [archivos_validacion]
+    df_val_completado = leer_validados(archivos_validacion)
     if df_val_completado.empty:
         print("❌ Error: No hay filas con 'GENERO_VALIDADO' completado en el archivo.")
         print("   Por favor, completa la validación manual en la columna 'GENERO_VALIDADO'.")
@@ -109,30 +170,90 @@ def calcular_y_guardar_metricas(archivo_validacion, directorio_salida_metricas):
     
     print(f"ℹ️ {len(df_val_completado)} registros validados encontrados para el cálculo de métricas.")
 
-    y_true = df_val_completado['GENERO_VALIDADO']
-    y_pred = df_val_completado['GENERO']
+    inicio = time.perf_counter()
+    y_true = df_val_completado['GENERO_VALIDADO'].to_numpy()
+    y_pred = df_val_completado['GENERO'].fillna('').to_numpy()
+    # Etiquetas: todas las presentes en y_true y y_pred, ordenadas
+    codigos, labels = codificar(np.concatenate([y_true, y_pred]))
+    codigos_true, codigos_pred = codigos[:len(y_true)], codigos[len(y_true):]
+    codigos_metodo, metodos = codificar(df_val_completado['metodo_asignacion'].fillna('sin_metodo').to_numpy())
+    codigos_archivo, archivos = codificar(df_val_completado['archivo'].to_numpy())
 
-    # Obtener todas las etiquetas únicas presentes en y_true y y_pred para la matriz de confusión
-    labels = sorted(list(set(y_true.unique()) | set(y_pred.unique())))
+    # Una matriz de confusión por (archivo, metodo) con un único bincount; el resto son sumas
+    matrices = matrices_confusion(codigos_true, codigos_pred, labels,
+                                  grupos=codigos_archivo * len(metodos) + codigos_metodo,
+                                  numero_grupos=len(archivos) * len(metodos))
+    matrices = matrices.reshape(len(archivos), len(metodos), len(labels), len(labels))
+    conf_matrix = matrices.sum(axis=(0, 1))
+    df_report = reporte_clasificacion(conf_matrix, labels)
+    accuracy = df_report.loc['accuracy', 'precision']
+    df_archivos = metricas_por_grupo(matrices.sum(axis=1), archivos, 'archivo')
+    milisegundos = (time.perf_counter() - inicio) * 1000
 
+    # Intervalos de confianza: remuestreo de filas con reemplazo, por metodo_asignacion
+    df_intervalos = None
+    matrices_remuestreo = None
+    if remuestreos > 0:
+        inicio = time.perf_counter()
+        matrices_remuestreo = matrices_bootstrap(codigos_true, codigos_pred, labels, grupos=codigos_metodo,
+                                                 numero_grupos=len(metodos), remuestreos=remuestreos,
+                                                 semilla=semilla, workers=workers)
+        df_intervalos = intervalos_confianza(conf_matrix, matrices_remuestreo.sum(axis=1), labels, confianza)
+        segundos_bootstrap = time.perf_counter() - inicio
+    df_metodos = metricas_por_grupo(matrices.sum(axis=0), metodos, 'metodo_asignacion', matrices_remuestreo, confianza)
 
-    # Calcular métricas
-    accuracy = accuracy_score(y_true, y_pred)
-    report_dict = classification_report(y_true, y_pred, output_dict=True, zero_division=0, labels=labels)
-    conf_matrix = confusion_matrix(y_true, y_pred, labels=labels)
+    # Estimación ponderada de la población (muestras de la selección activa, con columna 'peso')
+    pesos = pd.to_numeric(df_val_completado['peso'], errors='coerce').to_numpy(dtype=float)
+    ponderadas = ~np.isnan(pesos)
+    estimacion = None
+    if ponderadas.any():
+        estratos = (codigos_archivo * len(metodos) + codigos_metodo)[ponderadas]
+        matriz_ponderada = matrices_confusion(codigos_true[ponderadas], codigos_pred[ponderadas], labels,
+                                              pesos=pesos[ponderadas])[0]
+        df_report_ponderado = reporte_clasificacion(matriz_ponderada, labels)
+        estimacion = estimacion_estratificada(codigos_true[ponderadas] == codigos_pred[ponderadas], pesos[ponderadas],
+                                              estratos, len(archivos) * len(metodos), confianza)
+        df_estratos = pd.DataFrame({
+            'archivo': np.repeat(archivos, len(metodos)),
+            'metodo_asignacion': np.tile(metodos, len(archivos)),
+            'registros': estimacion['registros_estrato'],
+            'poblacion': estimacion['poblacion_estrato'].round(1),
+            'precision': estimacion['accuracy_estrato'].round(4),
+            'error_estandar': estimacion['error_estandar_estrato'].round(4),
+        })
+        df_estratos = df_estratos[df_estratos['registros'] > 0].sort_values('poblacion', ascending=False, ignore_index=True)
+        if len(archivos) == 1:
+            df_estratos = df_estratos.drop(columns='archivo')
+        if not ponderadas.all():
+            print(f"ℹ️ {int((~ponderadas).sum())} registros validados sin 'peso' (muestras aleatorias) no entran en la estimación ponderada.")
 
     print("\n--- Métricas de Clasificación ---")
     print(f"Accuracy General: {accuracy:.4f}")
     print("\nReporte de Clasificación:")
-    print(classification_report(y_true, y_pred, zero_division=0, labels=labels))
+    print(formatear_reporte(df_report))
     print("\nMatriz de Confusión:")
     # Crear un DataFrame para la matriz de confusión para mejor visualización
     df_conf_matrix = pd.DataFrame(conf_matrix, index=[f'Actual: {l}' for l in labels], columns=[f'Predicted: {l}' for l in labels])
     print(df_conf_matrix)
+    print("\nPrecisión por metodo_asignacion (de menor a mayor):")
+    print(df_metodos.to_string(index=False))
+    if len(archivos) > 1:
+        print("\nPrecisión por archivo de validación:")
+        print(df_archivos.to_string(index=False))
+    if estimacion is not None:
+        print(f"\n--- Estimación Ponderada (población de {estimacion['poblacion']:,.0f} registros) ---")
+        print(f"Accuracy ponderada: {estimacion['accuracy']:.4f} (IC {confianza:.0%}: {estimacion['ic_inferior']:.4f} - "
+              f"{estimacion['ic_superior']:.4f}, error estándar {estimacion['error_estandar']:.4f})")
+        print("\nReporte de Clasificación ponderado:")
+        print(formatear_reporte(df_report_ponderado))
+        print(df_estratos.to_string(index=False))
+    if df_intervalos is not None:
+        print(f"\nIntervalos de confianza al {confianza:.0%} ({remuestreos} remuestreos bootstrap):")
+        print(df_intervalos.to_string(index=False))
+    print(f"\nℹ️ Métricas calculadas en {milisegundos:.1f} ms.")
+    if df_intervalos is not None:
+        print(f"ℹ️ {remuestreos} remuestreos bootstrap en {segundos_bootstrap:.2f}s.")
 
-    # Preparar datos para guardar en CSV
-    df_report = pd.DataFrame(report_dict).transpose()
-    
     # Crear directorio de salida si no existe
     if not os.path.exists(directorio_salida_metricas):
         os.makedirs(directorio_salida_metricas)
@@ -145,7 +266,10 @@ def calcular_y_guardar_metricas(archivo_validacion, directorio_salida_metricas):
 
     try:
         with open(ruta_archivo_salida, 'w', encoding='utf-8-sig') as f:
-            f.write(f"Metricas de Evaluacion para el archivo: {os.path.basename(archivo_validacion)}\n")
+            if len(archivos) == 1:
+                f.write(f"Metricas de Evaluacion para el archivo: {archivos[0]}\n")
+            else:
+                f.write(f"Metricas de Evaluacion para {len(archivos)} archivos: {', '.join(archivos)}\n")
             f.write(f"Fecha de generacion de metricas: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Total de registros validados: {len(df_val_completado)}\n")
             f.write(f"Accuracy General: {accuracy:.4f}\n\n")
@@ -156,6 +280,32 @@ def calcular_y_guardar_metricas(archivo_validacion, directorio_salida_metricas):
             
             f.write("Matriz de Confusion:\n")
             df_conf_matrix.to_csv(f, index=True)
+            f.write("\n\n")
+
+            f.write("Metricas por metodo_asignacion:\n")
+            df_metodos.to_csv(f, index=False)
+
+            if len(archivos) > 1:
+                f.write("\n\n")
+                f.write("Metricas por archivo:\n")
+                df_archivos.to_csv(f, index=False)
+
+            if estimacion is not None:
+                f.write("\n\n")
+                f.write(f"Estimacion Ponderada (poblacion de {estimacion['poblacion']:.0f} registros):\n")
+                f.write(f"Accuracy ponderada: {estimacion['accuracy']:.4f}\n")
+                f.write(f"Error estandar: {estimacion['error_estandar']:.4f}\n")
+                f.write(f"IC {confianza:.0%}: {estimacion['ic_inferior']:.4f} - {estimacion['ic_superior']:.4f}\n\n")
+                f.write("Reporte de Clasificacion ponderado:\n")
+                df_report_ponderado.to_csv(f, index=True)
+                f.write("\n\n")
+                f.write("Estimacion por estrato:\n")
+                df_estratos.to_csv(f, index=False)
+
+            if df_intervalos is not None:
+                f.write("\n\n")
+                f.write(f"Intervalos de Confianza (bootstrap, {remuestreos} remuestreos, {confianza:.0%}):\n")
+                df_intervalos.to_csv(f, index=False)
         
         print(f"\n✅ Métricas guardadas en '{ruta_archivo_salida}'.")
 
@@ -177,14 +327,63 @@ if __name__ == "__main__":
             default="03ground_truth",
             help="Directorio donde se guardarán las métricas calculadas (por defecto: 03ground_truth)."
         )
+        parser.add_argument(
+            "--todos",
+            action="store_true",
+            help="Evalúa juntos todos los archivos de validación de --validation_dir, no solo el más reciente."
+        )
+        parser.add_argument(
+            "--archivos",
+            nargs="+",
+            default=None,
+            help="Archivos de validación concretos a evaluar juntos (ignora --validation_dir)."
+        )
+
+        parser.add_argument(
+            "--remuestreos",
+            type=int,
+            default=REMUESTREOS_POR_DEFECTO,
+            help=f"Remuestreos bootstrap para los intervalos de confianza; 0 los desactiva (por defecto: {REMUESTREOS_POR_DEFECTO})."
+        )
+        parser.add_argument(
+            "--confianza",
+            type=float,
+            default=CONFIANZA_POR_DEFECTO,
+            help=f"Nivel de confianza de los intervalos (por defecto: {CONFIANZA_POR_DEFECTO})."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Procesos entre los que repartir los remuestreos (por defecto: 1)."
+        )
+        parser.add_argument(
+            "--semilla",
+            type=int,
+            default=42,
+            help="Semilla del remuestreo, para intervalos reproducibles (por defecto: 42)."
+        )
 
         args = parser.parse_args()
+        if not 0 < args.confianza < 1:
+            parser.error("--confianza debe estar entre 0 y 1.")
 
-        archivo_validacion_seleccionado = encontrar_archivo_validacion_mas_reciente(args.validation_dir)
+        if args.archivos:
+            archivos_validacion = args.archivos
+            print(f"ℹ️ Usando {len(archivos_validacion)} archivos de validación indicados.")
+        elif args.todos:
+            archivos_validacion = encontrar_archivos_validacion(args.validation_dir)
+            if archivos_validacion:
+                print(f"ℹ️ Usando los {len(archivos_validacion)} archivos de validación de '{args.validation_dir}'.")
+        else:
+            archivo_validacion_seleccionado = encontrar_archivo_validacion_mas_reciente(args.validation_dir)
+            archivos_validacion = [archivo_validacion_seleccionado] if archivo_validacion_seleccionado else []
+            if archivos_validacion:
+                print(f"ℹ️ Usando el archivo de validación más reciente: '{archivo_validacion_seleccionado}'")
 
-        if archivo_validacion_seleccionado:
-            print(f"ℹ️ Usando el archivo de validación más reciente: '{archivo_validacion_seleccionado}'")
-            calcular_y_guardar_metricas(archivo_validacion_seleccionado, args.output_dir)
+        if archivos_validacion:
+            calcular_y_guardar_metricas(archivos_validacion, args.output_dir, args.remuestreos, args.confianza,
+                                        args.workers, args.semilla)
         else:
             print("🚫 No se pudo proceder sin un archivo de validación.")
 
@@ -193,4 +392,3 @@ if __name__ == "__main__":
         print(f"❌ Error inesperado: {error}")
     finally:
         print("🔄 Proceso de cálculo de métricas terminado.")
-
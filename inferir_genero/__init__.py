@@ -0,0 +1,25 @@
+"""
+Inferencia de género a partir de nombres únicos.
+
+API de un solo nombre (sin pandas):
+    from inferir_genero import predict, predict_many
+    predict('María José')          # ('femenino', 'dic_completo')
+    predict_many(['Juan', 'Ana'])  # [('masculino', 'dic_completo'), ('femenino', 'dic_completo')]
+
+La inferencia vectorizada sobre columnas está en inferir_genero.lote y el procesamiento
+de archivos CSV en inferir_genero.pipeline; ambos importan pandas al cargarse.
+"""
+from .diccionarios import diccionario_masculino, diccionario_femenino
+from .nucleo import (normalizar_nombre, inferir_genero_mejorado, predict, predict_many,
+                     estadisticas_cache, limpiar_caches)
+
+__all__ = [
+    'diccionario_masculino',
+    'diccionario_femenino',
+    'normalizar_nombre',
+    'inferir_genero_mejorado',
+    'predict',
+    'predict_many',
+    'estadisticas_cache',
+    'limpiar_caches',
+]
@@ -0,0 +1,281 @@
+"""
+Pruebas de rendimiento de la inferencia sobre corpus sintéticos (ver corpus.py).
+
+Para cada tamaño de corpus y cada modo (fila_a_fila, lote, paralelo) mide nombres/s,
+percentiles de latencia por etapa y memoria pico (RSS). Cada caso corre en un proceso
+nuevo para que la memoria pico y las cachés no se contaminen entre casos. Los
+resultados se comparan con una línea base guardada en JSON, de modo que una regresión
+aparece como diferencia en consola y en el diff del archivo.
+
+Uso:
+    python3 -m inferir_genero.benchmark                       # 10K, 1M y 10M filas
+    python3 -m inferir_genero.benchmark --tamanos 10000 100000 --modos lote paralelo --workers 4
+    python3 -m inferir_genero.benchmark --guardar_linea_base
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TAMANOS_POR_DEFECTO = [10_000, 1_000_000, 10_000_000]
+modos_disponibles = ['fila_a_fila', 'lote', 'paralelo']
+directorio_bench_por_defecto = 'bench'
+MAX_MUESTRAS_LATENCIA = 200_000 # Latencias por nombre guardadas (muestra uniforme) en fila_a_fila
+TOLERANCIA_POR_DEFECTO = 0.10
+
+def _rss_pico_mb(quien=resource.RUSAGE_SELF):
+    rss = resource.getrusage(quien).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024 # macOS en bytes, Linux en KB
+
+def _percentiles(valores, unidad):
+    import numpy as np
+    if len(valores) == 0:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'unidad': unidad}
+    p50, p95, p99 = np.percentile(np.asarray(valores, dtype=float), [50, 95, 99])
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3), 'p99': round(float(p99), 3), 'unidad': unidad}
+
+@contextmanager
+def _sin_caches_por_token():
+    """
+    Sustituye mientras dura el bloque las heurísticas por token memorizadas de nucleo
+    por sus funciones sin LRU, para medir la cascada de reglas sin caché.
+    """
+    from . import nucleo
+    cacheadas = {'_heuristica_primer_nombre': nucleo._heuristica_primer_nombre,
+                 '_clasificar_ultimo_nombre': nucleo._clasificar_ultimo_nombre}
+    for nombre, funcion in cacheadas.items():
+        funcion.cache_clear()
+        setattr(nucleo, nombre, funcion.__wrapped__)
+    try:
+        yield
+    finally:
+        for nombre, funcion in cacheadas.items():
+            setattr(nucleo, nombre, funcion)
+
+def _caso_fila_a_fila(ruta_corpus):
+    """Funciones originales sin caché ni pandas, con la latencia de cada nombre por etapa."""
+    import numpy as np
+    from .nucleo import inferir_genero_mejorado, normalizar_nombre
+
+    inicio = time.perf_counter()
+    with open(ruta_corpus, newline='', encoding='utf-8') as f:
+        lector = csv.reader(f)
+        next(lector)
+        nombres = [fila[0] if fila else '' for fila in lector]
+    segundos_lectura = time.perf_counter() - inicio
+
+    paso = max(1, len(nombres) // MAX_MUESTRAS_LATENCIA)
+    lat_normalizacion = np.empty(len(nombres) // paso + 1, dtype=np.int64)
+    lat_inferencia = np.empty_like(lat_normalizacion)
+    reloj = time.perf_counter_ns
+    with _sin_caches_por_token():
+        inicio = time.perf_counter()
+        for i, nombre in enumerate(nombres):
+            t0 = reloj()
+            normalizado = normalizar_nombre(nombre)
+            t1 = reloj()
+            inferir_genero_mejorado(normalizado)
+            if i % paso == 0:
+                t2 = reloj()
+                lat_normalizacion[i // paso] = t1 - t0
+                lat_inferencia[i // paso] = t2 - t1
+        segundos_proceso = time.perf_counter() - inicio
+    muestras = len(nombres) // paso + (1 if len(nombres) % paso else 0)
+
+    return len(nombres), segundos_proceso, {
+        'lectura': {'segundos': round(segundos_lectura, 3)},
+        'normalizacion': _percentiles(lat_normalizacion[:muestras] / 1000, 'us/nombre'),
+        'inferencia': _percentiles(lat_inferencia[:muestras] / 1000, 'us/nombre'),
+    }
+
+def _caso_por_chunks(ruta_corpus, tamano_chunk, workers):
+    """Camino por lotes (o en paralelo) del pipeline, con la latencia de cada chunk por etapa."""
+    import pandas as pd
+    from .lote import inferir_genero_unicos, normalizar_columna
+    from .pipeline import crear_pool, procesar_en_paralelo
+
+    pool = crear_pool(workers) if workers > 1 else None
+    lat = {'lectura': [], 'normalizacion': [], 'inferencia': []}
+    filas = 0
+    segundos_proceso = 0.0
+    try:
+        lector = iter(pd.read_csv(ruta_corpus, dtype={'nombre': str}, keep_default_na=False, chunksize=tamano_chunk))
+        while True:
+            t0 = time.perf_counter()
+            chunk = next(lector, None)
+            t1 = time.perf_counter()
+            if chunk is None:
+                break
+            lat['lectura'].append((t1 - t0) * 1000)
+            nombres = chunk['nombre']
+            if pool is None:
+                normalizados = normalizar_columna(nombres)
+                t2 = time.perf_counter()
+                inferir_genero_unicos(normalizados)
+                t3 = time.perf_counter()
+                lat['normalizacion'].append((t2 - t1) * 1000)
+                lat['inferencia'].append((t3 - t2) * 1000)
+            else:
+                procesar_en_paralelo(pool, nombres)
+                t3 = time.perf_counter()
+                lat['inferencia'].append((t3 - t1) * 1000)
+            segundos_proceso += t3 - t1
+            filas += len(chunk)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    etapas = {'lectura': _percentiles(lat['lectura'], 'ms/chunk')}
+    if pool is None:
+        etapas['normalizacion'] = _percentiles(lat['normalizacion'], 'ms/chunk')
+        etapas['inferencia'] = _percentiles(lat['inferencia'], 'ms/chunk')
+    else:
+        etapas['normalizacion+inferencia'] = _percentiles(lat['inferencia'], 'ms/chunk')
+    return filas, segundos_proceso, etapas
+
+def ejecutar_caso(ruta_corpus, modo, workers=1, tamano_chunk=100_000):
+    """Ejecuta un caso en el proceso actual y devuelve sus métricas (dict serializable)."""
+    if modo == 'fila_a_fila':
+        filas, segundos, etapas = _caso_fila_a_fila(ruta_corpus)
+    else:
+        filas, segundos, etapas = _caso_por_chunks(ruta_corpus, tamano_chunk, workers if modo == 'paralelo' else 1)
+    resultado = {
+        'filas': filas,
+        'segundos': round(segundos, 3),
+        'nombres_por_segundo': round(filas / segundos) if segundos else 0,
+        'etapas': etapas,
+        'rss_pico_mb': round(_rss_pico_mb(), 1),
+    }
+    if modo == 'paralelo':
+        resultado['workers'] = workers
+        resultado['rss_pico_trabajador_mb'] = round(_rss_pico_mb(resource.RUSAGE_CHILDREN), 1)
+    return resultado
+
+def _ejecutar_caso_en_subproceso(ruta_corpus, modo, workers, tamano_chunk):
+    directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entorno = dict(os.environ)
+    entorno['PYTHONPATH'] = os.pathsep.join(filter(None, [directorio_raiz, entorno.get('PYTHONPATH')]))
+    salida = subprocess.run(
+        [sys.executable, '-m', 'inferir_genero.benchmark', '--caso', modo, '--corpus', ruta_corpus,
+         '--workers', str(workers), '--chunk_size', str(tamano_chunk)],
+        capture_output=True, text=True, check=True, env=entorno,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+def comparar_con_linea_base(resultados, linea_base, tolerancia=TOLERANCIA_POR_DEFECTO):
+    """
+    Compara nombres/s y memoria pico con la línea base. Devuelve la lista de regresiones
+    (casos más lentos o con más memoria que la tolerancia relativa).
+    """
+    regresiones = []
+    for clave, actual in resultados.items():
+        base = linea_base.get(clave)
+        if not base:
+            print(f"ℹ️ {clave}: sin línea base.")
+            continue
+        cambio_velocidad = actual['nombres_por_segundo'] / base['nombres_por_segundo'] - 1 if base['nombres_por_segundo'] else 0.0
+        cambio_memoria = actual['rss_pico_mb'] / base['rss_pico_mb'] - 1 if base['rss_pico_mb'] else 0.0
+        regresion = cambio_velocidad < -tolerancia or cambio_memoria > tolerancia
+        print(f"{'❌' if regresion else '✅'} {clave}: {cambio_velocidad:+.1%} nombres/s "
+              f"({base['nombres_por_segundo']:,} → {actual['nombres_por_segundo']:,}), "
+              f"{cambio_memoria:+.1%} RSS pico ({base['rss_pico_mb']} → {actual['rss_pico_mb']} MB)")
+        if regresion:
+            regresiones.append(clave)
+    return regresiones
+
+def _imprimir_resultado(clave, resultado):
+    print(f"ℹ️ {clave}: {resultado['nombres_por_segundo']:,} nombres/s ({resultado['filas']:,} filas en "
+          f"{resultado['segundos']:.2f}s), RSS pico {resultado['rss_pico_mb']} MB"
+          + (f", trabajador {resultado['rss_pico_trabajador_mb']} MB" if 'rss_pico_trabajador_mb' in resultado else ''))
+    for etapa, datos in resultado['etapas'].items():
+        if 'p50' in datos:
+            print(f"     {etapa:<26} p50 {datos['p50']:>10} p95 {datos['p95']:>10} p99 {datos['p99']:>10} {datos['unidad']}")
+        else:
+            print(f"     {etapa:<26} {datos['segundos']}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de la inferencia sobre corpus sintéticos.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS_POR_DEFECTO,
+                        help="Número de filas de cada corpus (por defecto: 10000 1000000 10000000).")
+    parser.add_argument("--modos", nargs="+", choices=modos_disponibles, default=modos_disponibles,
+                        help="Caminos a medir (por defecto: todos).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                        help="Procesos del modo paralelo (por defecto: número de CPUs).")
+    parser.add_argument("--chunk_size", type=int, default=100_000, help="Filas por chunk en los modos lote y paralelo.")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del corpus sintético (por defecto: 42).")
+    parser.add_argument("--bench_dir", type=str, default=directorio_bench_por_defecto,
+                        help="Directorio de corpus generados y línea base (por defecto: bench).")
+    parser.add_argument("--linea_base", type=str, default=None,
+                        help="Archivo JSON de línea base (por defecto: <bench_dir>/linea_base.json).")
+    parser.add_argument("--guardar_linea_base", action="store_true",
+                        help="Guarda los resultados como nueva línea base (se fusionan con los casos no medidos).")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_POR_DEFECTO,
+                        help="Cambio relativo tolerado antes de marcar una regresión (por defecto: 0.10).")
+    # Uso interno: un caso por subproceso
+    parser.add_argument("--caso", choices=modos_disponibles, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.caso:
+        print(json.dumps(ejecutar_caso(args.corpus, args.caso, workers=args.workers, tamano_chunk=args.chunk_size)))
+        return 0
+
+    from .corpus import escribir_corpus
+
+    ruta_linea_base = args.linea_base or os.path.join(args.bench_dir, 'linea_base.json')
+    resultados = {}
+    try:
+        for filas in args.tamanos:
+            ruta_corpus = os.path.join(args.bench_dir, f'corpus_{filas}_{args.semilla}.csv')
+            if not os.path.exists(ruta_corpus):
+                inicio = time.perf_counter()
+                escribir_corpus(ruta_corpus, filas, semilla=args.semilla)
+                print(f"ℹ️ Corpus sintético '{ruta_corpus}' generado en {time.perf_counter() - inicio:.1f}s.")
+            for modo in args.modos:
+                clave = f"{modo}/{filas}"
+                resultados[clave] = _ejecutar_caso_en_subproceso(ruta_corpus, modo, args.workers, args.chunk_size)
+                _imprimir_resultado(clave, resultados[clave])
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Error en un caso de rendimiento: {e.stderr.strip()}")
+        return 1
+
+    linea_base = {}
+    if os.path.exists(ruta_linea_base):
+        with open(ruta_linea_base, encoding='utf-8') as f:
+            linea_base = json.load(f)
+        print(f"\n--- Comparación con la línea base '{ruta_linea_base}' ({linea_base.get('fecha', '?')}) ---")
+        regresiones = comparar_con_linea_base(resultados, linea_base.get('resultados', {}), args.tolerancia)
+    else:
+        print(f"ℹ️ No existe la línea base '{ruta_linea_base}'. Use --guardar_linea_base para crearla.")
+        regresiones = []
+
+    if args.guardar_linea_base:
+        if not os.path.exists(args.bench_dir):
+            os.makedirs(args.bench_dir)
+        guardados = dict(linea_base.get('resultados', {}))
+        guardados.update(resultados)
+        with open(ruta_linea_base, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'maquina': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+                'semilla': args.semilla,
+                'resultados': guardados,
+            }, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write('\n')
+        print(f"✅ Línea base guardada en '{ruta_linea_base}'.")
+
+    if regresiones:
+        print(f"❌ {len(regresiones)} regresiones de rendimiento: {', '.join(regresiones)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Punto de entrada de línea de comandos para inferir el género de un archivo CSV de nombres.
+
+Uso:
+    python3 01inferir_genero.py [opciones]
+    python3 -m inferir_genero [opciones]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+# Archivo de entrada
+archivo_entrada_por_defecto = '00data_in/nombres_unicos.csv'
+directorio_salida_por_defecto = '01data_out'
+
+# Presupuesto de arranque en frío para la API de un solo nombre:
+# importar el paquete y resolver la primera predicción en un proceso nuevo
+PRESUPUESTO_ARRANQUE_MS = 50
+
+_codigo_medicion_arranque = """
+import sys, time
+inicio = time.perf_counter()
+import inferir_genero
+inferir_genero.predict('María José')
+print((time.perf_counter() - inicio) * 1000, 'pandas' in sys.modules)
+"""
+
+def medir_arranque(repeticiones=5):
+    """
+    Mide en procesos nuevos el tiempo de importar el paquete y hacer la primera predicción.
+    Devuelve True si la mediana cumple PRESUPUESTO_ARRANQUE_MS y pandas no se importó.
+    """
+    directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    tiempos_ms = []
+    pandas_importado = False
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, '-c', _codigo_medicion_arranque], cwd=directorio_raiz,
+                                capture_output=True, text=True, check=True).stdout.split()
+        tiempos_ms.append(float(salida[0]))
+        pandas_importado = pandas_importado or salida[1] == 'True'
+    mediana = statistics.median(tiempos_ms)
+    print(f"ℹ️ Arranque en frío (import + primera predicción): mediana {mediana:.1f} ms, mínimo {min(tiempos_ms):.1f} ms "
+          f"en {repeticiones} procesos (presupuesto: {PRESUPUESTO_ARRANQUE_MS} ms).")
+    if pandas_importado:
+        print("❌ La API de un solo nombre importó pandas.")
+    cumple = mediana <= PRESUPUESTO_ARRANQUE_MS and not pandas_importado
+    print("✅ Dentro del presupuesto de arranque." if cumple else "❌ Fuera del presupuesto de arranque.")
+    return cumple
+
+def main(argv=None):
+    currentDate = datetime.now().strftime("%Y%m%d%H%M%S")
+    pool = None
+    try:
+        parser = argparse.ArgumentParser(description="Infiere el género de una lista de nombres únicos.")
+        parser.add_argument(
+            "--input_file",
+            type=str,
+            default=archivo_entrada_por_defecto,
+            help=f"Archivo CSV de entrada con una columna 'nombre' (por defecto: {archivo_entrada_por_defecto})."
+        )
+        parser.add_argument(
+            "--output_dir",
+            type=str,
+            default=directorio_salida_por_defecto,
+            help=f"Directorio donde se guardan los resultados (por defecto: {directorio_salida_por_defecto})."
+        )
+        parser.add_argument(
+            "--chunk_size",
+            type=int,
+            default=0,
+            help="Si es mayor que 0, procesa la entrada en streaming por chunks de este tamaño con memoria acotada."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Número de procesos para la inferencia en paralelo (por defecto: 1, sin paralelismo)."
+        )
+        parser.add_argument(
+            "--fila_a_fila",
+            action="store_true",
+            help="Usa la inferencia original fila a fila en lugar de la inferencia vectorizada por lotes."
+        )
+        parser.add_argument(
+            "--instrumentar",
+            action="store_true",
+            help="Mide aciertos, tiempo y evaluaciones por regla (en serie) y genera un informe <fecha>_perfil_reglas.csv junto a los resultados."
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Reutiliza los resultados del almacén persistente e infiere solo nombres nuevos o afectados por cambios; genera además un archivo delta."
+        )
+        parser.add_argument(
+            "--almacen",
+            type=str,
+            default=None,
+            help="Ruta del almacén SQLite del modo incremental (por defecto: <output_dir>/resultados_incrementales.sqlite)."
+        )
+        parser.add_argument(
+            "--modelo_ngramas",
+            type=str,
+            nargs="?",
+            const="",
+            default=None,
+            help="Clasifica los nombres sin regla clara con el modelo de n-gramas (ruta opcional; por defecto inferir_genero/datos/modelo_ngramas.npz). Añade la columna probabilidad_modelo."
+        )
+        parser.add_argument(
+            "--umbral_modelo",
+            type=float,
+            default=0.8,
+            help="Probabilidad mínima del modelo de n-gramas para asignar género (por defecto: 0.8)."
+        )
+        parser.add_argument(
+            "--formato",
+            choices=["csv", "parquet", "ambos"],
+            default="csv",
+            help="Formato de los archivos de resultados: csv, parquet (columnar, requiere pyarrow) o ambos (por defecto: csv)."
+        )
+        parser.add_argument(
+            "--exportar_csv",
+            type=str,
+            default=None,
+            help="Exporta un archivo de resultados .parquet a su CSV equivalente y termina."
+        )
+        parser.add_argument(
+            "--medir_arranque",
+            action="store_true",
+            help="Mide el arranque en frío de la API de un solo nombre y lo compara con el presupuesto."
+        )
+        parser.add_argument(
+            "--construir_indice",
+            action="store_true",
+            help="Regenera el índice binario de diccionarios a partir de inferir_genero/datos/nombres_*.txt y termina."
+        )
+        args = parser.parse_args(argv)
+
+        if args.medir_arranque:
+            return 0 if medir_arranque() else 1
+
+        if args.construir_indice:
+            from .diccionarios import construir_indice_diccionarios, cargar_diccionarios
+            ruta_indice = construir_indice_diccionarios()
+            indice = cargar_diccionarios(ruta_indice)
+            print(f"✅ Índice de diccionarios '{ruta_indice}' generado: {indice.numero_nombres} nombres en {indice.numero_ranuras} ranuras.")
+            return 0
+
+        if args.exportar_csv:
+            from .columnar import exportar_csv
+            ruta_csv = exportar_csv(args.exportar_csv)
+            print(f"✅ Archivo {os.path.basename(ruta_csv)} exportado desde {os.path.basename(args.exportar_csv)}.")
+            return 0
+
+        # pandas y el resto del pipeline de archivos se importan aquí, no al importar el paquete
+        import pandas as pd
+        from .pipeline import (columna_probabilidad, columnas_orden, columnas_salida, crear_pool,
+                               guardar_resultados, imprimir_estadisticas_cache, imprimir_estadisticas_modelo,
+                               imprimir_estadisticas_trabajadores, indexar_resultados, preparar_chunk, preparar_nombres,
+                               procesar_en_streaming)
+        from .indice_filas import RegistroGrupos, registrar_ultimo_resultado
+
+        archivo_entrada = args.input_file
+        directorio_salida = args.output_dir
+        formatos = ['csv', 'parquet'] if args.formato == 'ambos' else [args.formato]
+        if 'parquet' in formatos:
+            from .columnar import _importar_pyarrow
+            _importar_pyarrow() # Falla antes de procesar si falta pyarrow
+
+        if not os.path.exists(archivo_entrada):
+            raise FileNotFoundError(f"No se encontró el archivo '{archivo_entrada}'. Asegúrese de que esté en el mismo directorio que este script.")
+
+        perfil = None
+        if args.instrumentar:
+            from .perfil import PerfilReglas, imprimir_perfil, sufijo_informe
+            perfil = PerfilReglas()
+            if args.workers > 1 or args.incremental or args.fila_a_fila:
+                print("⚠️ Advertencia: --instrumentar infiere en serie todos los nombres; se omitirán --workers, --incremental y --fila_a_fila.")
+                args.workers, args.incremental = 1, False
+
+        modelo = None
+        estadisticas_modelo = {}
+        if args.modelo_ngramas is not None:
+            if args.incremental:
+                print("⚠️ Advertencia: --modelo_ngramas no está disponible con --incremental. Se omitirá.")
+            else:
+                from .ngramas import ModeloNgramas
+                if not 0 < args.umbral_modelo <= 1:
+                    raise ValueError("--umbral_modelo debe estar entre 0 y 1.")
+                modelo = ModeloNgramas.abrir(args.modelo_ngramas) if args.modelo_ngramas else ModeloNgramas.abrir()
+        columnas = columnas_salida + [columna_probabilidad] if modelo is not None else columnas_salida
+
+        pool = crear_pool(args.workers) if args.workers > 1 else None
+        estadisticas_trabajadores = {}
+
+        if args.chunk_size > 0:
+            if args.incremental:
+                print("⚠️ Advertencia: --incremental no está disponible en modo streaming. Se omitirá.")
+            registro_grupos = RegistroGrupos()
+            rutas_completos, rutas_desconocidos, total_filas, total_desconocidos = procesar_en_streaming(
+                archivo_entrada, directorio_salida, args.chunk_size, currentDate, fila_a_fila=args.fila_a_fila,
+                pool=pool, estadisticas_trabajadores=estadisticas_trabajadores, formatos=formatos, perfil=perfil,
+                modelo=modelo, umbral=args.umbral_modelo, estadisticas_modelo=estadisticas_modelo,
+                registro_grupos=registro_grupos
+            )
+            ruta_indice = indexar_resultados(rutas_completos, registro_grupos)
+            registrar_ultimo_resultado(directorio_salida, currentDate, rutas_completos, ruta_indice, total_filas)
+            imprimir_estadisticas_cache()
+            imprimir_estadisticas_trabajadores(estadisticas_trabajadores)
+            if modelo is not None:
+                imprimir_estadisticas_modelo(estadisticas_modelo, args.umbral_modelo)
+            if rutas_desconocidos:
+                nombres = ', '.join(os.path.basename(r) for r in rutas_desconocidos)
+                print(f'✅ Archivo de desconocidos {nombres} generado ({total_desconocidos} registros).')
+            else:
+                print("ℹ️ No se encontraron registros con género 'desconocido' para generar el archivo adicional.")
+            nombres = ', '.join(os.path.basename(r) for r in rutas_completos)
+            if ruta_indice:
+                print(f"ℹ️ Índice de filas {os.path.basename(ruta_indice)} generado ({len(registro_grupos.grupos)} grupos).")
+            print(f'✅ Proceso finalizado. Archivo {nombres} generado ({total_filas} registros)')
+        else:
+            df = pd.read_csv(archivo_entrada, dtype={'nombre': str}) # Asegurar que nombre sea string
+
+            if not os.path.exists(directorio_salida):
+                os.makedirs(directorio_salida)
+
+            if args.incremental:
+                from .incremental import escribir_delta, inferir_incremental, ruta_almacen_por_defecto
+                ruta_almacen = args.almacen or ruta_almacen_por_defecto(directorio_salida)
+                df = preparar_nombres(df)
+                df['GENERO'], df['metodo_asignacion'], df_delta, stats = inferir_incremental(
+                    df['nombre_normalizado'], ruta_almacen, fila_a_fila=args.fila_a_fila, pool=pool,
+                    estadisticas_trabajadores=estadisticas_trabajadores
+                )
+                if stats['reglas_cambiadas']:
+                    print("ℹ️ Las reglas cambiaron desde la última ejecución: se reinfieren todos los nombres.")
+                print(f"ℹ️ Incremental: {stats['nombres_distintos']} nombres distintos, {stats['reutilizados']} reutilizados del almacén, "
+                      f"{stats['inferidos']} inferidos, {stats['entradas_diccionario_cambiadas']} entradas del diccionario cambiadas.")
+                outfilename_delta = f'{currentDate}_delta_resultados.csv'
+                filas_delta = escribir_delta(df, df_delta, os.path.join(directorio_salida, outfilename_delta), columnas_orden)
+                print(f'✅ Archivo delta {outfilename_delta} generado ({filas_delta} registros nuevos o modificados).')
+            else:
+                # Aplicar inferencia mejorada sobre los nombres normalizados distintos
+                df = preparar_chunk(df, fila_a_fila=args.fila_a_fila, pool=pool,
+                                    estadisticas_trabajadores=estadisticas_trabajadores, perfil=perfil,
+                                    modelo=modelo, umbral=args.umbral_modelo, estadisticas_modelo=estadisticas_modelo)
+            imprimir_estadisticas_cache()
+            imprimir_estadisticas_trabajadores(estadisticas_trabajadores)
+            if modelo is not None:
+                imprimir_estadisticas_modelo(estadisticas_modelo, args.umbral_modelo)
+
+            #------------------------
+            # --- CREACIÓN Y GUARDADO DEL ARCHIVO DE DESCONOCIDOS ---
+            # 1. Filtrar los desconocidos
+            df_desconocidos = df[df['GENERO'] == 'desconocido'].copy() # Usar .copy() para evitar SettingWithCopyWarning
+
+            # 2. Ordenar el DataFrame de desconocidos
+            if not df_desconocidos.empty: # Solo ordenar y guardar si hay datos
+                df_desconocidos.sort_values(by=columnas_orden, inplace=True)
+
+                # 3. Guardar el archivo de desconocidos
+                rutas = guardar_resultados(
+                    df_desconocidos, os.path.join(directorio_salida, f'{currentDate}_desconocidos_resultados'), formatos, columnas
+                )
+                print(f"✅ Archivo de desconocidos {', '.join(os.path.basename(r) for r in rutas)} generado.")
+            else:
+                print("ℹ️ No se encontraron registros con género 'desconocido' para generar el archivo adicional.")
+            # --- FIN DE LA SECCIÓN DE DESCONOCIDOS ---
+
+            # Ordenar el DataFrame por la columna 'metodo_asignacion' antes de guardar
+            df.sort_values(by=columnas_orden, inplace=True)
+
+            # Guardar el resultado principales
+            rutas = guardar_resultados(df, os.path.join(directorio_salida, f'{currentDate}_resultados_completos'), formatos, columnas)
+
+            # Índice de filas por metodo_asignacion/GENERO para leer muestras sin recorrer el CSV
+            registro_grupos = RegistroGrupos()
+            registro_grupos.agregar_columnas(df['metodo_asignacion'], df['GENERO'])
+            ruta_indice = indexar_resultados(rutas, registro_grupos)
+            registrar_ultimo_resultado(directorio_salida, currentDate, rutas, ruta_indice, len(df))
+            if ruta_indice:
+                print(f"ℹ️ Índice de filas {os.path.basename(ruta_indice)} generado ({len(registro_grupos.grupos)} grupos).")
+
+            print(f"✅ Proceso finalizado. Archivo {', '.join(os.path.basename(r) for r in rutas)} generado")
+
+        if perfil is not None:
+            imprimir_perfil(perfil, perfil.escribir(os.path.join(directorio_salida, f'{currentDate}{sufijo_informe}')))
+
+    except FileNotFoundError as e:
+        print(f"❌ Error de archivo: {e}")
+    except ValueError as e:
+        print(f"❌ Error de valor: {e}")
+    except Exception as error:
+        print(f"❌ Error inesperado: {error}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        print("🔄 Proceso terminado.")
@@ -0,0 +1,181 @@
+"""
+Salida columnar (Parquet) de los resultados y lectura con proyección de columnas y
+filtros aplicados en el lector (predicate pushdown), compartida por las tres etapas.
+
+GENERO y metodo_asignacion se guardan como categóricas (codificación por diccionario),
+y como los resultados se escriben ordenados por metodo_asignacion/GENERO, los filtros
+por esas columnas descartan grupos de filas completos sin leerlos.
+
+Requiere pyarrow (opcional):  pip install pyarrow
+"""
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+columnas_categoricas = ['GENERO', 'metodo_asignacion']
+columnas_decimales = ['probabilidad_modelo'] # Vacía ('' en CSV) si no se evaluó con el modelo
+FILAS_POR_GRUPO = 100_000 # Tamaño de row group al escribir en streaming
+extensiones_resultados = ('.parquet', '.csv')
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("El formato Parquet requiere pyarrow. Instálelo con: pip install pyarrow") from e
+    return pyarrow
+
+def _como_categoricas(df):
+    df = df.copy()
+    for columna in columnas_categoricas:
+        if columna in df.columns:
+            df[columna] = df[columna].astype('category')
+    return df
+
+def escribir_parquet(df, ruta_parquet):
+    """Escribe un DataFrame de resultados en Parquet con GENERO/metodo_asignacion categóricas."""
+    _importar_pyarrow()
+    _como_categoricas(df).to_parquet(ruta_parquet, index=False, row_group_size=FILAS_POR_GRUPO)
+    return ruta_parquet
+
+class EscritorParquetIncremental:
+    """
+    Escribe filas (tuplas) en Parquet por row groups a medida que llegan, para la
+    fusión externa del modo streaming sin materializar el resultado completo.
+    """
+
+    def __init__(self, ruta_parquet, columnas, filas_por_grupo=FILAS_POR_GRUPO):
+        pyarrow = _importar_pyarrow()
+        self._pa = pyarrow
+        self.ruta = ruta_parquet
+        self.columnas = columnas
+        self.filas_por_grupo = filas_por_grupo
+        campos = []
+        for columna in columnas:
+            if columna in columnas_categoricas:
+                tipo = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+            elif columna in columnas_decimales:
+                tipo = pyarrow.float64()
+            else:
+                tipo = pyarrow.string()
+            campos.append(pyarrow.field(columna, tipo))
+        self._esquema = pyarrow.schema(campos)
+        self._escritor = pyarrow.parquet.ParquetWriter(ruta_parquet, self._esquema)
+        self._pendientes = []
+        self.filas_escritas = 0
+
+    def escribir(self, fila):
+        self._pendientes.append(fila)
+        if len(self._pendientes) >= self.filas_por_grupo:
+            self._vaciar()
+
+    def _vaciar(self):
+        if not self._pendientes:
+            return
+        columnas = list(zip(*self._pendientes))
+        arrays = []
+        for i, columna in enumerate(self.columnas):
+            valores = [v if v != '' else None for v in columnas[i]] if columna in columnas_decimales else columnas[i]
+            array = self._pa.array(valores, type=self._pa.string())
+            if columna in columnas_decimales:
+                array = array.cast(self._pa.float64())
+            elif columna in columnas_categoricas:
+                array = array.dictionary_encode().cast(self._esquema.field(columna).type)
+            arrays.append(array)
+        self._escritor.write_table(self._pa.Table.from_arrays(arrays, schema=self._esquema))
+        self.filas_escritas += len(self._pendientes)
+        self._pendientes = []
+
+    def cerrar(self):
+        self._vaciar()
+        self._escritor.close()
+
+def _opciones_csv():
+    """
+    Opciones de pd.read_csv para archivos de resultados: columnas de texto como str y solo
+    las celdas vacías como nulas, para que nombres como 'NA', 'Nan' o 'Null' se lean
+    igual que en Parquet; las columnas decimales se leen como float.
+    """
+    tipos = defaultdict(lambda: str, {columna: 'float64' for columna in columnas_decimales})
+    return dict(dtype=tipos, keep_default_na=False, na_values=[''])
+
+def _valores_filtro(valor):
+    return list(valor) if isinstance(valor, (list, tuple, set)) else [valor]
+
+def columnas_resultados(ruta):
+    """Nombres de las columnas de un archivo de resultados, leyendo solo la cabecera/esquema."""
+    if ruta.endswith('.parquet'):
+        pyarrow = _importar_pyarrow()
+        return list(pyarrow.parquet.read_schema(ruta).names)
+    return pd.read_csv(ruta, nrows=0).columns.tolist()
+
+def leer_resultados(ruta, columnas=None, filtros=None):
+    """
+    Lee un archivo de resultados CSV o Parquet.
+
+    columnas: lista de columnas a leer (proyección); None lee todas.
+    filtros: dict {columna: valor o lista de valores}. En Parquet se aplican en el lector
+             (predicate pushdown sobre archivo mapeado en memoria); en CSV, tras leer.
+    """
+    filtros = filtros or {}
+    if ruta.endswith('.parquet'):
+        _importar_pyarrow()
+        filtros_pyarrow = [(columna, 'in', _valores_filtro(valor)) for columna, valor in filtros.items()]
+        df = pd.read_parquet(ruta, columns=columnas, filters=filtros_pyarrow or None, memory_map=True)
+        for columna in columnas_categoricas:
+            if columna in df.columns and isinstance(df[columna].dtype, pd.CategoricalDtype):
+                df[columna] = df[columna].cat.remove_unused_categories()
+        return df
+
+    columnas_leer = None
+    if columnas is not None:
+        columnas_leer = list(dict.fromkeys(list(columnas) + list(filtros)))
+    df = pd.read_csv(ruta, usecols=columnas_leer, **_opciones_csv())
+    for columna, valor in filtros.items():
+        df = df[df[columna].isin(_valores_filtro(valor))]
+    if columnas is not None:
+        df = df[list(columnas)]
+    return df
+
+def iterar_resultados(ruta, columnas=None, filtros=None, filas_por_lote=FILAS_POR_GRUPO):
+    """
+    Como leer_resultados, pero recorre el archivo por lotes (DataFrames de hasta
+    filas_por_lote filas) sin cargarlo entero en memoria.
+    """
+    filtros = filtros or {}
+    if ruta.endswith('.parquet'):
+        _importar_pyarrow()
+        import pyarrow.compute
+        import pyarrow.dataset
+        expresion = None
+        for columna, valor in filtros.items():
+            condicion = pyarrow.compute.field(columna).isin(_valores_filtro(valor))
+            expresion = condicion if expresion is None else expresion & condicion
+        dataset = pyarrow.dataset.dataset(ruta, format='parquet')
+        for lote in dataset.to_batches(columns=columnas, filter=expresion, batch_size=filas_por_lote):
+            if lote.num_rows:
+                yield lote.to_pandas()
+        return
+
+    columnas_leer = None
+    if columnas is not None:
+        columnas_leer = list(dict.fromkeys(list(columnas) + list(filtros)))
+    for df in pd.read_csv(ruta, usecols=columnas_leer, chunksize=filas_por_lote, **_opciones_csv()):
+        for columna, valor in filtros.items():
+            df = df[df[columna].isin(_valores_filtro(valor))]
+        if columnas is not None:
+            df = df[list(columnas)]
+        if not df.empty:
+            yield df
+
+def exportar_csv(ruta_parquet, ruta_csv=None):
+    """Exporta un archivo de resultados Parquet al CSV equivalente (utf-8-sig, como la etapa 1)."""
+    if ruta_csv is None:
+        ruta_csv = os.path.splitext(ruta_parquet)[0] + '.csv'
+    df = leer_resultados(ruta_parquet)
+    for columna in columnas_categoricas:
+        if columna in df.columns:
+            df[columna] = df[columna].astype(object)
+    df.to_csv(ruta_csv, sep=',', index=False, encoding='utf-8-sig')
+    return ruta_csv
@@ -0,0 +1,152 @@
+"""
+Generador sintético y reproducible de corpus de nombres para pruebas de rendimiento.
+
+Imita la distribución de la entrada real (nombres únicos hispanos/latinoamericanos):
+nombres simples, compuestos de 2 y de 3 o más partes, partículas ("de los", "del"),
+tildes, mayúsculas mezcladas y caracteres basura. Los nombres se toman de los
+diccionarios con frecuencias tipo Zipf y se mezclan con tokens inventados a partir de
+sílabas, que caen en las heurísticas de terminación o quedan como desconocidos.
+
+Uso:
+    python3 -m inferir_genero.corpus --filas 1000000 --output_file bench/corpus_1000000.csv
+"""
+import argparse
+import csv
+import os
+
+import numpy as np
+
+from . import diccionarios
+from .indice import CODIGO_FEMENINO, CODIGO_MASCULINO
+
+# Proporciones de la forma del nombre: número de partes significativas
+PROBABILIDAD_PARTES = {1: 0.40, 2: 0.38, 3: 0.17, 4: 0.05}
+PROBABILIDAD_TOKEN_INVENTADO = 0.18 # Parte que no viene del diccionario
+PROBABILIDAD_MISMO_GENERO = 0.92 # Las partes siguientes suelen ser del mismo género que la primera
+PROBABILIDAD_COMPUESTO = 0.06 # El nombre empieza con un compuesto del diccionario ("maria del carmen")
+PROBABILIDAD_PARTICULA = 0.15 # En nombres de 3+ partes, partícula antes de la última
+PROBABILIDAD_TILDE = 0.30
+PROBABILIDAD_BASURA = 0.03
+PROBABILIDAD_VACIO = 0.005
+EXPONENTE_ZIPF = 1.1
+
+particulas = ['de', 'del', 'de la', 'de los', 'de las']
+silabas_inicio = ['ja', 'je', 'yo', 'ka', 'ke', 'li', 'lu', 'ma', 'mi', 'na', 'ni', 'ro', 'ri', 'sa', 'se',
+                  'ta', 'te', 'va', 'vi', 'za', 'bra', 'cri', 'dai', 'fla', 'gle', 'bry', 'jho', 'wi', 'xi', 'ya']
+silabas_medio = ['', '', 'dan', 'len', 'mar', 'ran', 'ri', 'son', 'th', 'vel', 'lis', 'nel', 'ber', 'sh', 'ty']
+silabas_final = ['a', 'o', 'e', 'i', 'y', 'ina', 'ito', 'ela', 'el', 'an', 'on', 'er', 'iz', 'es', 'ath',
+                 'ley', 'ny', 'lyn', 'son', 'ek', 'us', 'ix', 'ah', 'ee', 'ith']
+_tildes = {'a': 'á', 'e': 'é', 'i': 'í', 'o': 'ó', 'u': 'ú'}
+_basura = ['0', '1', '2', '.', ',', '-', '_', '*', '/', '(', ')', '#', '  ', '\t', '"', "'", '?']
+
+def _pesos_zipf(n, exponente=EXPONENTE_ZIPF):
+    pesos = 1.0 / np.arange(1, n + 1) ** exponente
+    return pesos / pesos.sum()
+
+def _tokens_por_genero(generador):
+    """
+    Tokens simples del diccionario por género y nombres compuestos, en orden aleatorio
+    (el orden define el ranking Zipf).
+    """
+    masculinos, femeninos, compuestos = [], [], []
+    for nombre, codigo in sorted(diccionarios.indice_diccionarios.items()):
+        if ' ' in nombre:
+            compuestos.append(nombre)
+        elif codigo == CODIGO_MASCULINO:
+            masculinos.append(nombre)
+        elif codigo == CODIGO_FEMENINO:
+            femeninos.append(nombre)
+    return (np.array(generador.permutation(masculinos), dtype=object),
+            np.array(generador.permutation(femeninos), dtype=object),
+            np.array(generador.permutation(compuestos), dtype=object))
+
+def _token_inventado(generador):
+    return (silabas_inicio[generador.integers(len(silabas_inicio))]
+            + silabas_medio[generador.integers(len(silabas_medio))]
+            + silabas_final[generador.integers(len(silabas_final))])
+
+def _ensuciar(nombre, generador):
+    """Tildes, mayúsculas y caracteres basura como en los datos capturados a mano."""
+    if generador.random() < PROBABILIDAD_TILDE:
+        posiciones = [i for i, c in enumerate(nombre) if c in _tildes]
+        if posiciones:
+            i = posiciones[generador.integers(len(posiciones))]
+            nombre = nombre[:i] + _tildes[nombre[i]] + nombre[i + 1:]
+    estilo = generador.random()
+    if estilo < 0.60:
+        nombre = nombre.title()
+    elif estilo < 0.90:
+        nombre = nombre.upper()
+    if generador.random() < PROBABILIDAD_BASURA:
+        i = int(generador.integers(len(nombre) + 1))
+        nombre = nombre[:i] + _basura[generador.integers(len(_basura))] + nombre[i:]
+    return nombre
+
+def generar_nombres(filas, semilla=42, tamano_bloque=100_000):
+    """Genera 'filas' nombres sintéticos en bloques (listas de str). Misma semilla, mismo corpus."""
+    generador = np.random.default_rng(semilla)
+    masculinos, femeninos, compuestos = _tokens_por_genero(generador)
+    pesos_m, pesos_f, pesos_c = _pesos_zipf(len(masculinos)), _pesos_zipf(len(femeninos)), _pesos_zipf(len(compuestos))
+    numeros_partes = np.array(list(PROBABILIDAD_PARTES))
+    probabilidades_partes = np.array(list(PROBABILIDAD_PARTES.values()))
+
+    generadas = 0
+    while generadas < filas:
+        n = min(tamano_bloque, filas - generadas)
+        partes = generador.choice(numeros_partes, size=n, p=probabilidades_partes)
+        es_femenino = generador.random(n) < 0.5
+        total_tokens = int(partes.sum())
+        # Tokens del diccionario de cada género, elegidos en bloque con pesos Zipf
+        tokens_m = masculinos[generador.choice(len(masculinos), size=total_tokens, p=pesos_m)]
+        tokens_f = femeninos[generador.choice(len(femeninos), size=total_tokens, p=pesos_f)]
+        mismo_genero = generador.random(total_tokens) < PROBABILIDAD_MISMO_GENERO
+        inventado = generador.random(total_tokens) < PROBABILIDAD_TOKEN_INVENTADO
+        compuesto = np.where(generador.random(n) < PROBABILIDAD_COMPUESTO,
+                             compuestos[generador.choice(len(compuestos), size=n, p=pesos_c)], None)
+
+        bloque = []
+        k = 0
+        for fila in range(n):
+            if generador.random() < PROBABILIDAD_VACIO:
+                bloque.append('' if generador.random() < 0.5 else _basura[generador.integers(len(_basura))])
+                k += partes[fila]
+                continue
+            tokens = [compuesto[fila]] if compuesto[fila] is not None else []
+            for j in range(k + len(tokens), k + partes[fila]):
+                femenino = es_femenino[fila] if mismo_genero[j] else not es_femenino[fila]
+                tokens.append(_token_inventado(generador) if inventado[j] else (tokens_f[j] if femenino else tokens_m[j]))
+            k += partes[fila]
+            if len(tokens) >= 3 and generador.random() < PROBABILIDAD_PARTICULA:
+                tokens.insert(len(tokens) - 1, particulas[generador.integers(len(particulas))])
+            bloque.append(_ensuciar(' '.join(tokens), generador))
+        generadas += n
+        yield bloque
+
+def escribir_corpus(ruta_salida, filas, semilla=42):
+    """Escribe el corpus sintético como CSV con una columna 'nombre', como la entrada real."""
+    directorio = os.path.dirname(ruta_salida)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio)
+    ruta_temporal = ruta_salida + '.tmp'
+    with open(ruta_temporal, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['nombre'])
+        for bloque in generar_nombres(filas, semilla=semilla):
+            escritor.writerows([nombre] for nombre in bloque)
+    os.replace(ruta_temporal, ruta_salida)
+    return ruta_salida
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético y reproducible de nombres.")
+    parser.add_argument("--filas", type=int, default=10_000, help="Número de nombres a generar (por defecto: 10000).")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del generador (por defecto: 42).")
+    parser.add_argument("--output_file", type=str, default=None,
+                        help="Archivo CSV de salida (por defecto: bench/corpus_<filas>_<semilla>.csv).")
+    args = parser.parse_args(argv)
+    ruta = args.output_file or os.path.join('bench', f'corpus_{args.filas}_{args.semilla}.csv')
+    escribir_corpus(ruta, args.filas, semilla=args.semilla)
+    print(f"✅ Corpus sintético '{ruta}' generado ({args.filas} nombres, semilla {args.semilla}).")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Diccionarios de nombres masculinos y femeninos y partículas a ignorar.
+
+Los nombres se mantienen en inferir_genero/datos/nombres_*.txt y se consultan a través de
+un índice binario mapeado en memoria (ver indice.py). Si el índice no existe o es más
+antiguo que las fuentes, se regenera al importar el módulo.
+"""
+import os
+import re
+
+from .indice import (CODIGO_FEMENINO, CODIGO_MASCULINO, IndiceNombres, VistaDiccionario,
+                     construir_indice, construir_indice_bytes, leer_fuente)
+
+directorio_datos = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos')
+fuentes_diccionarios = {
+    CODIGO_MASCULINO: os.path.join(directorio_datos, 'nombres_masculinos.txt'),
+    CODIGO_FEMENINO: os.path.join(directorio_datos, 'nombres_femeninos.txt'),
+}
+ruta_indice_por_defecto = os.path.join(directorio_datos, 'diccionarios.idx')
+
+def indice_desactualizado(ruta_indice=ruta_indice_por_defecto, fuentes=fuentes_diccionarios):
+    """True si el índice no existe o alguna fuente se modificó después de generarlo."""
+    if not os.path.exists(ruta_indice):
+        return True
+    fecha_indice = os.path.getmtime(ruta_indice)
+    return any(os.path.getmtime(ruta) > fecha_indice for ruta in fuentes.values())
+
+def construir_indice_diccionarios(ruta_indice=ruta_indice_por_defecto, fuentes=fuentes_diccionarios):
+    """Regenera el índice binario a partir de los archivos fuente de nombres."""
+    return construir_indice(fuentes, ruta_indice)
+
+def abrir_indice(ruta_indice=ruta_indice_por_defecto, fuentes=fuentes_diccionarios):
+    """
+    Abre el índice mapeado en memoria, regenerándolo antes si está desactualizado.
+    Si no se puede escribir (p. ej. instalación de solo lectura) se compila en memoria.
+    """
+    if indice_desactualizado(ruta_indice, fuentes):
+        try:
+            construir_indice(fuentes, ruta_indice)
+        except OSError:
+            datos = construir_indice_bytes({codigo: leer_fuente(ruta) for codigo, ruta in fuentes.items()})
+            return IndiceNombres(datos, ruta=None)
+    return IndiceNombres.abrir(ruta_indice)
+
+indice_diccionarios = abrir_indice()
+diccionario_masculino = VistaDiccionario(indice_diccionarios, CODIGO_MASCULINO)
+diccionario_femenino = VistaDiccionario(indice_diccionarios, CODIGO_FEMENINO)
+
+def cargar_diccionarios(ruta_indice=ruta_indice_por_defecto):
+    """
+    Apunta diccionario_masculino y diccionario_femenino a otro índice (o al mismo,
+    recargado). Después hay que llamar a limpiar_caches() del núcleo.
+    """
+    global indice_diccionarios
+    indice_diccionarios = abrir_indice(ruta_indice) if ruta_indice == ruta_indice_por_defecto else IndiceNombres.abrir(ruta_indice)
+    diccionario_masculino.usar_indice(indice_diccionarios)
+    diccionario_femenino.usar_indice(indice_diccionarios)
+    return indice_diccionarios
+
+# --- ÍNDICE DE COMPUESTOS POR TOKENS ---
+# Trie de palabras sobre las entradas compuestas del diccionario ("maria del carmen"):
+# cada nodo es [codigos_genero, hijos] y permite encontrar, en un solo recorrido de
+# izquierda a derecha, el compuesto más largo con el que empieza un nombre.
+_trie_compuestos = (None, None)
+
+def construir_trie_compuestos(items):
+    """Construye el trie de tokens a partir de pares (nombre, codigo) con más de un token."""
+    raiz = [0, {}]
+    for nombre, codigo in items:
+        tokens = nombre.split()
+        if len(tokens) < 2:
+            continue
+        nodo = raiz
+        for token in tokens:
+            nodo = nodo[1].setdefault(token, [0, {}])
+        nodo[0] |= codigo
+    return raiz
+
+def obtener_trie_compuestos():
+    """Devuelve el trie de compuestos del índice actual, construyéndolo en el primer uso."""
+    global _trie_compuestos
+    indice, trie = _trie_compuestos
+    if indice is not indice_diccionarios:
+        trie = construir_trie_compuestos(indice_diccionarios.items())
+        _trie_compuestos = (indice_diccionarios, trie)
+    return trie
+
+def codigo_compuesto_mas_largo(partes):
+    """
+    Recorre los tokens del nombre sobre el trie y devuelve los códigos de género del
+    compuesto más largo (dos o más tokens) con el que empieza el nombre, o 0.
+    """
+    nodo = obtener_trie_compuestos()
+    mejor_codigo = 0
+    for token in partes:
+        nodo = nodo[1].get(token)
+        if nodo is None:
+            break
+        if nodo[0]:
+            mejor_codigo = nodo[0]
+    return mejor_codigo
+
+# Partículas a ignorar/eliminar para el análisis de componentes individuales
+# (después de verificar el nombre completo en diccionario)
+particulas_a_ignorar = re.compile(r'\b(de|del|la|los|las)\b')
+lista_particulas = ['de', 'del', 'la', 'los', 'las', 'de los']
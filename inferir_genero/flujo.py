@@ -0,0 +1,243 @@
+"""
+Clasificador en flujo (asyncio) para usar como filtro en ETL, sin CSV intermedios.
+
+Lee nombres delimitados por línea (texto plano o JSON por línea) de stdin o de un
+socket Unix, los clasifica en lotes pequeños con predict_many (caché LRU del núcleo)
+y escribe los resultados respetando la contrapresión del destino (await drain()).
+Cada lote es lo que haya llegado en una lectura de hasta TAMANO_LECTURA bytes, así que
+el primer resultado sale sin esperar a llenar un lote y la memoria no crece con la
+entrada.
+
+Uso:
+    cat nombres.txt | python3 -m inferir_genero.flujo > resultados.csv
+    python3 -m inferir_genero.flujo --entrada json --salida json < nombres.jsonl
+    python3 -m inferir_genero.flujo --socket /tmp/clasificador.sock    # un flujo por conexión
+
+Entrada json: cada línea es un string o un objeto con clave "nombre"; los demás campos
+del objeto se conservan en la salida json.
+
+Cada línea de entrada produce exactamente una línea de salida, en el mismo orden, en
+los dos formatos de entrada: una línea en blanco se clasifica como nombre vacío
+(metodo_asignacion 'nombre_vacio') y una línea JSON no válida sale como 'desconocido'
+con metodo_asignacion 'json_no_valido' y la línea original como nombre (además de
+avisarse en stderr). Así la salida puede unirse a la entrada por número de línea.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import stat
+import sys
+import time
+
+from .nucleo import predict_many
+
+TAMANO_LECTURA = 64 * 1024 # Bytes por lectura: cota del lote y de la memoria por conexión
+columnas_salida = ['nombre_original', 'GENERO', 'metodo_asignacion']
+metodo_json_no_valido = 'json_no_valido'
+MAX_AVISOS = 5 # Líneas JSON no válidas que se guardan para avisar en stderr
+
+class _EntradaArchivo:
+    """Lectura de un archivo regular (p. ej. '< nombres.txt'), que asyncio no puede vigilar."""
+
+    def __init__(self, archivo):
+        self._archivo = archivo
+
+    async def read(self, n):
+        return self._archivo.read1(n)
+
+class _SalidaArchivo:
+    """Escritura en un archivo regular (p. ej. '> salida.csv'): drain() no tiene que esperar."""
+
+    def __init__(self, archivo):
+        self._archivo = archivo
+
+    def write(self, datos):
+        self._archivo.write(datos)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self._archivo.flush()
+
+def _es_archivo_regular(archivo):
+    return stat.S_ISREG(os.fstat(archivo.fileno()).st_mode)
+
+async def abrir_stdio():
+    """Devuelve (lector, escritor) asíncronos sobre stdin/stdout (tuberías, sockets o archivos)."""
+    bucle = asyncio.get_running_loop()
+    if _es_archivo_regular(sys.stdin):
+        lector = _EntradaArchivo(sys.stdin.buffer)
+    else:
+        lector = asyncio.StreamReader(limit=TAMANO_LECTURA)
+        await bucle.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(lector), sys.stdin.buffer)
+    if _es_archivo_regular(sys.stdout):
+        escritor = _SalidaArchivo(sys.stdout.buffer)
+    else:
+        transporte, protocolo = await bucle.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout.buffer)
+        escritor = asyncio.StreamWriter(transporte, protocolo, None, bucle)
+    return lector, escritor
+
+class RegistroErrores:
+    """
+    Cuenta las líneas JSON no válidas de un flujo y guarda solo las MAX_AVISOS primeras
+    para avisar, de modo que la memoria no crece con el número de errores.
+    """
+
+    def __init__(self, max_avisos=MAX_AVISOS):
+        self.total = 0
+        self.primeras = []
+        self._max_avisos = max_avisos
+
+    def anotar(self, linea):
+        self.total += 1
+        if len(self.primeras) < self._max_avisos:
+            self.primeras.append(linea)
+
+def _decodificar_json(linea, errores):
+    try:
+        valor = json.loads(linea)
+    except ValueError:
+        errores.anotar(linea)
+        return None, None
+    if isinstance(valor, str):
+        return valor, None
+    if isinstance(valor, dict) and isinstance(valor.get('nombre'), str):
+        return valor['nombre'], valor
+    errores.anotar(linea)
+    return None, None
+
+def clasificar_lineas(lineas, entrada, salida, errores):
+    """
+    Clasifica un lote de líneas ya decodificadas y devuelve los bytes de salida.
+    Las líneas JSON no válidas se anotan en errores (RegistroErrores).
+    """
+    no_validas = []
+    if entrada == 'json':
+        nombres, objetos = [], []
+        for i, linea in enumerate(lineas):
+            if not linea.strip():
+                nombre, objeto = '', None # Línea en blanco: nombre vacío, como en la entrada de texto
+            else:
+                nombre, objeto = _decodificar_json(linea, errores)
+                if nombre is None:
+                    nombre = linea
+                    no_validas.append(i)
+            nombres.append(nombre)
+            objetos.append(objeto)
+    else:
+        nombres = lineas
+        objetos = [None] * len(lineas)
+
+    resultados = predict_many(nombres)
+    for i in no_validas:
+        resultados[i] = ('desconocido', metodo_json_no_valido)
+    if salida == 'json':
+        partes = []
+        for nombre, objeto, (genero, metodo) in zip(nombres, objetos, resultados):
+            registro = dict(objeto) if objeto is not None else {'nombre': nombre}
+            registro['GENERO'] = genero
+            registro['metodo_asignacion'] = metodo
+            partes.append(json.dumps(registro, ensure_ascii=False))
+        texto = '\n'.join(partes) + '\n' if partes else ''
+    else:
+        bufer = io.StringIO()
+        escritor_csv = csv.writer(bufer, lineterminator='\n')
+        escritor_csv.writerows((nombre, genero, metodo) for nombre, (genero, metodo) in zip(nombres, resultados))
+        texto = bufer.getvalue()
+    return texto.encode('utf-8'), len(nombres)
+
+async def clasificar_flujo(lector, escritor, entrada='texto', salida='csv', cabecera=False):
+    """
+    Bucle principal: lee bloques, separa líneas completas (el resto queda para el
+    siguiente bloque), clasifica y escribe esperando a que el destino drene.
+    Devuelve (líneas escritas, una por línea de entrada; líneas JSON no válidas).
+    """
+    if cabecera and salida == 'csv':
+        escritor.write((','.join(columnas_salida) + '\n').encode('utf-8'))
+    pendiente = b''
+    total = 0
+    errores = RegistroErrores()
+    while True:
+        bloque = await lector.read(TAMANO_LECTURA)
+        if not bloque:
+            break
+        datos = pendiente + bloque
+        corte = datos.rfind(b'\n')
+        if corte < 0:
+            pendiente = datos
+            continue
+        pendiente = datos[corte + 1:]
+        lineas = datos[:corte].decode('utf-8', errors='replace').split('\n')
+        salida_lote, n = clasificar_lineas([l.rstrip('\r') for l in lineas], entrada, salida, errores)
+        total += n
+        escritor.write(salida_lote)
+        await escritor.drain() # Contrapresión: no se lee más hasta que el destino acepte lo escrito
+    if pendiente:
+        salida_lote, n = clasificar_lineas([pendiente.decode('utf-8', errors='replace').rstrip('\r')], entrada, salida, errores)
+        total += n
+        escritor.write(salida_lote)
+        await escritor.drain()
+    for linea in errores.primeras:
+        print(f"⚠️ Línea JSON no válida (sale como {metodo_json_no_valido}): {linea[:80]!r}", file=sys.stderr)
+    return total, errores.total
+
+async def servir_socket(ruta_socket, entrada, salida, cabecera):
+    """Atiende conexiones en un socket Unix; cada conexión es un flujo independiente."""
+    async def atender(lector, escritor):
+        try:
+            await clasificar_flujo(lector, escritor, entrada, salida, cabecera)
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    if os.path.exists(ruta_socket):
+        os.remove(ruta_socket)
+    servidor = await asyncio.start_unix_server(atender, path=ruta_socket, limit=TAMANO_LECTURA)
+    print(f"✅ Clasificador escuchando en el socket Unix '{ruta_socket}'.", file=sys.stderr, flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+async def _principal(args):
+    if args.socket:
+        await servir_socket(args.socket, args.entrada, args.salida, args.cabecera)
+        return 0
+    lector, escritor = await abrir_stdio()
+    inicio = time.perf_counter()
+    total, errores = await clasificar_flujo(lector, escritor, args.entrada, args.salida, args.cabecera)
+    escritor.close()
+    if args.estadisticas:
+        segundos = time.perf_counter() - inicio
+        print(f"ℹ️ {total} nombres clasificados en {segundos:.2f}s ({total / segundos if segundos else 0:,.0f} nombres/s), "
+              f"{errores} líneas con error.", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasifica nombres en flujo desde stdin o un socket Unix.")
+    parser.add_argument("--entrada", choices=["texto", "json"], default="texto",
+                        help="Formato de entrada: un nombre por línea (texto) o JSON por línea (por defecto: texto).")
+    parser.add_argument("--salida", choices=["csv", "json"], default="csv",
+                        help="Formato de salida: CSV nombre_original,GENERO,metodo_asignacion o JSON por línea (por defecto: csv).")
+    parser.add_argument("--cabecera", action="store_true", help="Escribe la cabecera en la salida CSV.")
+    parser.add_argument("--socket", type=str, default=None,
+                        help="Ruta de un socket Unix en el que atender conexiones en lugar de stdin/stdout.")
+    parser.add_argument("--estadisticas", action="store_true", help="Al terminar, muestra nombres/s en stderr.")
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(_principal(args))
+    except KeyboardInterrupt:
+        return 0
+    except BrokenPipeError:
+        # El consumidor cerró la tubería (p. ej. '| head'): no es un error
+        sys.stderr.close()
+        return 0
+    finally:
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+"""
+Modo fragmentado para entradas que no caben en una sola ejecución o máquina.
+
+1. Planificar: reparte la entrada por hash del nombre en N fragmentos (un mismo nombre
+   cae siempre en el mismo fragmento) y escribe manifiesto.json con las filas, la suma
+   SHA-256 de cada fragmento, las opciones de inferencia y las huellas de reglas y diccionarios.
+2. Procesar: cada invocación, en esta u otra máquina que vea el directorio, infiere uno o
+   varios fragmentos de forma independiente y deja su resultado ordenado y un archivo de
+   estado con su suma SHA-256. Un fragmento fallido se repite sin tocar los demás.
+3. Fusionar: valida las sumas y las huellas de todos los fragmentos y los combina con una
+   fusión k-way en los archivos habituales _resultados_completos/_desconocidos_resultados.
+
+Uso:
+    python3 -m inferir_genero.fragmentos --planificar --input_file 00data_in/registro.csv --fragmentos 64 --directorio fragmentos
+    python3 -m inferir_genero.fragmentos --procesar 0 1 2 --directorio fragmentos      # en cada nodo
+    python3 -m inferir_genero.fragmentos --procesar pendientes --directorio fragmentos  # reintentos
+    python3 -m inferir_genero.fragmentos --estado --directorio fragmentos
+    python3 -m inferir_genero.fragmentos --fusionar --directorio fragmentos --output_dir 01data_out
+    python3 -m inferir_genero.fragmentos --local 4 --input_file 00data_in/registro.csv --fragmentos 8  # procesos como nodos
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+nombre_manifiesto = 'manifiesto.json'
+VERSION_MANIFIESTO = 1
+FRAGMENTOS_POR_DEFECTO = 16
+FILAS_POR_CHUNK = 500_000 # Filas por chunk al repartir y al inferir cada fragmento
+TAMANO_BLOQUE_SUMA = 1024 * 1024
+
+def _entrada_fragmento(id_fragmento):
+    return f'entrada_{id_fragmento:05d}.csv'
+
+def _resultado_fragmento(id_fragmento):
+    return f'resultado_{id_fragmento:05d}.csv'
+
+def _estado_fragmento(id_fragmento):
+    return f'resultado_{id_fragmento:05d}.json'
+
+def suma_sha256(ruta):
+    suma = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE_SUMA), b''):
+            suma.update(bloque)
+    return suma.hexdigest()
+
+def _escribir_json(ruta, datos):
+    """Escribe un JSON de forma atómica (archivo temporal y rename), para lectores en otros nodos."""
+    temporal = f'{ruta}.tmp-{os.getpid()}'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+def _leer_json(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+def huellas_inferencia(opciones):
+    """Huellas de reglas, diccionarios y modelo con que se infiere: deben coincidir en todos los nodos."""
+    from .incremental import huella_diccionarios, huella_reglas, modulos_reglas
+    huellas = {'reglas': huella_reglas(), 'diccionarios': huella_diccionarios(), 'modelo': None}
+    if opciones.get('modelo_ngramas') is not None:
+        from . import ngramas
+        huellas['reglas'] = huella_reglas(modulos_reglas + (ngramas,)) # Con el código que puntúa el modelo
+        huellas['modelo'] = suma_sha256(opciones['modelo_ngramas'] or ngramas.ruta_modelo_por_defecto)
+    return huellas
+
+def leer_manifiesto(directorio):
+    ruta = os.path.join(directorio, nombre_manifiesto)
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No existe el manifiesto '{ruta}'. Planifique primero con --planificar.")
+    manifiesto = _leer_json(ruta)
+    if manifiesto.get('version') != VERSION_MANIFIESTO:
+        raise ValueError(f"Versión de manifiesto no soportada en '{ruta}': {manifiesto.get('version')}.")
+    return manifiesto
+
+def planificar(archivo_entrada, directorio, numero_fragmentos, opciones, tamano_chunk=FILAS_POR_CHUNK):
+    """
+    Reparte la entrada en numero_fragmentos CSV (columna 'nombre') por hash del nombre,
+    en una pasada por chunks, y escribe el manifiesto. Las filas sin nombre se descartan,
+    así que las filas del manifiesto son las que tendrá la salida. Devuelve el manifiesto.
+    """
+    if not os.path.exists(archivo_entrada):
+        raise FileNotFoundError(f"No se encontró el archivo '{archivo_entrada}'.")
+    if numero_fragmentos < 1:
+        raise ValueError("El número de fragmentos debe ser mayor que 0.")
+    if os.path.exists(os.path.join(directorio, nombre_manifiesto)):
+        raise ValueError(f"Ya hay un manifiesto en '{directorio}'. Use otro directorio para una nueva planificación.")
+    os.makedirs(directorio, exist_ok=True)
+
+    archivos = [open(os.path.join(directorio, _entrada_fragmento(i)), 'w', newline='', encoding='utf-8')
+                for i in range(numero_fragmentos)]
+    filas = np.zeros(numero_fragmentos, dtype=np.int64)
+    try:
+        for archivo in archivos:
+            archivo.write('nombre' + os.linesep)
+        for chunk in pd.read_csv(archivo_entrada, dtype={'nombre': str}, chunksize=tamano_chunk):
+            if 'nombre' not in chunk.columns:
+                raise ValueError("El archivo debe contener una columna llamada 'nombre'.")
+            chunk = chunk.dropna(subset=['nombre']) # Como la CLI principal: sin nombre no hay fila de salida
+            fragmento = (pd.util.hash_pandas_object(chunk['nombre'], index=False).to_numpy() % np.uint64(numero_fragmentos)).astype(np.int64)
+            orden = np.argsort(fragmento, kind='stable')
+            limites = np.searchsorted(fragmento[orden], np.arange(numero_fragmentos + 1))
+            nombres = chunk['nombre'].iloc[orden]
+            for i in range(numero_fragmentos):
+                if limites[i + 1] > limites[i]:
+                    nombres.iloc[limites[i]:limites[i + 1]].to_csv(archivos[i], header=False, index=False)
+            filas += np.bincount(fragmento, minlength=numero_fragmentos)
+    finally:
+        for archivo in archivos:
+            archivo.close()
+
+    manifiesto = {
+        'version': VERSION_MANIFIESTO,
+        'creado': datetime.now().strftime("%Y%m%d%H%M%S"),
+        'archivo_entrada': os.path.abspath(archivo_entrada),
+        'filas': int(filas.sum()),
+        'opciones': opciones,
+        'huellas': huellas_inferencia(opciones),
+        'fragmentos': [
+            {'id': i, 'entrada': _entrada_fragmento(i), 'filas': int(filas[i]),
+             'sha256_entrada': suma_sha256(os.path.join(directorio, _entrada_fragmento(i)))}
+            for i in range(numero_fragmentos)
+        ],
+    }
+    _escribir_json(os.path.join(directorio, nombre_manifiesto), manifiesto)
+    return manifiesto
+
+def estado_fragmentos(directorio, manifiesto):
+    """Estado de cada fragmento según su archivo de estado: 'completado', 'pendiente' o 'invalido'."""
+    estados = {}
+    for fragmento in manifiesto['fragmentos']:
+        i = fragmento['id']
+        ruta_estado = os.path.join(directorio, _estado_fragmento(i))
+        ruta_resultado = os.path.join(directorio, _resultado_fragmento(i))
+        if not os.path.exists(ruta_estado) or not os.path.exists(ruta_resultado):
+            estados[i] = 'pendiente'
+            continue
+        estado = _leer_json(ruta_estado)
+        valido = (estado.get('sha256_entrada') == fragmento['sha256_entrada']
+                  and estado.get('huellas') == manifiesto['huellas']
+                  and estado.get('tamano') == os.path.getsize(ruta_resultado))
+        estados[i] = 'completado' if valido else 'invalido'
+    return estados
+
+def procesar_fragmento(directorio, manifiesto, id_fragmento, tamano_chunk=FILAS_POR_CHUNK):
+    """
+    Infiere un fragmento con las opciones del manifiesto: cada chunk se ordena como run y
+    la fusión externa escribe resultado_NNNNN.csv (sin cabecera, ordenado como la salida
+    final), que se publica con rename. Después se escribe su archivo de estado, de modo que
+    un fallo a medias deja el fragmento pendiente. Devuelve el estado escrito.
+    """
+    from .pipeline import _escribir_run, _fusionar_runs, columna_probabilidad, columnas_salida, preparar_chunk
+
+    fragmentos = {f['id']: f for f in manifiesto['fragmentos']}
+    if id_fragmento not in fragmentos:
+        raise ValueError(f"El fragmento {id_fragmento} no está en el manifiesto (0 a {len(fragmentos) - 1}).")
+    fragmento = fragmentos[id_fragmento]
+    inicio = time.perf_counter()
+    ruta_entrada = os.path.join(directorio, fragmento['entrada'])
+    ruta_estado = os.path.join(directorio, _estado_fragmento(id_fragmento))
+    ruta_resultado = os.path.join(directorio, _resultado_fragmento(id_fragmento))
+    if os.path.exists(ruta_estado):
+        os.remove(ruta_estado)
+
+    if suma_sha256(ruta_entrada) != fragmento['sha256_entrada']:
+        raise ValueError(f"La suma SHA-256 de '{ruta_entrada}' no coincide con el manifiesto.")
+    opciones = manifiesto['opciones']
+    huellas = huellas_inferencia(opciones)
+    if huellas != manifiesto['huellas']:
+        distintas = ', '.join(k for k in huellas if huellas[k] != manifiesto['huellas'].get(k))
+        raise ValueError(f"Este nodo no infiere igual que el planificado (difieren: {distintas}).")
+
+    modelo = None
+    if opciones.get('modelo_ngramas') is not None:
+        from .ngramas import ModeloNgramas
+        modelo = ModeloNgramas.abrir(opciones['modelo_ngramas']) if opciones['modelo_ngramas'] else ModeloNgramas.abrir()
+    columnas = columnas_salida + [columna_probabilidad] if modelo is not None else columnas_salida
+
+    filas = 0
+    temporal = f'{ruta_resultado}.tmp-{socket.gethostname()}-{os.getpid()}'
+    with tempfile.TemporaryDirectory(prefix=f'runs_{id_fragmento:05d}_', dir=directorio) as directorio_runs:
+        rutas_runs = []
+        lector = pd.read_csv(ruta_entrada, dtype={'nombre': str}, chunksize=tamano_chunk)
+        for indice, chunk in enumerate(lector):
+            chunk = preparar_chunk(chunk, fila_a_fila=opciones.get('fila_a_fila', False), modelo=modelo,
+                                   umbral=opciones.get('umbral_modelo'))
+            if chunk.empty:
+                continue
+            rutas_runs.append(_escribir_run(chunk, directorio_runs, indice, columnas))
+            filas += len(chunk)
+        with open(temporal, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator=os.linesep).writerows(_fusionar_runs(rutas_runs, directorio_runs))
+    os.replace(temporal, ruta_resultado)
+
+    estado = {
+        'id': id_fragmento,
+        'filas': filas,
+        'columnas': columnas,
+        'tamano': os.path.getsize(ruta_resultado),
+        'sha256': suma_sha256(ruta_resultado),
+        'sha256_entrada': fragmento['sha256_entrada'],
+        'huellas': huellas,
+        'nodo': socket.gethostname(),
+        'pid': os.getpid(),
+        'segundos': round(time.perf_counter() - inicio, 3),
+        'terminado': datetime.now().strftime("%Y%m%d%H%M%S"),
+    }
+    _escribir_json(ruta_estado, estado)
+    return estado
+
+def validar_fragmentos(directorio, manifiesto):
+    """
+    Comprueba que todos los fragmentos están completos: estado presente, misma entrada y
+    huellas que el manifiesto y suma SHA-256 del resultado igual a la registrada.
+    Devuelve los estados; lanza ValueError con los fragmentos a reprocesar si alguno falla.
+    """
+    estados = {}
+    fallidos = []
+    for fragmento in manifiesto['fragmentos']:
+        i = fragmento['id']
+        ruta_estado = os.path.join(directorio, _estado_fragmento(i))
+        ruta_resultado = os.path.join(directorio, _resultado_fragmento(i))
+        if not os.path.exists(ruta_estado) or not os.path.exists(ruta_resultado):
+            fallidos.append((i, 'pendiente'))
+            continue
+        estado = _leer_json(ruta_estado)
+        if estado.get('sha256_entrada') != fragmento['sha256_entrada'] or estado.get('huellas') != manifiesto['huellas']:
+            fallidos.append((i, 'procesado con otra entrada o configuración'))
+        elif suma_sha256(ruta_resultado) != estado.get('sha256'):
+            fallidos.append((i, 'suma SHA-256 del resultado distinta'))
+        else:
+            estados[i] = estado
+    if fallidos:
+        detalle = ', '.join(f"{i} ({motivo})" for i, motivo in fallidos)
+        ids = ' '.join(str(i) for i, _ in fallidos)
+        raise ValueError(f"Fragmentos no válidos: {detalle}. Reprocéselos con --procesar {ids}")
+    columnas = {tuple(e['columnas']) for e in estados.values()}
+    if len(columnas) > 1:
+        raise ValueError("Los fragmentos tienen columnas distintas; reprocéselos con las mismas opciones.")
+    return estados
+
+def fusionar_fragmentos(directorio, directorio_salida, fecha, formatos=('csv',)):
+    """
+    Valida los fragmentos y los fusiona (k-way, ya vienen ordenados) en los archivos de
+    resultados completos y desconocidos de directorio_salida, con su índice de filas.
+    Devuelve (rutas_completos, rutas_desconocidos, total_filas, total_desconocidos, ruta_indice).
+    """
+    from .indice_filas import RegistroGrupos, registrar_ultimo_resultado
+    from .pipeline import _fusionar_runs, escribir_resultados_ordenados, indexar_resultados
+
+    manifiesto = leer_manifiesto(directorio)
+    estados = validar_fragmentos(directorio, manifiesto)
+    columnas = next(iter(estados.values()))['columnas'] if estados else None
+    os.makedirs(directorio_salida, exist_ok=True)
+
+    rutas = [os.path.join(directorio, _resultado_fragmento(i)) for i in sorted(estados)]
+    registro_grupos = RegistroGrupos()
+    with tempfile.TemporaryDirectory(prefix='fusion_', dir=directorio_salida) as directorio_runs:
+        rutas_completos, rutas_desconocidos, total_filas, total_desconocidos = escribir_resultados_ordenados(
+            _fusionar_runs(rutas, directorio_runs, conservar_entradas=True),
+            os.path.join(directorio_salida, f'{fecha}_resultados_completos'),
+            os.path.join(directorio_salida, f'{fecha}_desconocidos_resultados'),
+            formatos, columnas, registro_grupos
+        )
+    esperadas = sum(e['filas'] for e in estados.values())
+    if total_filas != esperadas:
+        raise ValueError(f"La fusión escribió {total_filas} filas y los fragmentos registran {esperadas}.")
+    if total_filas != manifiesto['filas']:
+        raise ValueError(f"La fusión escribió {total_filas} filas y el manifiesto planificó {manifiesto['filas']}.")
+    ruta_indice = indexar_resultados(rutas_completos, registro_grupos)
+    registrar_ultimo_resultado(directorio_salida, fecha, rutas_completos, ruta_indice, total_filas)
+    return rutas_completos, rutas_desconocidos, total_filas, total_desconocidos, ruta_indice
+
+def ejecutar_local(directorio, nodos, ids=None, tamano_chunk=FILAS_POR_CHUNK):
+    """
+    Procesa fragmentos en procesos independientes (python3 -m inferir_genero.fragmentos
+    --procesar), como lo harían nodos distintos, con 'nodos' procesos a la vez. Cada proceso
+    recibe --chunk_size; las opciones de inferencia las toma del manifiesto.
+    Devuelve los ids de los fragmentos cuyo proceso falló.
+    """
+    manifiesto = leer_manifiesto(directorio)
+    pendientes = list(ids) if ids is not None else [f['id'] for f in manifiesto['fragmentos']]
+    directorio_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    en_curso = {}
+    fallidos = []
+    while pendientes or en_curso:
+        while pendientes and len(en_curso) < nodos:
+            i = pendientes.pop(0)
+            en_curso[i] = subprocess.Popen([sys.executable, '-m', 'inferir_genero.fragmentos', '--procesar', str(i),
+                                            '--directorio', os.path.abspath(directorio), '--chunk_size', str(tamano_chunk)],
+                                           cwd=directorio_raiz)
+        for i, proceso in list(en_curso.items()):
+            if proceso.poll() is not None:
+                del en_curso[i]
+                if proceso.returncode != 0:
+                    fallidos.append(i)
+        time.sleep(0.05)
+    return sorted(fallidos)
+
+def _imprimir_estado(directorio):
+    manifiesto = leer_manifiesto(directorio)
+    estados = estado_fragmentos(directorio, manifiesto)
+    for valor in ('completado', 'pendiente', 'invalido'):
+        ids = [i for i, e in estados.items() if e == valor]
+        if ids:
+            print(f"ℹ️ {valor}: {len(ids)} fragmentos ({' '.join(map(str, ids[:50]))}{' ...' if len(ids) > 50 else ''})")
+    return estados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inferencia fragmentada: planificar, procesar fragmentos en nodos independientes y fusionar.")
+    parser.add_argument("--planificar", action="store_true", help="Reparte --input_file en --fragmentos fragmentos y escribe el manifiesto.")
+    parser.add_argument("--procesar", nargs="+", default=None,
+                        help="Procesa los fragmentos indicados (ids) o 'pendientes' (los que no están completos).")
+    parser.add_argument("--fusionar", action="store_true", help="Valida las sumas de los fragmentos y los fusiona en --output_dir.")
+    parser.add_argument("--estado", action="store_true", help="Muestra los fragmentos completados, pendientes e inválidos.")
+    parser.add_argument("--local", type=int, default=0,
+                        help="Planifica, procesa con N procesos independientes (como nodos) y fusiona, en esta máquina.")
+    parser.add_argument("--directorio", type=str, default="fragmentos",
+                        help="Directorio compartido con el manifiesto, los fragmentos y sus resultados (por defecto: fragmentos).")
+    parser.add_argument("--input_file", type=str, default="00data_in/nombres_unicos.csv",
+                        help="Archivo CSV de entrada con una columna 'nombre' (por defecto: 00data_in/nombres_unicos.csv).")
+    parser.add_argument("--fragmentos", type=int, default=FRAGMENTOS_POR_DEFECTO,
+                        help=f"Número de fragmentos al planificar (por defecto: {FRAGMENTOS_POR_DEFECTO}).")
+    parser.add_argument("--output_dir", type=str, default="01data_out",
+                        help="Directorio de los resultados fusionados (por defecto: 01data_out).")
+    parser.add_argument("--chunk_size", type=int, default=FILAS_POR_CHUNK,
+                        help=f"Filas por chunk al repartir e inferir (por defecto: {FILAS_POR_CHUNK}).")
+    parser.add_argument("--formato", choices=["csv", "parquet", "ambos"], default="csv",
+                        help="Formato de los resultados fusionados (por defecto: csv).")
+    parser.add_argument("--fila_a_fila", action="store_true", help="Al planificar: los nodos usarán la inferencia fila a fila.")
+    parser.add_argument("--modelo_ngramas", type=str, nargs="?", const="", default=None,
+                        help="Al planificar: los nodos aplicarán el modelo de n-gramas (ruta opcional) a los nombres sin regla clara.")
+    parser.add_argument("--umbral_modelo", type=float, default=0.8,
+                        help="Al planificar: umbral del modelo de n-gramas (por defecto: 0.8).")
+    args = parser.parse_args(argv)
+
+    formatos = ['csv', 'parquet'] if args.formato == 'ambos' else [args.formato]
+    modelo_ngramas = os.path.abspath(args.modelo_ngramas) if args.modelo_ngramas else args.modelo_ngramas
+    opciones = {'fila_a_fila': args.fila_a_fila, 'modelo_ngramas': modelo_ngramas, 'umbral_modelo': args.umbral_modelo}
+    try:
+        if args.planificar or args.local:
+            inicio = time.perf_counter()
+            manifiesto = planificar(args.input_file, args.directorio, args.fragmentos, opciones, args.chunk_size)
+            filas = [f['filas'] for f in manifiesto['fragmentos']]
+            print(f"✅ {len(filas)} fragmentos planificados en '{args.directorio}' en {time.perf_counter() - inicio:.2f}s: "
+                  f"{manifiesto['filas']} filas (mínimo {min(filas)}, máximo {max(filas)} por fragmento).")
+
+        if args.local:
+            inicio = time.perf_counter()
+            fallidos = ejecutar_local(args.directorio, args.local, tamano_chunk=args.chunk_size)
+            if fallidos:
+                print(f"⚠️ Advertencia: Fallaron los fragmentos {' '.join(map(str, fallidos))}; se reintentan una vez.")
+                fallidos = ejecutar_local(args.directorio, args.local, fallidos, args.chunk_size)
+            if fallidos:
+                raise ValueError(f"Los fragmentos {' '.join(map(str, fallidos))} fallaron de nuevo. Reintente con --procesar pendientes.")
+            print(f"✅ Fragmentos procesados por {args.local} procesos en {time.perf_counter() - inicio:.2f}s.")
+
+        if args.procesar:
+            manifiesto = leer_manifiesto(args.directorio)
+            if args.procesar == ['pendientes']:
+                estados = estado_fragmentos(args.directorio, manifiesto)
+                ids = [i for i, e in estados.items() if e != 'completado']
+            else:
+                ids = [int(i) for i in args.procesar]
+            for i in ids:
+                estado = procesar_fragmento(args.directorio, manifiesto, i, args.chunk_size)
+                print(f"✅ Fragmento {i}: {estado['filas']} registros en {estado['segundos']:.2f}s ({estado['nodo']}).")
+            if not ids:
+                print("ℹ️ No hay fragmentos pendientes.")
+
+        if args.estado:
+            _imprimir_estado(args.directorio)
+
+        if args.fusionar or args.local:
+            inicio = time.perf_counter()
+            fecha = datetime.now().strftime("%Y%m%d%H%M%S")
+            rutas_completos, rutas_desconocidos, total_filas, total_desconocidos, ruta_indice = fusionar_fragmentos(
+                args.directorio, args.output_dir, fecha, formatos
+            )
+            if rutas_desconocidos:
+                print(f"✅ Archivo de desconocidos {', '.join(os.path.basename(r) for r in rutas_desconocidos)} generado ({total_desconocidos} registros).")
+            print(f"✅ Fragmentos validados y fusionados en {time.perf_counter() - inicio:.2f}s: "
+                  f"{', '.join(os.path.basename(r) for r in rutas_completos)} ({total_filas} registros).")
+
+        if not (args.planificar or args.local or args.procesar or args.estado or args.fusionar):
+            parser.print_help()
+    except FileNotFoundError as e:
+        print(f"❌ Error de archivo: {e}")
+        return 1
+    except ValueError as e:
+        print(f"❌ Error de valor: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+"""
+Minería de nombres frecuentes entre los registros sin resolver, para ampliar los diccionarios.
+
+Recorre una sola vez el archivo de desconocidos (o el de resultados completos, filtrando
+GENERO 'desconocido'), en CSV o Parquet y por lotes, y mantiene un resumen Space-Saving
+de capacidad fija por tipo de candidato. Con ello la memoria no depende del tamaño del archivo.
+Cada candidato se cuenta por las filas que resolvería si se añadiera al diccionario:
+    primer_nombre  primer nombre significativo (regla dic_primer_nombre)
+    ultimo_nombre  último nombre significativo si es distinto del primero (dic_ultimo_nombre)
+    compuesto      inicio del nombre hasta el segundo nombre significativo, con sus
+                   partículas (dic_compuesto_prefijo; ej. "maria del carmen")
+
+Los conteos de cada lote son exactos y se fusionan con el resumen como en Space-Saving
+ponderado: un candidato que entra cuando el resumen está lleno hereda el mínimo del
+resumen como error. 'filas' es una cota superior y 'filas_minimas' = filas - error_maximo
+una cota inferior; los candidatos con más de total/capacidad filas nunca se pierden.
+
+Uso:
+    python3 -m inferir_genero.frecuentes                    # desconocidos más recientes de 01data_out
+    python3 -m inferir_genero.frecuentes --input_file 01data_out/<fecha>_resultados_completos.parquet --capacidad 50000 --top 500
+"""
+import argparse
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from .columnar import extensiones_resultados, iterar_resultados
+from .diccionarios import lista_particulas
+from .normalizacion import normalizar_lista
+
+tipos_candidato = ('primer_nombre', 'ultimo_nombre', 'compuesto')
+CAPACIDAD_POR_DEFECTO = 10_000 # Contadores por tipo de candidato
+TOP_POR_DEFECTO = 200 # Candidatos por tipo en el archivo de salida
+FILAS_POR_LOTE = 100_000
+sufijo_candidatos = '_candidatos_diccionario.csv'
+_particulas = frozenset(lista_particulas)
+
+class ResumenSpaceSaving:
+    """Resumen Space-Saving de capacidad fija, actualizado con los conteos exactos de cada lote."""
+
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO):
+        self.capacidad = capacidad
+        self.conteos = pd.Series(dtype='int64') # Cota superior de filas por candidato
+        self.errores = pd.Series(dtype='int64') # Sobreestimación máxima de cada conteo
+        self.total = 0
+
+    def minimo(self):
+        """Error que hereda un candidato nuevo: el menor contador si el resumen está lleno."""
+        return int(self.conteos.min()) if len(self.conteos) >= self.capacidad else 0
+
+    def actualizar(self, conteos_lote):
+        """Fusiona un Series {candidato: filas} con el resumen y conserva los 'capacidad' mayores."""
+        if conteos_lote.empty:
+            return
+        self.total += int(conteos_lote.sum())
+        minimo = self.minimo()
+        nuevos = ~conteos_lote.index.isin(self.conteos.index)
+        conteos = self.conteos.add(conteos_lote, fill_value=0).astype('int64')
+        errores = self.errores.reindex(conteos.index, fill_value=0)
+        if minimo:
+            indices_nuevos = conteos_lote.index[nuevos]
+            conteos[indices_nuevos] += minimo
+            errores[indices_nuevos] = minimo
+        if len(conteos) > self.capacidad:
+            conteos = conteos.sort_values(ascending=False, kind='stable').iloc[:self.capacidad]
+            errores = errores[conteos.index]
+        self.conteos, self.errores = conteos, errores
+
+    def ranking(self, top=None):
+        """DataFrame candidato, filas, error_maximo, filas_minimas ordenado por filas (y candidato)."""
+        df = pd.DataFrame({'candidato': self.conteos.index.astype(str), 'filas': self.conteos.to_numpy(),
+                           'error_maximo': self.errores.to_numpy()})
+        df['filas_minimas'] = df['filas'] - df['error_maximo']
+        df = df.sort_values(['filas', 'candidato'], ascending=[False, True], ignore_index=True)
+        return df if top is None else df.head(top)
+
+def candidatos_lote(nombres):
+    """Listas de candidatos (primer_nombre, ultimo_nombre, compuesto) de un lote de nombres originales."""
+    candidatos = {tipo: [] for tipo in tipos_candidato}
+    for nombre in normalizar_lista(nombres):
+        partes = nombre.split()
+        posiciones = [i for i, p in enumerate(partes) if p not in _particulas]
+        if not posiciones:
+            continue
+        primero = partes[posiciones[0]]
+        candidatos['primer_nombre'].append(primero)
+        if len(posiciones) > 1:
+            ultimo = partes[posiciones[-1]]
+            if ultimo != primero:
+                candidatos['ultimo_nombre'].append(ultimo)
+            candidatos['compuesto'].append(' '.join(partes[:posiciones[1] + 1]))
+    return candidatos
+
+def minar_candidatos(ruta, capacidad=CAPACIDAD_POR_DEFECTO, filas_por_lote=FILAS_POR_LOTE):
+    """
+    Una pasada sobre los registros desconocidos de 'ruta'.
+    Devuelve ({tipo: ResumenSpaceSaving}, filas_leidas).
+    """
+    resumenes = {tipo: ResumenSpaceSaving(capacidad) for tipo in tipos_candidato}
+    filas = 0
+    for lote in iterar_resultados(ruta, columnas=['nombre_original'], filtros={'GENERO': 'desconocido'},
+                                  filas_por_lote=filas_por_lote):
+        nombres = lote['nombre_original'].dropna().astype(str).to_numpy(dtype=object)
+        filas += len(nombres)
+        for tipo, valores in candidatos_lote(nombres).items():
+            resumenes[tipo].actualizar(pd.Series(valores, dtype=object).value_counts(sort=False))
+    return resumenes, filas
+
+def tabla_candidatos(resumenes, filas, top=TOP_POR_DEFECTO):
+    """Une los rankings de cada tipo (los 'top' primeros) con la fracción de filas desconocidas."""
+    tablas = []
+    for tipo in tipos_candidato:
+        ranking = resumenes[tipo].ranking(top)
+        ranking.insert(0, 'tipo', tipo)
+        tablas.append(ranking)
+    df = pd.concat(tablas, ignore_index=True)
+    df['fraccion_desconocidos'] = (df['filas'] / filas).round(6) if filas else 0.0
+    return df
+
+def encontrar_archivo_mas_reciente(directorio, sufijos=('_desconocidos_resultados', '_resultados_completos')):
+    """El archivo más reciente del primer sufijo con resultados en 'directorio' (Parquet antes que CSV)."""
+    if not os.path.isdir(directorio):
+        return None
+    for sufijo in sufijos:
+        candidatos = []
+        for nombre_archivo in os.listdir(directorio):
+            for prioridad, extension in enumerate(extensiones_resultados):
+                if nombre_archivo.endswith(sufijo + extension):
+                    candidatos.append((nombre_archivo[:-len(extension)], -prioridad, nombre_archivo))
+        if candidatos:
+            return os.path.join(directorio, max(candidatos)[2])
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ordena los nombres sin resolver por las filas que resolverían al añadirlos a los diccionarios.")
+    parser.add_argument("--input_file", type=str, default=None,
+                        help="Archivo de desconocidos o de resultados completos (CSV o Parquet). Por defecto, el más reciente de --input_dir.")
+    parser.add_argument("--input_dir", type=str, default="01data_out",
+                        help="Carpeta donde buscar los resultados de la etapa 1 (por defecto: 01data_out).")
+    parser.add_argument("--output_dir", type=str, default=None,
+                        help=f"Carpeta del archivo <fecha>{sufijo_candidatos} (por defecto: la del archivo de entrada).")
+    parser.add_argument("--capacidad", type=int, default=CAPACIDAD_POR_DEFECTO,
+                        help=f"Contadores del resumen por tipo de candidato; fija la memoria (por defecto: {CAPACIDAD_POR_DEFECTO}).")
+    parser.add_argument("--top", type=int, default=TOP_POR_DEFECTO,
+                        help=f"Candidatos por tipo en el archivo de salida (por defecto: {TOP_POR_DEFECTO}).")
+    parser.add_argument("--chunk_size", type=int, default=FILAS_POR_LOTE,
+                        help=f"Filas por lote de lectura (por defecto: {FILAS_POR_LOTE}).")
+    args = parser.parse_args(argv)
+
+    try:
+        ruta = args.input_file or encontrar_archivo_mas_reciente(args.input_dir)
+        if ruta is None:
+            raise FileNotFoundError(f"No se encontraron archivos de desconocidos ni de resultados completos en '{args.input_dir}'.")
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se encontró el archivo '{ruta}'.")
+        if args.capacidad < 1 or args.top < 1:
+            raise ValueError("--capacidad y --top deben ser mayores que 0.")
+
+        print(f"ℹ️ Minando candidatos de '{ruta}' (capacidad {args.capacidad} por tipo).")
+        resumenes, filas = minar_candidatos(ruta, args.capacidad, args.chunk_size)
+        df = tabla_candidatos(resumenes, filas, args.top)
+
+        directorio_salida = args.output_dir or os.path.dirname(ruta) or '.'
+        if not os.path.exists(directorio_salida):
+            os.makedirs(directorio_salida)
+        ruta_salida = os.path.join(directorio_salida, datetime.now().strftime("%Y%m%d%H%M%S") + sufijo_candidatos)
+        df.to_csv(ruta_salida, index=False, encoding='utf-8-sig')
+
+        for tipo in tipos_candidato:
+            primeros = df[df['tipo'] == tipo].head(10)
+            if primeros.empty:
+                continue
+            print(f"ℹ️ {tipo}: " + ', '.join(f"{c} ({f})" for c, f in zip(primeros['candidato'], primeros['filas'])))
+        print(f"✅ Archivo {os.path.basename(ruta_salida)} generado ({len(df)} candidatos de {filas} registros desconocidos).")
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
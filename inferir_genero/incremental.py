@@ -0,0 +1,192 @@
+"""
+Re-inferencia incremental con un almacén persistente de resultados (SQLite).
+
+El almacén guarda el resultado de cada nombre normalizado, la huella de las reglas con
+que se calculó y una copia del diccionario usado. En cada ejecución solo se infieren:
+  - los nombres que nunca se habían visto,
+  - los nombres afectados por entradas del diccionario que cambiaron (el nombre completo,
+    alguno de sus tokens o un compuesto con el que empieza),
+  - todos los nombres si cambió el código que decide el género (modulos_reglas).
+"""
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from . import diccionarios, indice, lote, normalizacion, nucleo, reglas
+from .lote import inferir_genero_unicos
+
+nombre_almacen_por_defecto = 'resultados_incrementales.sqlite'
+# Módulos en el camino de decisión: normalización, búsqueda en el índice, trie de
+# compuestos y partículas, reglas de terminación y las dos implementaciones de la cascada
+modulos_reglas = (normalizacion, indice, diccionarios, reglas, nucleo, lote)
+
+def huella_reglas(modulos=modulos_reglas):
+    """Huella del código que decide el género (por defecto, todos los modulos_reglas)."""
+    huella = hashlib.sha1()
+    for modulo in modulos:
+        with open(modulo.__file__, 'rb') as f:
+            huella.update(f.read())
+    return huella.hexdigest()
+
+def huella_diccionarios():
+    """Huella del índice de diccionarios actual (su contenido binario es determinista)."""
+    return hashlib.sha1(diccionarios.indice_diccionarios.buffer).hexdigest()
+
+def abrir_almacen(ruta_almacen):
+    """Abre (o crea) el almacén de resultados."""
+    conexion = sqlite3.connect(ruta_almacen)
+    conexion.executescript('''
+        CREATE TABLE IF NOT EXISTS resultados (
+            nombre_normalizado TEXT PRIMARY KEY,
+            GENERO TEXT NOT NULL,
+            metodo_asignacion TEXT NOT NULL,
+            vigente INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS diccionario (
+            nombre TEXT PRIMARY KEY,
+            codigo INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS metadatos (
+            clave TEXT PRIMARY KEY,
+            valor TEXT
+        );
+    ''')
+    return conexion
+
+def _leer_metadato(conexion, clave):
+    fila = conexion.execute('SELECT valor FROM metadatos WHERE clave = ?', (clave,)).fetchone()
+    return fila[0] if fila else None
+
+def _invalidar_por_diccionario(conexion, invalidar=True):
+    """
+    Compara el diccionario actual con la copia del almacén y marca como no vigentes los
+    resultados que dependen de alguna entrada añadida, eliminada o cambiada de género.
+    Devuelve el número de entradas del diccionario que cambiaron.
+    """
+    anterior = dict(conexion.execute('SELECT nombre, codigo FROM diccionario'))
+    actual = dict(diccionarios.indice_diccionarios.items())
+    cambiadas = [nombre for nombre in set(anterior) | set(actual) if anterior.get(nombre) != actual.get(nombre)]
+
+    for nombre in (cambiadas if invalidar else []):
+        # El nombre completo, un token suelto o un compuesto al inicio/en medio del nombre
+        conexion.execute('''
+            UPDATE resultados SET vigente = 0
+            WHERE vigente = 1 AND (nombre_normalizado = ?1
+                OR nombre_normalizado LIKE ?1 || ' %'
+                OR nombre_normalizado LIKE '% ' || ?1
+                OR nombre_normalizado LIKE '% ' || ?1 || ' %')
+        ''', (nombre,))
+
+    conexion.execute('DELETE FROM diccionario')
+    conexion.executemany('INSERT INTO diccionario (nombre, codigo) VALUES (?, ?)', actual.items())
+    return len(cambiadas)
+
+def inferir_incremental(nombres_norm, ruta_almacen, fila_a_fila=False, pool=None, estadisticas_trabajadores=None):
+    """
+    Infiere el género reutilizando los resultados vigentes del almacén. Con pool, los
+    nombres pendientes se infieren en paralelo (ver pipeline.procesar_en_paralelo).
+
+    Devuelve (generos, metodos, df_delta, estadisticas): los dos arrays alineados con
+    nombres_norm y un DataFrame por nombre normalizado con los resultados nuevos o que
+    cambiaron respecto al almacén (columnas GENERO_anterior y metodo_anterior).
+    """
+    serie = pd.Series(nombres_norm, dtype=object)
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+
+    conexion = abrir_almacen(ruta_almacen)
+    try:
+        with conexion:
+            huella_actual = huella_reglas()
+            huella_anterior = _leer_metadato(conexion, 'huella_reglas')
+            reglas_cambiadas = huella_anterior is not None and huella_anterior != huella_actual
+            if reglas_cambiadas:
+                conexion.execute('UPDATE resultados SET vigente = 0')
+
+            huella_dic_actual = huella_diccionarios()
+            entradas_cambiadas = 0
+            if _leer_metadato(conexion, 'huella_diccionarios') != huella_dic_actual:
+                # En un almacén nuevo, o si las reglas cambiaron, no hay resultados vigentes
+                # que invalidar; solo se actualiza la copia del diccionario
+                entradas_cambiadas = _invalidar_por_diccionario(
+                    conexion, invalidar=huella_anterior is not None and not reglas_cambiadas
+                )
+
+            # Resultados previos de los nombres de esta entrada
+            conexion.execute('CREATE TEMP TABLE entrada (nombre_normalizado TEXT PRIMARY KEY)')
+            conexion.executemany('INSERT INTO entrada VALUES (?)', ((n,) for n in unicos))
+            previos = pd.read_sql_query('''
+                SELECT r.nombre_normalizado, r.GENERO, r.metodo_asignacion, r.vigente
+                FROM entrada e JOIN resultados r ON r.nombre_normalizado = e.nombre_normalizado
+            ''', conexion).set_index('nombre_normalizado')
+            conexion.execute('DROP TABLE entrada')
+
+            df_unicos = pd.DataFrame({'nombre_normalizado': unicos})
+            df_unicos = df_unicos.join(previos, on='nombre_normalizado')
+            pendientes = ~(df_unicos['vigente'] == 1).to_numpy(dtype=bool)
+
+            generos = df_unicos['GENERO'].to_numpy(dtype=object).copy()
+            metodos = df_unicos['metodo_asignacion'].to_numpy(dtype=object).copy()
+            if pendientes.any() and pool is not None:
+                # Normalizar un nombre ya normalizado lo deja igual
+                from .pipeline import procesar_en_paralelo
+                _, generos[pendientes], metodos[pendientes] = procesar_en_paralelo(
+                    pool, df_unicos.loc[pendientes, 'nombre_normalizado'], fila_a_fila=fila_a_fila,
+                    estadisticas_trabajadores=estadisticas_trabajadores
+                )
+            elif pendientes.any():
+                generos[pendientes], metodos[pendientes] = inferir_genero_unicos(
+                    df_unicos.loc[pendientes, 'nombre_normalizado'], fila_a_fila=fila_a_fila
+                )
+
+            # Delta: nombres nuevos o cuyo resultado cambió
+            df_pendientes = pd.DataFrame({
+                'nombre_normalizado': df_unicos['nombre_normalizado'].to_numpy(dtype=object)[pendientes],
+                'GENERO': generos[pendientes],
+                'metodo_asignacion': metodos[pendientes],
+                'GENERO_anterior': df_unicos['GENERO'].to_numpy(dtype=object)[pendientes],
+                'metodo_anterior': df_unicos['metodo_asignacion'].to_numpy(dtype=object)[pendientes],
+            })
+            cambio = ((df_pendientes['GENERO'] != df_pendientes['GENERO_anterior'])
+                      | (df_pendientes['metodo_asignacion'] != df_pendientes['metodo_anterior']))
+            df_delta = df_pendientes[cambio].copy()
+            df_delta['tipo_cambio'] = np.where(df_delta['GENERO_anterior'].isna(), 'nuevo', 'modificado')
+
+            conexion.executemany('''
+                INSERT INTO resultados (nombre_normalizado, GENERO, metodo_asignacion, vigente) VALUES (?, ?, ?, 1)
+                ON CONFLICT(nombre_normalizado) DO UPDATE SET
+                    GENERO = excluded.GENERO, metodo_asignacion = excluded.metodo_asignacion, vigente = 1
+            ''', df_pendientes[['nombre_normalizado', 'GENERO', 'metodo_asignacion']].itertuples(index=False, name=None))
+            conexion.executemany('INSERT OR REPLACE INTO metadatos (clave, valor) VALUES (?, ?)', [
+                ('huella_reglas', huella_actual),
+                ('huella_diccionarios', huella_dic_actual),
+            ])
+    finally:
+        conexion.close()
+
+    estadisticas = {
+        'nombres_distintos': len(unicos),
+        'reutilizados': int((~pendientes).sum()),
+        'inferidos': int(pendientes.sum()),
+        'cambios': len(df_delta),
+        'reglas_cambiadas': reglas_cambiadas,
+        'entradas_diccionario_cambiadas': entradas_cambiadas,
+    }
+    return generos[codigos], metodos[codigos], df_delta, estadisticas
+
+def ruta_almacen_por_defecto(directorio_salida):
+    return os.path.join(directorio_salida, nombre_almacen_por_defecto)
+
+def escribir_delta(df, df_delta, ruta_delta, columnas_orden):
+    """
+    Escribe las filas de entrada cuyo resultado es nuevo o cambió respecto al almacén,
+    con el resultado anterior al lado. Devuelve el número de filas escritas.
+    """
+    anteriores = df_delta.set_index('nombre_normalizado')[['GENERO_anterior', 'metodo_anterior', 'tipo_cambio']]
+    df_filas = df[df['nombre_normalizado'].isin(anteriores.index)].join(anteriores, on='nombre_normalizado')
+    df_filas = df_filas.sort_values(by=columnas_orden)
+    columnas = ['nombre_original', 'GENERO', 'metodo_asignacion', 'GENERO_anterior', 'metodo_anterior', 'tipo_cambio']
+    df_filas[columnas].to_csv(ruta_delta, sep=',', index=False, encoding='utf-8-sig')
+    return len(df_filas)
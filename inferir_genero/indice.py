@@ -0,0 +1,154 @@
+"""
+Índice binario compacto para los diccionarios de nombres.
+
+Los diccionarios se escriben en archivos de texto (uno por género) y se compilan en una
+tabla hash de direccionamiento abierto que se mapea en memoria al arrancar: cargarla no
+construye ningún set de Python y cada búsqueda es O(1).
+
+Formato (little-endian):
+    cabecera: magia (4s), versión (I), número de ranuras (I, potencia de 2), número de nombres (I)
+    ranuras:  hash crc32 (I), desplazamiento (I), longitud (H), códigos de género (B), relleno (x)
+    nombres:  bytes UTF-8 de todos los nombres concatenados
+"""
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Set
+
+MAGIA_INDICE = b'GNIX'
+VERSION_INDICE = 1
+_cabecera = struct.Struct('<4sIII')
+_ranura = struct.Struct('<IIHBx')
+
+# Un bit por género para que un mismo nombre pueda estar en ambos diccionarios
+CODIGO_MASCULINO = 1
+CODIGO_FEMENINO = 2
+
+def leer_fuente(ruta_fuente):
+    """Lee un archivo de nombres (uno por línea; se ignoran vacías y comentarios '#')."""
+    nombres = []
+    with open(ruta_fuente, encoding='utf-8') as f:
+        for linea in f:
+            nombre = linea.split('#', 1)[0].strip()
+            if nombre:
+                nombres.append(nombre)
+    return nombres
+
+def construir_indice_bytes(nombres_por_codigo):
+    """
+    Compila {codigo: iterable de nombres} en los bytes del índice.
+    La tabla se dimensiona a un factor de carga <= 0.5 para sondeos lineales cortos.
+    """
+    codigos = {}
+    for codigo, nombres in nombres_por_codigo.items():
+        for nombre in nombres:
+            codigos[nombre] = codigos.get(nombre, 0) | codigo
+
+    numero_ranuras = 8
+    while numero_ranuras < 2 * len(codigos):
+        numero_ranuras *= 2
+    mascara = numero_ranuras - 1
+
+    inicio_nombres = _cabecera.size + numero_ranuras * _ranura.size
+    ranuras = [None] * numero_ranuras
+    blob = bytearray()
+    for nombre in sorted(codigos):
+        datos = nombre.encode('utf-8')
+        hash_nombre = zlib.crc32(datos)
+        i = hash_nombre & mascara
+        while ranuras[i] is not None:
+            i = (i + 1) & mascara
+        ranuras[i] = (hash_nombre, inicio_nombres + len(blob), len(datos), codigos[nombre])
+        blob += datos
+
+    salida = bytearray(_cabecera.pack(MAGIA_INDICE, VERSION_INDICE, numero_ranuras, len(codigos)))
+    for ranura in ranuras:
+        salida += _ranura.pack(*ranura) if ranura is not None else _ranura.pack(0, 0, 0, 0)
+    salida += blob
+    return bytes(salida)
+
+def construir_indice(fuentes_por_codigo, ruta_indice):
+    """Compila los archivos fuente {codigo: ruta} en el índice binario ruta_indice."""
+    nombres_por_codigo = {codigo: leer_fuente(ruta) for codigo, ruta in fuentes_por_codigo.items()}
+    datos = construir_indice_bytes(nombres_por_codigo)
+    ruta_temporal = ruta_indice + '.tmp'
+    with open(ruta_temporal, 'wb') as f:
+        f.write(datos)
+    os.replace(ruta_temporal, ruta_indice) # Reemplazo atómico: los lectores nunca ven un índice a medias
+    return ruta_indice
+
+class IndiceNombres:
+    """Índice de solo lectura sobre un buffer (mmap o bytes) con el formato descrito arriba."""
+
+    def __init__(self, buffer, ruta=None):
+        magia, version, numero_ranuras, numero_nombres = _cabecera.unpack_from(buffer, 0)
+        if magia != MAGIA_INDICE or version != VERSION_INDICE:
+            raise ValueError(f"El índice de diccionarios '{ruta}' no tiene un formato válido.")
+        self.buffer = buffer
+        self._mascara = numero_ranuras - 1
+        self.numero_ranuras = numero_ranuras
+        self.numero_nombres = numero_nombres
+        self.ruta = ruta
+
+    @classmethod
+    def abrir(cls, ruta_indice):
+        """Mapea el índice en memoria; las páginas se cargan bajo demanda y se comparten entre procesos."""
+        with open(ruta_indice, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, ruta_indice)
+
+    def codigo(self, nombre):
+        """Devuelve los bits de género del nombre (0 si no está en ningún diccionario)."""
+        try:
+            datos = nombre.encode('utf-8')
+        except AttributeError:
+            return 0
+        hash_nombre = zlib.crc32(datos)
+        buffer = self.buffer
+        i = hash_nombre & self._mascara
+        while True:
+            hash_ranura, desplazamiento, longitud, codigo = _ranura.unpack_from(buffer, _cabecera.size + i * _ranura.size)
+            if not codigo:
+                return 0
+            if hash_ranura == hash_nombre and longitud == len(datos) and buffer[desplazamiento:desplazamiento + longitud] == datos:
+                return codigo
+            i = (i + 1) & self._mascara
+
+    def items(self):
+        """Itera (nombre, codigo) en el orden de las ranuras."""
+        for i in range(self.numero_ranuras):
+            _, desplazamiento, longitud, codigo = _ranura.unpack_from(self.buffer, _cabecera.size + i * _ranura.size)
+            if codigo:
+                yield self.buffer[desplazamiento:desplazamiento + longitud].decode('utf-8'), codigo
+
+class VistaDiccionario(Set):
+    """
+    Vista de un género dentro del índice con la interfaz de un set de solo lectura
+    ('in', len, iteración), de modo que sustituye a los antiguos set() literales.
+    """
+
+    def __init__(self, indice, bit):
+        self.bit = bit
+        self.usar_indice(indice)
+
+    def usar_indice(self, indice):
+        """Apunta la vista a otro índice (recarga en caliente de los diccionarios)."""
+        self.indice = indice
+        self._tamano = None
+
+    def __contains__(self, nombre):
+        return bool(self.indice.codigo(nombre) & self.bit)
+
+    def __iter__(self):
+        for nombre, codigo in self.indice.items():
+            if codigo & self.bit:
+                yield nombre
+
+    def __len__(self):
+        if self._tamano is None:
+            self._tamano = sum(1 for _ in self)
+        return self._tamano
+
+    def __repr__(self):
+        return f"VistaDiccionario(bit={self.bit}, nombres={len(self)}, indice={self.indice.ruta!r})"
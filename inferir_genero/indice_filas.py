@@ -0,0 +1,170 @@
+"""
+Índice de filas de los CSV de resultados: archivo lateral '<base>.indice.npz' con la
+posición en bytes de cada fila y los grupos (metodo_asignacion, GENERO) con su número de
+filas. Como la etapa 1 escribe los resultados ordenados por metodo_asignacion y GENERO,
+cada grupo es un rango contiguo de filas y basta con guardar su tamaño.
+
+Con el índice, 02datavalidation.py elige las filas de la muestra a partir de los conteos
+y lee solo esas líneas con seek, sin recorrer el resto del archivo. La etapa 1 también
+deja en la carpeta de salida 'ultimo_resultado.json' con los archivos de la última
+ejecución, para encontrarlos sin listar y ordenar la carpeta.
+"""
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+sufijo_indice_filas = '.indice.npz'
+archivo_ultimo_resultado = 'ultimo_resultado.json'
+VERSION_INDICE_FILAS = 1
+TAMANO_BLOQUE_LECTURA = 16 * 1024 * 1024 # Bytes por bloque al localizar los finales de línea
+
+def ruta_indice_filas(ruta_csv):
+    return os.path.splitext(ruta_csv)[0] + sufijo_indice_filas
+
+class RegistroGrupos:
+    """Cuenta las filas consecutivas de cada (metodo_asignacion, GENERO) a medida que se escriben."""
+
+    def __init__(self):
+        self.grupos = [] # [metodo_asignacion, GENERO, filas]
+
+    def agregar(self, metodo, genero, filas=1):
+        if self.grupos and self.grupos[-1][0] == metodo and self.grupos[-1][1] == genero:
+            self.grupos[-1][2] += filas
+        else:
+            self.grupos.append([metodo, genero, filas])
+
+    def agregar_columnas(self, metodos, generos):
+        """Agrega de una vez las filas de un DataFrame ya ordenado (columnas alineadas)."""
+        metodos = np.asarray(metodos, dtype=object)
+        generos = np.asarray(generos, dtype=object)
+        if not len(metodos):
+            return
+        cambios = np.flatnonzero((metodos[1:] != metodos[:-1]) | (generos[1:] != generos[:-1])) + 1
+        inicios = np.concatenate([[0], cambios])
+        for inicio, fin in zip(inicios, np.append(cambios, len(metodos))):
+            self.agregar(metodos[inicio], generos[inicio], int(fin - inicio))
+
+def finales_de_linea(ruta_csv):
+    """
+    Posición (exclusiva) del final de cada línea del CSV, cabecera incluida. Recorre el
+    archivo en binario por bloques, sin parsearlo; los saltos de línea entre comillas
+    no cuentan como final de fila.
+    """
+    finales = []
+    posicion = 0
+    paridad = 0
+    with open(ruta_csv, 'rb') as f:
+        while True:
+            bloque = f.read(TAMANO_BLOQUE_LECTURA)
+            if not bloque:
+                break
+            datos = np.frombuffer(bloque, dtype=np.uint8)
+            comillas = np.cumsum(datos == ord('"')) + paridad
+            finales.append(np.flatnonzero((datos == ord('\n')) & (comillas % 2 == 0)) + posicion + 1)
+            paridad = int(comillas[-1] % 2)
+            posicion += len(datos)
+    finales = np.concatenate(finales) if finales else np.array([], dtype=np.int64)
+    if posicion and (not len(finales) or finales[-1] < posicion):
+        finales = np.append(finales, posicion) # Última fila sin salto de línea
+    return finales.astype(np.int64)
+
+def escribir_indice_filas(ruta_csv, registro_grupos):
+    """Escribe el índice lateral de un CSV de resultados ya cerrado. Devuelve su ruta."""
+    finales = finales_de_linea(ruta_csv)
+    if not len(finales):
+        raise ValueError(f"El archivo '{ruta_csv}' está vacío; no se puede indexar.")
+    longitudes = np.diff(finales)
+    filas_grupos = sum(grupo[2] for grupo in registro_grupos.grupos)
+    if filas_grupos != len(longitudes):
+        raise ValueError(f"El índice de '{ruta_csv}' no cuadra: {len(longitudes)} filas en el archivo y {filas_grupos} en los grupos.")
+    estado = os.stat(ruta_csv)
+    ruta_indice = ruta_indice_filas(ruta_csv)
+    grupos = registro_grupos.grupos
+    np.savez_compressed(ruta_indice, version=VERSION_INDICE_FILAS, archivo=os.path.basename(ruta_csv),
+                        tamano=estado.st_size, mtime_ns=estado.st_mtime_ns, inicio_datos=finales[0],
+                        longitudes=longitudes.astype(np.uint32),
+                        grupos_metodo=np.array([str(g[0]) for g in grupos], dtype=str),
+                        grupos_genero=np.array([str(g[1]) for g in grupos], dtype=str),
+                        grupos_filas=np.array([g[2] for g in grupos], dtype=np.int64))
+    return ruta_indice
+
+class IndiceFilas:
+    """Índice lateral abierto: grupos con sus filas y lectura de filas sueltas por posición."""
+
+    def __init__(self, ruta_csv, datos):
+        self.ruta_csv = ruta_csv
+        self.tamano = int(datos['tamano'])
+        self.mtime_ns = int(datos['mtime_ns'])
+        self.inicio_datos = int(datos['inicio_datos'])
+        self.desplazamientos = self.inicio_datos + np.concatenate([[0], np.cumsum(datos['longitudes'], dtype=np.int64)])
+        self.filas = len(self.desplazamientos) - 1
+        filas_grupos = datos['grupos_filas']
+        self.grupos = pd.DataFrame({
+            'metodo_asignacion': datos['grupos_metodo'].astype(object),
+            'GENERO': datos['grupos_genero'].astype(object),
+            'filas': filas_grupos,
+            'primera_fila': np.concatenate([[0], np.cumsum(filas_grupos)[:-1]]).astype(np.int64),
+        })
+
+    @classmethod
+    def abrir(cls, ruta_csv):
+        """Abre el índice de 'ruta_csv'. Lanza FileNotFoundError si no hay índice o ValueError si no es válido."""
+        ruta_indice = ruta_indice_filas(ruta_csv)
+        if not os.path.exists(ruta_indice):
+            raise FileNotFoundError(f"No existe el índice de filas '{ruta_indice}'.")
+        with np.load(ruta_indice, allow_pickle=False) as datos:
+            if int(datos['version']) != VERSION_INDICE_FILAS:
+                raise ValueError(f"Versión de índice de filas no soportada en '{ruta_indice}': {int(datos['version'])}.")
+            indice = cls(ruta_csv, datos)
+        if not indice.vigente():
+            raise ValueError(f"El índice de filas '{ruta_indice}' no corresponde a la versión actual de '{ruta_csv}'.")
+        return indice
+
+    def vigente(self):
+        """True si el CSV no cambió (tamaño y fecha de modificación) desde que se indexó."""
+        estado = os.stat(self.ruta_csv)
+        return estado.st_size == self.tamano and estado.st_mtime_ns == self.mtime_ns
+
+    def leer_filas(self, filas, columnas=None):
+        """Lee las filas indicadas (números de fila de datos, desde 0) con seek; devuelve un DataFrame en ese orden."""
+        filas = np.asarray(filas, dtype=np.int64)
+        with open(self.ruta_csv, 'rb') as f:
+            partes = [f.read(self.inicio_datos)]
+            for fila in filas:
+                f.seek(self.desplazamientos[fila])
+                linea = f.read(self.desplazamientos[fila + 1] - self.desplazamientos[fila])
+                partes.append(linea if linea.endswith(b'\n') else linea + b'\n')
+        return pd.read_csv(io.StringIO(b''.join(partes).decode('utf-8-sig')), usecols=columnas)
+
+def registrar_ultimo_resultado(directorio_salida, fecha, rutas_completos, ruta_indice=None, filas=None):
+    """Anota en la carpeta de salida los archivos de resultados de la última ejecución."""
+    datos = {
+        'fecha': fecha,
+        'archivos': [os.path.basename(r) for r in rutas_completos],
+        'indice': os.path.basename(ruta_indice) if ruta_indice else None,
+        'filas': filas,
+    }
+    with open(os.path.join(directorio_salida, archivo_ultimo_resultado), 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+def leer_ultimo_resultado(directorio_salida):
+    """
+    Archivo de resultados de la última ejecución anotada en la carpeta, o None si no hay
+    anotación o sus archivos ya no existen. Si el CSV tiene índice de filas se prefiere
+    (permite leer solo las filas necesarias); si no, el Parquet, como en la búsqueda por nombre.
+    """
+    ruta = os.path.join(directorio_salida, archivo_ultimo_resultado)
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return None
+    rutas = [os.path.join(directorio_salida, a) for a in datos.get('archivos', [])]
+    if not rutas or not all(os.path.exists(r) for r in rutas):
+        return None
+    if datos.get('indice') and os.path.exists(os.path.join(directorio_salida, datos['indice'])):
+        return next(r for r in rutas if r.endswith('.csv'))
+    return sorted(rutas, key=lambda r: not r.endswith('.parquet'))[0]
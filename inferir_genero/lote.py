@@ -0,0 +1,145 @@
+"""
+Inferencia vectorizada por lotes sobre columnas de pandas/NumPy.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .diccionarios import diccionario_masculino, diccionario_femenino, codigo_compuesto_mas_largo
+from .indice import CODIGO_FEMENINO, CODIGO_MASCULINO, VistaDiccionario
+from .reglas import (grupos_terminaciones, reglas_terminacion_primer_nombre,
+                     reglas_terminacion_ultimo_nombre, reglas_fallback_primer_nombre)
+from .nucleo import inferir_genero_cacheado
+from .normalizacion import normalizar_lista
+
+def normalizar_columna(nombres):
+    """
+    Normaliza una columna deduplicando primero: los valores distintos se normalizan
+    juntos con la versión por columnas y el resultado se propaga a todas las filas.
+    """
+    solo_cadenas = isinstance(getattr(nombres, 'dtype', None), pd.StringDtype) # Columna str: sin más comprobaciones
+    serie = pd.Series(nombres, dtype=object)
+    if not solo_cadenas and pd.api.types.infer_dtype(serie, skipna=False) != 'string':
+        # factorize junta valores iguales de distinto tipo (None y NaN, 0 y False); normalizar
+        # un valor que no es str equivale a normalizar str(valor), así que se convierten antes
+        serie = pd.Series([v if isinstance(v, str) else str(v) for v in serie], index=serie.index, dtype=object)
+    try:
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    except UnicodeEncodeError:
+        # La tabla hash de pandas no admite surrogates sueltos: se normaliza sin deduplicar
+        return pd.Series(normalizar_lista(serie.tolist()), index=serie.index, dtype=object)
+    normalizados = np.array(normalizar_lista(unicos), dtype=object)
+    return pd.Series(normalizados[codigos], index=serie.index, dtype=object)
+
+def inferir_genero_unicos(nombres_norm, fila_a_fila=False):
+    """
+    Modo deduplicar-y-propagar: infiere solo los nombres normalizados distintos y
+    propaga los resultados a todas las filas. Devuelve (GENERO, metodo_asignacion).
+    """
+    serie = pd.Series(nombres_norm, dtype=object)
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    if fila_a_fila:
+        resultados = [inferir_genero_cacheado(n) for n in unicos]
+        generos_unicos = np.array([g for g, _ in resultados], dtype=object)
+        metodos_unicos = np.array([m for _, m in resultados], dtype=object)
+    else:
+        generos_unicos, metodos_unicos = inferir_genero_lote(unicos)
+    return generos_unicos[codigos], metodos_unicos[codigos]
+
+def _termina_en(serie, terminaciones):
+    """Equivalente vectorizado de str.endswith(tupla) sobre una Serie de strings."""
+    if isinstance(terminaciones, str):
+        terminaciones = (terminaciones,)
+    patron = '(?:' + '|'.join(re.escape(t) for t in terminaciones) + ')$'
+    return serie.str.contains(patron, regex=True).to_numpy(dtype=bool)
+
+def inferir_genero_lote(nombres_norm):
+    """
+    Versión vectorizada de inferir_genero_mejorado para una columna completa.
+    Recibe una Serie, lista o array de nombres ya normalizados y devuelve dos arrays
+    (GENERO, metodo_asignacion) idénticos a aplicar la función fila a fila.
+    """
+    serie = pd.Series(nombres_norm, dtype=object).fillna('').astype(str).reset_index(drop=True)
+    if serie.empty:
+        return np.array([], dtype=object), np.array([], dtype=object)
+
+    # Partes sin partículas, primer/segundo/último nombre significativo
+    sin_particulas = (serie.str.replace(r'(?<!\S)(?:de|del|la|los|las)(?!\S)', ' ', regex=True)
+                           .str.replace(r'\s+', ' ', regex=True)
+                           .str.strip())
+    primer_nombre = sin_particulas.str.partition(' ')[0]
+    segundo_nombre = sin_particulas.str.partition(' ')[2].str.partition(' ')[0]
+    ultimo_nombre = sin_particulas.str.rpartition(' ')[2]
+    varias_partes = sin_particulas.str.contains(' ', regex=False).to_numpy(dtype=bool)
+
+    def en_diccionario(col, diccionario):
+        if isinstance(diccionario, VistaDiccionario):
+            # Índice mapeado en memoria: una búsqueda O(1) por valor distinto de la columna
+            codigos, unicos = pd.factorize(col, use_na_sentinel=False)
+            presentes = np.fromiter((nombre in diccionario for nombre in unicos), dtype=bool, count=len(unicos))
+            return presentes[codigos]
+        return col.isin(diccionario).to_numpy(dtype=bool)
+
+    def igual_a(col, valor):
+        return (col == valor).to_numpy(dtype=bool)
+
+    primer_m = en_diccionario(primer_nombre, diccionario_masculino)
+    primer_f = en_diccionario(primer_nombre, diccionario_femenino)
+
+    def reglas_terminacion(col, tabla, aplicable):
+        """Traduce una tabla de reglas de terminación a condiciones vectorizadas."""
+        cumple_grupo = {}
+        def cumple(grupo):
+            if grupo not in cumple_grupo:
+                cumple_grupo[grupo] = _termina_en(col, grupos_terminaciones[grupo])
+            return cumple_grupo[grupo]
+        condiciones_tabla = []
+        for regla in tabla:
+            condicion = aplicable.copy()
+            for grupo in regla['requiere']:
+                condicion &= cumple(grupo)
+            for grupo in regla.get('prohibe', ()):
+                condicion &= ~cumple(grupo)
+            if regla.get('excluidos'):
+                condicion &= ~en_diccionario(col, regla['excluidos'])
+            if regla.get('solo_si_en') is not None:
+                condicion &= en_diccionario(col, regla['solo_si_en'])
+            if regla.get('excluir_diccionario_femenino'):
+                condicion &= ~en_diccionario(col, diccionario_femenino)
+            condiciones_tabla.append((condicion, regla['genero'], regla['metodo']))
+        return condiciones_tabla
+
+    # Compuesto más largo del diccionario al inicio del nombre (una vez por nombre distinto)
+    codigos_serie, unicos_serie = pd.factorize(serie, use_na_sentinel=False)
+    codigo_compuesto = np.fromiter((codigo_compuesto_mas_largo(n.split()) for n in unicos_serie),
+                                   dtype=np.int64, count=len(unicos_serie))[codigos_serie]
+
+    todos = np.ones(len(serie), dtype=bool)
+    # Heurísticas del último nombre (solo si difiere del primero)
+    evaluar_ultimo = varias_partes & ~(ultimo_nombre == primer_nombre).to_numpy(dtype=bool)
+
+    # Condiciones en el mismo orden de prioridad que inferir_genero_mejorado
+    reglas = [
+        (igual_a(serie, ''), 'desconocido', 'nombre_vacio'),
+        (en_diccionario(serie, diccionario_masculino), 'masculino', 'dic_completo'),
+        (en_diccionario(serie, diccionario_femenino), 'femenino', 'dic_completo'),
+        (igual_a(sin_particulas, ''), 'desconocido', 'solo_particulas'),
+        ((codigo_compuesto & CODIGO_MASCULINO) != 0, 'masculino', 'dic_compuesto_prefijo'),
+        ((codigo_compuesto & CODIGO_FEMENINO) != 0, 'femenino', 'dic_compuesto_prefijo'),
+        (primer_m & igual_a(primer_nombre, 'jose') & igual_a(segundo_nombre, 'maria'), 'masculino', 'dic_compuesto_especial_jose_maria'),
+        (primer_m, 'masculino', 'dic_primer_nombre'),
+        (primer_f & igual_a(primer_nombre, 'maria') & igual_a(segundo_nombre, 'jose'), 'femenino', 'dic_compuesto_especial_maria_jose'),
+        (primer_f, 'femenino', 'dic_primer_nombre'),
+    ]
+    reglas += reglas_terminacion(primer_nombre, reglas_terminacion_primer_nombre, todos)
+    reglas += [
+        (evaluar_ultimo & en_diccionario(ultimo_nombre, diccionario_masculino), 'masculino', 'dic_ultimo_nombre'),
+        (evaluar_ultimo & en_diccionario(ultimo_nombre, diccionario_femenino), 'femenino', 'dic_ultimo_nombre'),
+    ]
+    reglas += reglas_terminacion(ultimo_nombre, reglas_terminacion_ultimo_nombre, evaluar_ultimo)
+    reglas += reglas_terminacion(primer_nombre, reglas_fallback_primer_nombre, todos)
+    condiciones = [r[0] for r in reglas]
+    generos = np.select(condiciones, [r[1] for r in reglas], default='desconocido').astype(object)
+    metodos = np.select(condiciones, [r[2] for r in reglas], default='sin_regla_clara').astype(object)
+    return generos, metodos
@@ -0,0 +1,290 @@
+"""
+Motor de métricas de clasificación con NumPy (sin scikit-learn).
+
+Las etiquetas reales y predichas se codifican como enteros y la matriz de confusión se
+obtiene con un único np.bincount; si se pasan grupos (archivo de validación, método de
+asignación...) el mismo bincount produce una matriz por grupo. Todas las métricas
+(accuracy, precisión, recall, F1, soporte, promedios macro y ponderado) se derivan de
+esas matrices con las mismas convenciones que sklearn (zero_division=0).
+
+Los intervalos de confianza se estiman por bootstrap: cada bloque de remuestreos es una
+matriz de índices (remuestreos, n) que se traduce a celdas de la matriz de confusión y se
+cuenta con un único bincount; los bloques pueden repartirse en un pool de procesos.
+"""
+import io
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+REMUESTREOS_POR_DEFECTO = 1000
+CONFIANZA_POR_DEFECTO = 0.95
+INDICES_POR_BLOQUE = 4_000_000 # Tamaño de la matriz de índices de cada bloque (~16 MB en int32)
+
+def codificar(valores):
+    """
+    Codifica valores como enteros (factorize por hash; los textos se ordenan después,
+    así que los códigos siguen el orden alfabético). Devuelve (codigos, categorias).
+    """
+    codigos, categorias = pd.factorize(np.asarray(valores, dtype=object))
+    categorias = np.asarray([str(c) for c in categorias], dtype=object)
+    orden = np.argsort(categorias, kind='stable')
+    rango = np.empty_like(orden)
+    rango[orden] = np.arange(len(orden))
+    return rango[codigos].astype(np.int64), list(categorias[orden])
+
+def matrices_confusion(y_true, y_pred, etiquetas, grupos=None, numero_grupos=1, pesos=None):
+    """
+    Matriz de confusión (filas: real, columnas: predicho) con un solo bincount.
+    y_true/y_pred son códigos en [0, len(etiquetas)); grupos, códigos en [0, numero_grupos).
+    Con pesos, cada fila cuenta su peso (la matriz es de float).
+    Devuelve un array (numero_grupos, k, k); sin grupos, numero_grupos es 1.
+    """
+    k = len(etiquetas)
+    celdas = _celdas(y_true, y_pred, k, grupos)
+    return np.bincount(celdas, weights=pesos, minlength=numero_grupos * k * k).reshape(numero_grupos, k, k)
+
+def _celdas(y_true, y_pred, k, grupos=None):
+    celdas = np.asarray(y_true, dtype=np.int64) * k + np.asarray(y_pred, dtype=np.int64)
+    if grupos is not None:
+        celdas = celdas + np.asarray(grupos, dtype=np.int64) * (k * k)
+    return celdas
+
+def _dividir(numerador, denominador):
+    numerador = np.asarray(numerador, dtype=float)
+    denominador = np.asarray(denominador, dtype=float)
+    return np.divide(numerador, denominador, out=np.zeros(np.broadcast(numerador, denominador).shape), where=denominador != 0)
+
+def metricas_desde_matriz(matriz):
+    """
+    Métricas de una matriz (k, k) o de un lote de matrices (..., k, k), vectorizadas;
+    la matriz puede ser de conteos o de pesos. Devuelve un dict de arrays: precision,
+    recall, f1, soporte (por etiqueta) y accuracy, total, macro_* y ponderado_* (por matriz).
+    """
+    matriz = np.asarray(matriz)
+    aciertos = np.diagonal(matriz, axis1=-2, axis2=-1)
+    soporte = matriz.sum(axis=-1) # Reales por etiqueta
+    predichos = matriz.sum(axis=-2)
+    total = soporte.sum(axis=-1)
+    precision = _dividir(aciertos, predichos)
+    recall = _dividir(aciertos, soporte)
+    f1 = _dividir(2 * precision * recall, precision + recall)
+    metricas = {
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'soporte': soporte,
+        'accuracy': _dividir(aciertos.sum(axis=-1), total),
+        'total': total,
+    }
+    k = matriz.shape[-1]
+    for nombre, valores in (('precision', precision), ('recall', recall), ('f1', f1)):
+        metricas[f'macro_{nombre}'] = valores.sum(axis=-1) / k if k else np.zeros_like(total, dtype=float)
+        metricas[f'ponderado_{nombre}'] = _dividir((valores * soporte).sum(axis=-1), total)
+    return metricas
+
+def reporte_clasificacion(matriz, etiquetas):
+    """
+    Reporte por etiqueta con filas accuracy, macro avg y weighted avg, en el mismo formato
+    que pd.DataFrame(classification_report(..., output_dict=True)).transpose().
+    """
+    m = metricas_desde_matriz(matriz)
+    filas = {}
+    for i, etiqueta in enumerate(etiquetas):
+        filas[etiqueta] = [m['precision'][i], m['recall'][i], m['f1'][i], float(m['soporte'][i])]
+    filas['accuracy'] = [float(m['accuracy'])] * 4
+    filas['macro avg'] = [m['macro_precision'], m['macro_recall'], m['macro_f1'], float(m['total'])]
+    filas['weighted avg'] = [m['ponderado_precision'], m['ponderado_recall'], m['ponderado_f1'], float(m['total'])]
+    return pd.DataFrame.from_dict(filas, orient='index', columns=['precision', 'recall', 'f1-score', 'support']).astype(float)
+
+def formatear_reporte(df_reporte, decimales=2):
+    """Texto del reporte con la misma disposición que classification_report de sklearn."""
+    etiquetas = [e for e in df_reporte.index if e not in ('accuracy', 'macro avg', 'weighted avg')]
+    ancho = max([len(e) for e in etiquetas] + [len('weighted avg'), decimales])
+    cabecera = ['precision', 'recall', 'f1-score', 'support']
+    lineas = [' ' * ancho + ''.join(f'{c:>10}' for c in cabecera), '']
+    def fila(nombre, valores):
+        return f'{nombre:>{ancho}}' + ''.join(f'{v:>10.{decimales}f}' for v in valores[:3]) + f'{int(round(valores[3])):>10}'
+    for etiqueta in etiquetas:
+        lineas.append(fila(etiqueta, df_reporte.loc[etiqueta].tolist()))
+    lineas.append('')
+    total = df_reporte.loc['macro avg', 'support']
+    lineas.append(f"{'accuracy':>{ancho}}" + ' ' * 20 + f"{df_reporte.loc['accuracy', 'precision']:>10.{decimales}f}{int(round(total)):>10}")
+    for nombre in ('macro avg', 'weighted avg'):
+        lineas.append(fila(nombre, df_reporte.loc[nombre].tolist()))
+    return '\n'.join(lineas) + '\n'
+
+def metricas_por_grupo(matrices, nombres_grupos, columna, matrices_remuestreo=None, confianza=CONFIANZA_POR_DEFECTO):
+    """
+    Tabla con registros, aciertos y precisión (aciertos / registros) de cada grupo a partir
+    de un lote de matrices (g, k, k). Para un método de asignación es la precisión de la
+    regla: de los nombres que asignó, cuántos acertó. Se omiten los grupos sin registros.
+    Con matrices_remuestreo (b, g, k, k) añade el intervalo de confianza de la precisión.
+    """
+    m = metricas_desde_matriz(matrices)
+    aciertos = np.diagonal(matrices, axis1=-2, axis2=-1).sum(axis=-1)
+    df = pd.DataFrame({
+        columna: list(nombres_grupos),
+        'registros': m['total'],
+        'aciertos': aciertos,
+        'precision': m['accuracy'].round(4),
+    })
+    if matrices_remuestreo is not None:
+        remuestreo = metricas_desde_matriz(matrices_remuestreo)
+        # Un grupo pequeño puede quedar vacío en algún remuestreo: no aporta precisión
+        precision = np.where(remuestreo['total'] > 0, remuestreo['accuracy'], np.nan)
+        df['ic_inferior'], df['ic_superior'] = (v.round(4) for v in _percentiles(precision, confianza))
+    return df[df['registros'] > 0].sort_values(by=['precision', 'registros'], ascending=[True, False], ignore_index=True)
+
+def _percentiles(valores, confianza):
+    """Límites del intervalo percentil sobre el eje de los remuestreos (ignora NaN)."""
+    alfa = (1 - confianza) / 2
+    with np.errstate(all='ignore'):
+        inferior, superior = np.nanquantile(valores, [alfa, 1 - alfa], axis=0)
+    return inferior, superior
+
+def _remuestrear_bloque(celdas, numero_celdas, remuestreos, semilla):
+    """
+    Un bloque de remuestreos: matriz de índices (remuestreos, n) con reemplazo y un único
+    bincount, desplazando las celdas de cada remuestreo. Devuelve (remuestreos, numero_celdas).
+    """
+    generador = np.random.default_rng(semilla)
+    n = len(celdas)
+    indices = generador.integers(0, n, size=(remuestreos, n), dtype=np.int32 if n < 2**31 else np.int64)
+    desplazamiento = np.arange(remuestreos, dtype=np.int64)[:, None] * numero_celdas
+    conteos = np.bincount((celdas[indices] + desplazamiento).ravel(), minlength=remuestreos * numero_celdas)
+    return conteos.reshape(remuestreos, numero_celdas)
+
+_celdas_trabajador = None
+
+def _inicializar_trabajador_bootstrap(celdas):
+    """Cada proceso del pool recibe las celdas una sola vez, no con cada bloque."""
+    global _celdas_trabajador
+    _celdas_trabajador = celdas
+
+def _remuestrear_bloque_trabajador(numero_celdas, remuestreos, semilla):
+    return _remuestrear_bloque(_celdas_trabajador, numero_celdas, remuestreos, semilla)
+
+def matrices_bootstrap(y_true, y_pred, etiquetas, grupos=None, numero_grupos=1,
+                       remuestreos=REMUESTREOS_POR_DEFECTO, semilla=42, workers=1):
+    """
+    Matrices de confusión de 'remuestreos' remuestras bootstrap de las filas (con reemplazo),
+    por grupo: array (remuestreos, numero_grupos, k, k). Cada bloque tiene su propia semilla
+    derivada de 'semilla', así que el resultado no depende de 'workers'.
+    """
+    k = len(etiquetas)
+    numero_celdas = numero_grupos * k * k
+    celdas = _celdas(y_true, y_pred, k, grupos)
+    if remuestreos <= 0 or len(celdas) == 0:
+        return np.zeros((0, numero_grupos, k, k), dtype=np.int64)
+    por_bloque = max(1, min(remuestreos, INDICES_POR_BLOQUE // len(celdas)))
+    bloques = [min(por_bloque, remuestreos - inicio) for inicio in range(0, remuestreos, por_bloque)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(bloques))
+    if workers > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_trabajador_bootstrap,
+                                 initargs=(celdas,)) as pool:
+            partes = list(pool.map(_remuestrear_bloque_trabajador, [numero_celdas] * len(bloques), bloques, semillas))
+    else:
+        partes = [_remuestrear_bloque(celdas, numero_celdas, b, s) for b, s in zip(bloques, semillas)]
+    return np.concatenate(partes).reshape(remuestreos, numero_grupos, k, k)
+
+def intervalos_confianza(matriz, matrices_remuestreo, etiquetas, confianza=CONFIANZA_POR_DEFECTO):
+    """
+    Tabla con el valor observado y el intervalo percentil bootstrap de accuracy, de
+    precisión, recall y F1 por etiqueta y de los F1 macro y ponderado.
+    matriz es (k, k); matrices_remuestreo, (b, k, k).
+    """
+    observado = metricas_desde_matriz(matriz)
+    remuestreo = metricas_desde_matriz(matrices_remuestreo)
+    filas = [('accuracy', '', observado['accuracy'], remuestreo['accuracy'])]
+    for i, etiqueta in enumerate(etiquetas):
+        for nombre, clave in (('precision', 'precision'), ('recall', 'recall'), ('f1-score', 'f1')):
+            filas.append((nombre, etiqueta, observado[clave][i], remuestreo[clave][:, i]))
+    filas.append(('f1-score', 'macro avg', observado['macro_f1'], remuestreo['macro_f1']))
+    filas.append(('f1-score', 'weighted avg', observado['ponderado_f1'], remuestreo['ponderado_f1']))
+    inferiores, superiores = _percentiles(np.column_stack([r for _, _, _, r in filas]), confianza)
+    return pd.DataFrame({
+        'metrica': [nombre for nombre, _, _, _ in filas],
+        'etiqueta': [etiqueta for _, etiqueta, _, _ in filas],
+        'valor': [round(float(v), 4) for _, _, v, _ in filas],
+        'ic_inferior': inferiores.round(4),
+        'ic_superior': superiores.round(4),
+    })
+
+def leer_seccion_metricas(ruta, titulo):
+    """
+    Lee una sección ('Metricas por metodo_asignacion:', ...) de un archivo
+    *_ground_truth_metrics.csv como DataFrame; None si el archivo no la tiene.
+    """
+    with open(ruta, encoding='utf-8-sig') as f:
+        lineas = f.read().splitlines()
+    if titulo not in lineas:
+        return None
+    inicio = lineas.index(titulo) + 1
+    fin = inicio
+    while fin < len(lineas) and lineas[fin].strip():
+        fin += 1
+    return pd.read_csv(io.StringIO('\n'.join(lineas[inicio:fin])))
+
+def asignacion_neyman(tamanos, desviaciones, presupuesto, maximos=None, minimo=0):
+    """
+    Reparte 'presupuesto' filas entre estratos proporcionalmente a N_h * S_h (asignación de
+    Neyman, la de menor varianza del estimador estratificado para un total fijo), sin pasar
+    de maximos[h] y con al menos 'minimo' por estrato. Lo que sobra al topar un estrato se
+    reparte de nuevo entre los demás. Devuelve un array de enteros.
+    """
+    tamanos = np.asarray(tamanos, dtype=float)
+    maximos = np.asarray(tamanos if maximos is None else maximos).astype(np.int64)
+    prioridad = tamanos * np.asarray(desviaciones, dtype=float)
+    asignado = np.minimum(minimo, maximos)
+    presupuesto = min(int(presupuesto), int(maximos.sum()))
+    while asignado.sum() < presupuesto:
+        libres = asignado < maximos
+        restante = presupuesto - asignado.sum()
+        pesos = np.where(libres, prioridad, 0.0)
+        if pesos.sum() <= 0:
+            pesos = libres.astype(float)
+        cuota = restante * pesos / pesos.sum()
+        extra = np.minimum(np.floor(cuota).astype(np.int64), maximos - asignado)
+        if extra.sum() == 0:
+            # Cuotas menores que 1: una fila a cada uno de los estratos libres de mayor cuota
+            extra = np.zeros_like(asignado)
+            extra[np.argsort(-cuota, kind='stable')[:restante]] = 1
+            extra = np.minimum(extra, maximos - asignado)
+        asignado = asignado + extra
+    return asignado
+
+def estimacion_estratificada(aciertos, pesos, estratos, numero_estratos, confianza=CONFIANZA_POR_DEFECTO):
+    """
+    Accuracy poblacional a partir de una muestra estratificada con pesos (inversa de la
+    probabilidad de inclusión): estimador de razón por estrato, combinado con el peso total
+    de cada estrato, y su error estándar linealizado. Devuelve un dict con los totales
+    (accuracy, error_estandar, ic_inferior, ic_superior, poblacion) y arrays por estrato
+    (poblacion_estrato, registros_estrato, accuracy_estrato, error_estandar_estrato).
+    """
+    aciertos = np.asarray(aciertos, dtype=float)
+    pesos = np.asarray(pesos, dtype=float)
+    estratos = np.asarray(estratos, dtype=np.int64)
+    poblacion = np.bincount(estratos, weights=pesos, minlength=numero_estratos)
+    registros = np.bincount(estratos, minlength=numero_estratos)
+    p = _dividir(np.bincount(estratos, weights=pesos * aciertos, minlength=numero_estratos), poblacion)
+    residuos = _dividir(pesos * (aciertos - p[estratos]), poblacion[estratos])
+    varianza = (np.bincount(estratos, weights=residuos ** 2, minlength=numero_estratos)
+                * _dividir(registros, registros - 1))
+    total = poblacion.sum()
+    fraccion = _dividir(poblacion, total)
+    accuracy = float((fraccion * p).sum())
+    error_estandar = float(np.sqrt((fraccion ** 2 * varianza).sum()))
+    z = NormalDist().inv_cdf(1 - (1 - confianza) / 2)
+    return {
+        'accuracy': accuracy,
+        'error_estandar': error_estandar,
+        'ic_inferior': max(0.0, accuracy - z * error_estandar),
+        'ic_superior': min(1.0, accuracy + z * error_estandar),
+        'poblacion': float(total),
+        'poblacion_estrato': poblacion,
+        'registros_estrato': registros,
+        'accuracy_estrato': p,
+        'error_estandar_estrato': np.sqrt(varianza),
+    }
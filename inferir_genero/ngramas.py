@@ -0,0 +1,336 @@
+"""
+Modelo de n-gramas de caracteres: nivel de respaldo para los nombres sin regla clara.
+
+Naive Bayes multinomial sobre los n-gramas finales (sufijos de 1 a 6 letras) del primer
+nombre significativo, delimitado como '^nombre$': '$' marca el final y en los nombres
+cortos el sufijo más largo es el nombre completo. Los sufijos se asignan por hash a
+2**bits cubetas y el modelo completo es un único array float32 de log-razones
+masculino/femenino por cubeta, más unos escalares; se guarda con np.savez_compressed
+(sin pickle). Con los diccionarios y resultados del repositorio, usar solo sufijos
+acierta más que todos los n-gramas interiores, que añaden ruido.
+
+La puntuación es NumPy vectorizada por bloques: los nombres invertidos forman una matriz
+de bytes de ancho fijo, cada orden es un paso de un hash incremental sobre sus columnas
+y el logit es la suma de los pesos de las cubetas, calibrado con escalado de Platt sobre
+una partición de validación. Solo se usa tras fallar todas las reglas (metodo_asignacion
+'sin_regla_clara') y con probabilidad por encima del umbral.
+
+Entrenamiento (diccionarios + validación manual + opcionalmente resultados de la etapa 1):
+    python3 -m inferir_genero.ngramas --entrenar --resultados 01data_out/<fecha>_resultados_completos.csv
+    python3 -m inferir_genero.ngramas --medir 1000000      # nombres/s puntuando nombres sintéticos
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .diccionarios import directorio_datos, fuentes_diccionarios, lista_particulas
+from .indice import CODIGO_MASCULINO, leer_fuente
+
+ruta_modelo_por_defecto = os.path.join(directorio_datos, 'modelo_ngramas.npz')
+metodo_modelo = 'modelo_ngramas'
+VERSION_MODELO = 1
+UMBRAL_POR_DEFECTO = 0.8
+ORDENES_POR_DEFECTO = (2, 3, 4, 5, 6, 7) # Longitudes de sufijo contando '$' (y '^' si el nombre es corto)
+BITS_POR_DEFECTO = 17 # 131072 cubetas: 512 KB en float32 antes de comprimir
+TAMANO_BLOQUE = 262_144 # Nombres por bloque de puntuación (acota la memoria de las matrices de bytes)
+ALFA = 0.5 # Suavizado de Laplace de los conteos
+PUREZA_MINIMA = 0.8 # Fracción mínima de la etiqueta mayoritaria para usar un nombre de los resultados
+metodos_fiables = ('dic_completo', 'dic_primer_nombre', 'dic_compuesto_prefijo')
+
+_PRIMO = np.uint64(0x100000001B3)
+_MEZCLA = np.uint64(0x9E3779B97F4A7C15)
+_particulas = frozenset(lista_particulas)
+
+def primer_nombre_significativo(nombre_norm):
+    """Primer token que no es partícula ('' si no hay)."""
+    for token in nombre_norm.split():
+        if token not in _particulas:
+            return token
+    return ''
+
+def _matriz_bytes(tokens, ancho):
+    """Matriz (n, ancho) uint8 con '^token$' invertido (el final del nombre en la columna 0) y las longitudes."""
+    textos = [('^' + t + '$')[:-ancho - 1:-1] for t in tokens]
+    longitudes = np.fromiter((len(t) for t in textos), dtype=np.int64, count=len(textos))
+    matriz = np.array(textos, dtype=f'S{ancho}').view(np.uint8).reshape(len(textos), ancho)
+    return matriz, longitudes
+
+def _cubetas(matriz, longitudes, ordenes, bits):
+    """Por cada orden k: (cubeta del sufijo de k caracteres de cada nombre, si el nombre lo tiene)."""
+    h = np.zeros(matriz.shape[0], dtype=np.uint64)
+    desplazamiento = np.uint64(64 - bits)
+    for k in range(1, max(ordenes) + 1):
+        h = h * _PRIMO + matriz[:, k - 1].astype(np.uint64)
+        if k in ordenes:
+            yield (((h ^ np.uint64(k)) * _MEZCLA) >> desplazamiento).astype(np.int64), longitudes >= k
+
+def _sigmoide(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x)) # Sin desbordamiento para logits grandes
+
+class ModeloNgramas:
+    """Pesos por cubeta y escalares del modelo; puntúa lotes de nombres con NumPy."""
+
+    def __init__(self, pesos, sesgo, sesgo_por_ngrama, ordenes=ORDENES_POR_DEFECTO, escala=1.0, desplazamiento=0.0):
+        self.pesos = np.asarray(pesos, dtype=np.float32)
+        self.bits = int(np.log2(len(self.pesos)))
+        self.sesgo = float(sesgo)
+        self.sesgo_por_ngrama = float(sesgo_por_ngrama)
+        self.ordenes = tuple(int(k) for k in ordenes)
+        self.escala = float(escala)
+        self.desplazamiento = float(desplazamiento)
+
+    @classmethod
+    def abrir(cls, ruta=ruta_modelo_por_defecto):
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No existe el modelo de n-gramas '{ruta}'. Entrénelo con: python3 -m inferir_genero.ngramas --entrenar")
+        with np.load(ruta, allow_pickle=False) as datos:
+            if int(datos['version']) != VERSION_MODELO:
+                raise ValueError(f"Versión de modelo no soportada en '{ruta}': {int(datos['version'])}.")
+            return cls(datos['pesos'], datos['sesgo'], datos['sesgo_por_ngrama'], datos['ordenes'],
+                       datos['escala'], datos['desplazamiento'])
+
+    def guardar(self, ruta=ruta_modelo_por_defecto):
+        np.savez_compressed(ruta, version=VERSION_MODELO, pesos=self.pesos, sesgo=self.sesgo,
+                            sesgo_por_ngrama=self.sesgo_por_ngrama, ordenes=np.array(self.ordenes),
+                            escala=self.escala, desplazamiento=self.desplazamiento)
+        return ruta
+
+    def logit_bruto(self, tokens):
+        """Log-razón masculino/femenino de Naive Bayes (sin calibrar) para cada token."""
+        tokens = list(tokens)
+        logits = np.empty(len(tokens), dtype=np.float64)
+        for inicio in range(0, len(tokens), TAMANO_BLOQUE):
+            matriz, longitudes = _matriz_bytes(tokens[inicio:inicio + TAMANO_BLOQUE], max(self.ordenes))
+            suma = np.full(len(longitudes), self.sesgo)
+            for cubetas, validas in _cubetas(matriz, longitudes, self.ordenes, self.bits):
+                suma += np.where(validas, self.pesos[cubetas] + self.sesgo_por_ngrama, 0.0)
+            logits[inicio:inicio + len(longitudes)] = suma
+        return logits
+
+    def probabilidad_masculino(self, tokens):
+        """Probabilidad calibrada de que cada token sea un nombre masculino."""
+        return _sigmoide(self.escala * self.logit_bruto(tokens) + self.desplazamiento)
+
+    def clasificar(self, nombres_norm, umbral=UMBRAL_POR_DEFECTO):
+        """
+        Clasifica nombres normalizados por su primer nombre significativo (cada token
+        distinto se puntúa una vez). Devuelve (GENERO, probabilidad del género predicho):
+        'masculino'/'femenino' si esa probabilidad llega al umbral, 'desconocido' si no.
+        """
+        posiciones = {}
+        codigos = np.fromiter((posiciones.setdefault(primer_nombre_significativo(n), len(posiciones)) for n in nombres_norm),
+                              dtype=np.int64)
+        p_masculino = self.probabilidad_masculino(list(posiciones))[codigos]
+        probabilidad = np.maximum(p_masculino, 1.0 - p_masculino)
+        generos = np.where(p_masculino >= 0.5, 'masculino', 'femenino').astype(object)
+        generos[probabilidad < umbral] = 'desconocido'
+        return generos, probabilidad
+
+# --- ENTRENAMIENTO ---
+def entrenar(tokens, etiquetas, ordenes=ORDENES_POR_DEFECTO, bits=BITS_POR_DEFECTO, alfa=ALFA):
+    """
+    Ajusta Naive Bayes multinomial sobre los sufijos con hash. etiquetas: 1 masculino, 0 femenino.
+    Las cubetas sin ejemplos quedan con peso 0; su log-razón común va en sesgo_por_ngrama.
+    """
+    etiquetas = np.asarray(etiquetas, dtype=np.int64)
+    conteos = np.zeros((2, 2 ** bits))
+    for inicio in range(0, len(tokens), TAMANO_BLOQUE):
+        matriz, longitudes = _matriz_bytes(tokens[inicio:inicio + TAMANO_BLOQUE], max(ordenes))
+        clase = etiquetas[inicio:inicio + TAMANO_BLOQUE]
+        for cubetas, validas in _cubetas(matriz, longitudes, ordenes, bits):
+            indices = clase[validas] * (2 ** bits) + cubetas[validas]
+            conteos += np.bincount(indices, minlength=2 * 2 ** bits).reshape(2, -1)
+    totales = conteos.sum(axis=1, keepdims=True) + alfa * 2 ** bits
+    log_p = np.log((conteos + alfa) / totales)
+    sesgo_por_ngrama = float(np.log(alfa / totales[1, 0]) - np.log(alfa / totales[0, 0]))
+    pesos = (log_p[1] - log_p[0]) - sesgo_por_ngrama
+    n_masculinos = max(int(etiquetas.sum()), 1)
+    n_femeninos = max(len(etiquetas) - int(etiquetas.sum()), 1)
+    return ModeloNgramas(pesos, np.log(n_masculinos / n_femeninos), sesgo_por_ngrama, ordenes)
+
+def ajustar_platt(logits, etiquetas, iteraciones=50):
+    """
+    Escalado de Platt: (escala, desplazamiento) que minimizan la log-pérdida, por Newton con
+    retroceso. Usa los objetivos suavizados de Platt para no divergir si los datos son separables.
+    """
+    x = np.asarray(logits, dtype=float)
+    y = np.asarray(etiquetas, dtype=float)
+    positivos, negativos = y.sum(), len(y) - y.sum()
+    y = np.where(y == 1, (positivos + 1) / (positivos + 2), 1 / (negativos + 2))
+
+    def perdida(parametros):
+        z = parametros[0] * x + parametros[1]
+        return (np.logaddexp(0, z) - y * z).sum()
+
+    parametros = np.array([1.0, 0.0])
+    actual = perdida(parametros)
+    for _ in range(iteraciones):
+        p = _sigmoide(parametros[0] * x + parametros[1])
+        w = p * (1 - p) + 1e-12
+        gradiente = np.array([((p - y) * x).sum(), (p - y).sum()])
+        hessiana = np.array([[(w * x * x).sum(), (w * x).sum()], [(w * x).sum(), w.sum()]]) + 1e-9 * np.eye(2)
+        paso = np.linalg.solve(hessiana, gradiente)
+        factor = 1.0
+        while factor > 1e-6 and perdida(parametros - factor * paso) > actual:
+            factor /= 2
+        if factor <= 1e-6:
+            break
+        parametros -= factor * paso
+        nueva = perdida(parametros)
+        if actual - nueva < 1e-10:
+            break
+        actual = nueva
+    return float(parametros[0]), float(parametros[1])
+
+def ejemplos_diccionarios(fuentes=fuentes_diccionarios):
+    """{token: 1/0} con el primer nombre significativo de cada entrada de los diccionarios."""
+    ejemplos = {}
+    for codigo, ruta in fuentes.items():
+        for nombre in leer_fuente(ruta):
+            token = primer_nombre_significativo(nombre)
+            if token:
+                ejemplos[token] = 1 if codigo == CODIGO_MASCULINO else 0
+    return ejemplos
+
+def _ejemplos_por_mayoria(tokens, generos):
+    """{token: 1/0} por token, si su etiqueta mayoritaria alcanza PUREZA_MINIMA."""
+    import pandas as pd
+    df = pd.DataFrame({'token': tokens, 'masculino': np.asarray(generos) == 'masculino'})
+    df = df[df['token'] != '']
+    fraccion = df.groupby('token')['masculino'].mean()
+    fraccion = fraccion[(fraccion >= PUREZA_MINIMA) | (fraccion <= 1 - PUREZA_MINIMA)]
+    return {token: int(f >= 0.5) for token, f in fraccion.items()}
+
+def ejemplos_validacion(directorio_validacion):
+    """{token: 1/0} de los nombres validados a mano (GENERO_VALIDADO masculino/femenino)."""
+    from .columnar import columnas_resultados, extensiones_resultados, leer_resultados
+    from .normalizacion import normalizar_lista
+    tokens, generos = [], []
+    if not os.path.isdir(directorio_validacion):
+        return {}
+    for archivo in sorted(os.listdir(directorio_validacion)):
+        if not archivo.endswith(tuple('_muestras_para_validacion' + ext for ext in extensiones_resultados)):
+            continue
+        ruta = os.path.join(directorio_validacion, archivo)
+        if not {'nombre_original', 'GENERO_VALIDADO'} <= set(columnas_resultados(ruta)):
+            continue
+        df = leer_resultados(ruta, columnas=['nombre_original', 'GENERO_VALIDADO']).dropna()
+        validado = df['GENERO_VALIDADO'].astype(str).str.strip().str.lower()
+        df = df[validado.isin(['masculino', 'femenino'])]
+        tokens += [primer_nombre_significativo(n) for n in normalizar_lista(df['nombre_original'].astype(str))]
+        generos += validado[df.index].tolist()
+    return _ejemplos_por_mayoria(tokens, generos)
+
+def ejemplos_resultados(rutas):
+    """
+    Supervisión indirecta: cada nombre significativo de los nombres resueltos por diccionario
+    en la etapa 1 (metodos_fiables) toma el GENERO del nombre ("maria fernanda" femenino ->
+    "fernanda" femenino). Los nombres usados en ambos géneros se descartan por pureza.
+    """
+    from .columnar import leer_resultados
+    from .normalizacion import normalizar_lista
+    tokens, generos = [], []
+    for ruta in rutas:
+        df = leer_resultados(ruta, columnas=['nombre_original', 'GENERO', 'metodo_asignacion'],
+                             filtros={'metodo_asignacion': list(metodos_fiables)})
+        for nombre, genero in zip(normalizar_lista(df['nombre_original'].astype(str)), df['GENERO'].astype(str)):
+            for token in nombre.split():
+                if token not in _particulas:
+                    tokens.append(token)
+                    generos.append(genero)
+    return _ejemplos_por_mayoria(tokens, generos)
+
+def entrenar_desde_fuentes(directorio_validacion='02data_validation', rutas_resultados=(), bits=BITS_POR_DEFECTO,
+                           umbral=UMBRAL_POR_DEFECTO, fraccion_validacion=0.2, semilla=42):
+    """
+    Reúne los ejemplos (validación manual > diccionarios > resultados, en ese orden de
+    prioridad si se contradicen), mide el modelo sobre una partición por token, calibra
+    con ella y reentrena con todos los ejemplos. Devuelve (modelo, resumen).
+    """
+    ejemplos = ejemplos_resultados(rutas_resultados) if rutas_resultados else {}
+    fuentes = {'resultados': len(ejemplos)}
+    diccionarios = ejemplos_diccionarios()
+    validacion = ejemplos_validacion(directorio_validacion)
+    ejemplos.update(diccionarios)
+    ejemplos.update(validacion)
+    fuentes.update(diccionarios=len(diccionarios), validacion=len(validacion))
+    if len(set(ejemplos.values())) < 2:
+        raise ValueError("Se necesitan ejemplos de ambos géneros para entrenar el modelo.")
+
+    tokens = np.array(sorted(ejemplos), dtype=object)
+    etiquetas = np.array([ejemplos[t] for t in tokens], dtype=np.int64)
+    reservados = np.random.default_rng(semilla).random(len(tokens)) < fraccion_validacion
+    if reservados.sum() < 10 or (~reservados).sum() < 10:
+        reservados = np.zeros(len(tokens), dtype=bool)
+
+    resumen = {'ejemplos': len(tokens), 'masculinos': int(etiquetas.sum()), 'fuentes': fuentes}
+    escala, desplazamiento = 1.0, 0.0
+    if reservados.any():
+        parcial = entrenar(list(tokens[~reservados]), etiquetas[~reservados], bits=bits)
+        logits = parcial.logit_bruto(list(tokens[reservados]))
+        escala, desplazamiento = ajustar_platt(logits, etiquetas[reservados])
+        p = _sigmoide(escala * logits + desplazamiento)
+        acierto = (p >= 0.5) == (etiquetas[reservados] == 1)
+        cubiertos = np.maximum(p, 1 - p) >= umbral
+        resumen.update(reservados=int(reservados.sum()), accuracy=float(acierto.mean()),
+                       cobertura_umbral=float(cubiertos.mean()),
+                       accuracy_umbral=float(acierto[cubiertos].mean()) if cubiertos.any() else 0.0)
+    modelo = entrenar(list(tokens), etiquetas, bits=bits)
+    modelo.escala, modelo.desplazamiento = escala, desplazamiento
+    return modelo, resumen
+
+def medir_velocidad(modelo, cantidad, umbral=UMBRAL_POR_DEFECTO, semilla=42):
+    """Clasifica 'cantidad' nombres sintéticos normalizados y devuelve (segundos, nombres/s)."""
+    from .corpus import generar_nombres
+    from .normalizacion import normalizar_lista
+    nombres = normalizar_lista([n for bloque in generar_nombres(cantidad, semilla=semilla) for n in bloque])
+    inicio = time.perf_counter()
+    modelo.clasificar(nombres, umbral)
+    segundos = time.perf_counter() - inicio
+    return segundos, len(nombres) / segundos if segundos else 0.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrena o mide el modelo de n-gramas de respaldo para nombres sin regla clara.")
+    parser.add_argument("--entrenar", action="store_true", help="Entrena el modelo y lo guarda en --modelo.")
+    parser.add_argument("--modelo", type=str, default=ruta_modelo_por_defecto,
+                        help=f"Ruta del archivo del modelo (por defecto: {ruta_modelo_por_defecto}).")
+    parser.add_argument("--validation_dir", type=str, default="02data_validation",
+                        help="Carpeta con los archivos de validación manual (por defecto: 02data_validation).")
+    parser.add_argument("--resultados", nargs="+", default=[],
+                        help="Archivos *_resultados_completos de la etapa 1 para supervisión indirecta (recomendado).")
+    parser.add_argument("--bits", type=int, default=BITS_POR_DEFECTO,
+                        help=f"Log2 del número de cubetas de n-gramas (por defecto: {BITS_POR_DEFECTO}).")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_POR_DEFECTO,
+                        help=f"Probabilidad mínima para asignar género (por defecto: {UMBRAL_POR_DEFECTO}).")
+    parser.add_argument("--medir", type=int, default=0,
+                        help="Clasifica N nombres sintéticos con el modelo y muestra nombres/s.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.entrenar:
+            if not args.resultados:
+                print("⚠️ Advertencia: Sin --resultados solo se entrena con los diccionarios y la validación manual (pocos ejemplos).")
+            inicio = time.perf_counter()
+            modelo, resumen = entrenar_desde_fuentes(args.validation_dir, args.resultados, args.bits, args.umbral)
+            ruta = modelo.guardar(args.modelo)
+            fuentes = resumen['fuentes']
+            print(f"✅ Modelo '{ruta}' entrenado en {time.perf_counter() - inicio:.2f}s con {resumen['ejemplos']} nombres "
+                  f"({resumen['masculinos']} masculinos; {fuentes['diccionarios']} de diccionarios, {fuentes['validacion']} validados, "
+                  f"{fuentes['resultados']} de resultados), {os.path.getsize(ruta) / 1024:.0f} KB.")
+            if 'accuracy' in resumen:
+                print(f"ℹ️ Partición de validación ({resumen['reservados']} nombres): accuracy {resumen['accuracy']:.3f}; "
+                      f"con umbral {args.umbral}: cobertura {resumen['cobertura_umbral']:.1%}, accuracy {resumen['accuracy_umbral']:.3f}.")
+        if args.medir:
+            segundos, velocidad = medir_velocidad(ModeloNgramas.abrir(args.modelo), args.medir, args.umbral)
+            print(f"ℹ️ {args.medir} nombres clasificados por el modelo en {segundos:.2f}s ({velocidad:,.0f} nombres/s).")
+        if not args.entrenar and not args.medir:
+            parser.print_help()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+"""
+Normalización rápida de nombres: minúsculas, sin tildes, solo [a-z ] y espacios simples.
+
+Equivale a la normalización original (lower/strip, NFKD, encode ASCII 'ignore' y dos
+regex) pero sin cadenas intermedias:
+  - Nombres ASCII: lower() y borrado de caracteres no permitidos sobre bytes en C.
+  - Resto: una sola llamada a str.translate con una tabla carácter -> texto plegado,
+    precalculada para los rangos latinos y completada bajo demanda para otros.
+  - Columnas: todos los valores se unen en un solo texto separado por NUL y se aplica
+    la cadena original (lower, NFKD, ASCII, borrado en bytes) una sola vez, con unas
+    pocas llamadas en C en lugar de una por nombre.
+
+La tabla es exacta porque NFKD y el filtro ASCII se aplican carácter a carácter (la
+reordenación canónica solo mueve marcas combinantes, que se descartan) y lower() solo
+depende del contexto en la sigma final, que tampoco es ASCII.
+"""
+import re
+import unicodedata
+
+_permitidos_ascii = set('abcdefghijklmnopqrstuvwxyz ')
+_borrar_ascii = bytes(b for b in range(128) if chr(b) not in _permitidos_ascii) # Tras lower()
+_espacios_multiples = re.compile(' {2,}')
+_SEPARADOR = '\x00' # Separador de valores en la versión por columnas
+_borrar_ascii_columnas = _borrar_ascii.replace(_SEPARADOR.encode('ascii'), b'')
+
+def plegar_caracter(c):
+    """Texto [a-z ]* al que la normalización original reduce el carácter c."""
+    plegado = unicodedata.normalize('NFKD', c.lower()).encode('ASCII', 'ignore').decode('ascii')
+    return ''.join(x for x in plegado if x in _permitidos_ascii)
+
+class _TablaPlegado(dict):
+    """Tabla para str.translate: código -> texto plegado (None si se elimina)."""
+
+    def __missing__(self, codigo):
+        plegado = plegar_caracter(chr(codigo)) or None
+        self[codigo] = plegado
+        return plegado
+
+tabla_plegado = _TablaPlegado()
+for _codigo in list(range(0x250)) + list(range(0x1E00, 0x1F00)) + list(range(0x2000, 0x2070)) + list(range(0xFF00, 0xFF60)):
+    tabla_plegado[_codigo]
+
+def normalizar_nombre_rapido(nombre):
+    if not isinstance(nombre, str):
+        nombre = str(nombre)
+    if nombre.isascii():
+        nombre = nombre.encode('ascii').lower().translate(None, _borrar_ascii).decode('ascii')
+    else:
+        nombre = nombre.translate(tabla_plegado)
+    return ' '.join(nombre.split())
+
+def normalizar_lista(nombres):
+    """
+    Versión por columnas: normaliza una secuencia de valores con unas pocas pasadas en C
+    sobre un único texto. Devuelve una lista alineada con 'nombres'.
+    """
+    textos = [n if isinstance(n, str) else str(n) for n in nombres]
+    if not textos:
+        return []
+    bloque = _SEPARADOR.join(textos)
+    if bloque.count(_SEPARADOR) != len(textos) - 1:
+        return [normalizar_nombre_rapido(t) for t in textos] # Algún valor contiene el separador
+    if bloque.isascii():
+        datos = bloque.encode('ascii').lower()
+    else:
+        # Sobre el texto completo NFKD es una sola pasada en C; el NUL no se combina con nada.
+        # Las mayúsculas que aparecen tras NFKD ('™' -> 'TM') se borran, como en la original
+        datos = unicodedata.normalize('NFKD', bloque.lower()).encode('ascii', 'ignore')
+    bloque = datos.translate(None, _borrar_ascii_columnas).decode('ascii')
+    # Los espacios (único blanco que sobrevive) se colapsan y se recortan en cada valor
+    bloque = _espacios_multiples.sub(' ', bloque)
+    bloque = bloque.replace(' ' + _SEPARADOR, _SEPARADOR).replace(_SEPARADOR + ' ', _SEPARADOR)
+    return bloque.strip(' ').split(_SEPARADOR)
@@ -0,0 +1,163 @@
+"""
+Núcleo de la inferencia de género: normalización, reglas y cachés.
+
+Este módulo no depende de pandas, de modo que predict()/predict_many() pueden
+usarse desde servicios sensibles a la latencia sin el coste de importarlo.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from .diccionarios import diccionario_masculino, diccionario_femenino, lista_particulas, codigo_compuesto_mas_largo
+from .indice import CODIGO_MASCULINO, CODIGO_FEMENINO
+from .normalizacion import normalizar_nombre_rapido
+from .reglas import _evaluar_reglas, _reglas_primer_nombre, _reglas_ultimo_nombre, _reglas_fallback
+
+def normalizar_nombre_original(nombre):
+    """Normalización original; se conserva como referencia de paridad de normalizar_nombre."""
+    if not isinstance(nombre, str):
+        nombre = str(nombre)
+    nombre = nombre.lower().strip()
+    # Mantener esta normalización para la búsqueda inicial en diccionario
+    nombre_unicode = unicodedata.normalize('NFKD', nombre).encode('ASCII', 'ignore').decode('utf-8')
+    nombre_limpio = re.sub(r'[^a-z ]', '', nombre_unicode) # Solo minúsculas y espacios
+    nombre_limpio = re.sub(r'\s+', ' ', nombre_limpio).strip() # Normalizar múltiples espacios a uno solo
+    return nombre_limpio
+
+# Misma salida que normalizar_nombre_original con tabla de plegado y camino rápido ASCII
+normalizar_nombre = normalizar_nombre_rapido
+
+def inferir_genero_mejorado(nombre_norm):
+    if not nombre_norm:
+        return 'desconocido', 'nombre_vacio'
+
+    # 1. Búsqueda en diccionario del nombre completo
+    if nombre_norm in diccionario_masculino:
+        return 'masculino', 'dic_completo'
+    if nombre_norm in diccionario_femenino:
+        return 'femenino', 'dic_completo'
+
+    # 2. Procesamiento de nombres compuestos (si no se encontró el nombre completo)
+    partes = nombre_norm.split()
+    
+    # Eliminar partículas para el análisis de partes individuales
+    partes_sin_particulas = [p for p in partes if p not in lista_particulas]
+
+    if not partes_sin_particulas: # Si solo eran partículas
+        return 'desconocido', 'solo_particulas'
+
+    # 2.0. Compuesto más largo del diccionario con el que empieza el nombre
+    #      (ej. "maria del carmen rodriguez" -> "maria del carmen")
+    codigo_compuesto = codigo_compuesto_mas_largo(partes)
+    if codigo_compuesto & CODIGO_MASCULINO:
+        return 'masculino', 'dic_compuesto_prefijo'
+    if codigo_compuesto & CODIGO_FEMENINO:
+        return 'femenino', 'dic_compuesto_prefijo'
+
+    # 2.1. Analizar el primer nombre significativo
+    primer_nombre = partes_sin_particulas[0]
+    if primer_nombre in diccionario_masculino:
+        # Considerar casos como "Jose Maria" (M) vs "Maria Jose" (F)
+        # Si el primer nombre es Jose y hay un segundo nombre Maria, es Masculino
+        if primer_nombre == "jose" and len(partes_sin_particulas) > 1 and partes_sin_particulas[1] == "maria":
+            return 'masculino', 'dic_compuesto_especial_jose_maria'
+        return 'masculino', 'dic_primer_nombre'
+    
+    if primer_nombre in diccionario_femenino:
+        # Si el primer nombre es Maria y hay un segundo nombre Jose, es Femenino
+        if primer_nombre == "maria" and len(partes_sin_particulas) > 1 and partes_sin_particulas[1] == "jose":
+            return 'femenino', 'dic_compuesto_especial_maria_jose'
+        return 'femenino', 'dic_primer_nombre'
+
+    # 3. Heurísticas aplicadas al primer nombre significativo (o al nombre completo si es simple)
+    resultado = _heuristica_primer_nombre(primer_nombre)
+    if resultado is not None:
+        return resultado
+
+    # 4. Heurísticas aplicadas al último nombre significativo si hay más de uno
+    if len(partes_sin_particulas) > 1:
+        ultimo_nombre = partes_sin_particulas[-1]
+        if ultimo_nombre != primer_nombre: # Evitar re-evaluar si solo hay un nombre significativo
+            resultado = _clasificar_ultimo_nombre(ultimo_nombre)
+            if resultado is not None:
+                return resultado
+
+
+    # 5. Fallback MUY conservador (última letra del primer nombre significativo)
+    resultado = _evaluar_reglas(primer_nombre, _reglas_fallback)
+    if resultado is not None:
+        return resultado
+
+    return 'desconocido', 'sin_regla_clara'
+
+# --- CACHÉ POR TOKEN Y POR NOMBRE ---
+# Los primeros nombres se repiten cientos de miles de veces ("maria", "jose"), así que
+# las heurísticas por token y la normalización se memorizan con un LRU acotado.
+# Si se modifican los diccionarios en caliente hay que llamar a limpiar_caches().
+TAMANO_MAXIMO_CACHE = 200_000
+
+@lru_cache(maxsize=TAMANO_MAXIMO_CACHE)
+def _heuristica_primer_nombre(nombre_a_evaluar_heuristicas):
+    """
+    Heurísticas de terminación aplicadas al primer nombre significativo.
+    Devuelve (genero, metodo) o None si ninguna regla aplica.
+    """
+    return _evaluar_reglas(nombre_a_evaluar_heuristicas, _reglas_primer_nombre)
+
+@lru_cache(maxsize=TAMANO_MAXIMO_CACHE)
+def _clasificar_ultimo_nombre(ultimo_nombre):
+    """
+    Diccionario y heurísticas aplicadas al último nombre significativo.
+    Devuelve (genero, metodo) o None si ninguna regla aplica.
+    """
+    if ultimo_nombre in diccionario_masculino:
+        return 'masculino', 'dic_ultimo_nombre'
+    if ultimo_nombre in diccionario_femenino:
+        return 'femenino', 'dic_ultimo_nombre'
+
+    # Aplicar heurísticas al último nombre también
+    return _evaluar_reglas(ultimo_nombre, _reglas_ultimo_nombre)
+
+normalizar_nombre_cacheado = lru_cache(maxsize=TAMANO_MAXIMO_CACHE)(normalizar_nombre)
+inferir_genero_cacheado = lru_cache(maxsize=TAMANO_MAXIMO_CACHE)(inferir_genero_mejorado)
+
+_funciones_cacheadas = {
+    'normalizar_nombre': normalizar_nombre_cacheado,
+    'inferir_genero_mejorado': inferir_genero_cacheado,
+    'heuristica_primer_nombre': _heuristica_primer_nombre,
+    'clasificar_ultimo_nombre': _clasificar_ultimo_nombre,
+}
+
+def estadisticas_cache():
+    """Devuelve aciertos, fallos y ocupación de cada caché LRU."""
+    estadisticas = {}
+    for nombre, funcion in _funciones_cacheadas.items():
+        info = funcion.cache_info()
+        total = info.hits + info.misses
+        estadisticas[nombre] = {
+            'aciertos': info.hits,
+            'fallos': info.misses,
+            'tasa_aciertos': info.hits / total if total else 0.0,
+            'tamano': info.currsize,
+            'tamano_maximo': info.maxsize,
+        }
+    return estadisticas
+
+def limpiar_caches():
+    """Vacía todas las cachés (necesario tras modificar los diccionarios)."""
+    for funcion in _funciones_cacheadas.values():
+        funcion.cache_clear()
+
+def predict(nombre):
+    """
+    Normaliza e infiere el género de un único nombre.
+    Devuelve (GENERO, metodo_asignacion).
+    """
+    return inferir_genero_cacheado(normalizar_nombre_cacheado(nombre))
+
+def predict_many(nombres):
+    """
+    Normaliza e infiere el género de una secuencia de nombres sin usar pandas.
+    Devuelve una lista de tuplas (GENERO, metodo_asignacion) en el mismo orden.
+    """
+    return [inferir_genero_cacheado(normalizar_nombre_cacheado(nombre)) for nombre in nombres]
@@ -0,0 +1,181 @@
+"""
+Modo de instrumentación de las reglas (opt-in, --instrumentar en la CLI).
+
+Cada nombre distinto se infiere con el mismo inferir_genero_mejorado de la inferencia
+normal. Mientras dura el perfil, los diccionarios, la búsqueda de compuestos y la
+evaluación de reglas que usa nucleo se sustituyen por envoltorios que cuentan cada
+búsqueda en diccionario, cada máscara de terminaciones y cada regla revisada, y las
+heurísticas por token se llaman sin su caché. Por cada método de asignación se acumulan
+aciertos (nombres distintos y filas), tiempo y evaluaciones, y se escribe un informe CSV
+junto a _resultados_completos.csv.
+
+Desactivado no cuesta nada: la inferencia normal no pasa por este módulo ni cambia.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from . import nucleo
+
+sufijo_informe = '_perfil_reglas.csv'
+columnas_informe = ['metodo_asignacion', 'GENERO', 'nombres_distintos', 'filas', 'porcentaje_filas',
+                    'tiempo_total_ms', 'tiempo_medio_us', 'evaluaciones_medias']
+
+class _PertenenciaContada:
+    """Envoltorio de un diccionario que suma una evaluación por cada 'in'."""
+
+    def __init__(self, conjunto, contador):
+        self._conjunto = conjunto
+        self._contador = contador
+
+    def __contains__(self, nombre):
+        self._contador[0] += 1
+        return nombre in self._conjunto
+
+@contextmanager
+def _cascada_contada(contador):
+    """
+    Sustituye en nucleo, mientras dura el bloque, los diccionarios, codigo_compuesto_mas_largo
+    y _evaluar_reglas por versiones que suman en contador[0], y las heurísticas por token
+    memorizadas por sus funciones sin LRU (que resuelven esos mismos nombres de nucleo).
+    No es seguro si otro hilo infiere a la vez en el mismo proceso.
+    """
+    evaluar_reglas = nucleo._evaluar_reglas
+    codigo_compuesto_mas_largo = nucleo.codigo_compuesto_mas_largo
+
+    def _reglas_contadas(reglas_compiladas):
+        for regla in reglas_compiladas:
+            contador[0] += 1
+            yield regla
+
+    def _evaluar_reglas_contando(nombre, reglas_compiladas):
+        contador[0] += 1 # Máscara de terminaciones
+        return evaluar_reglas(nombre, _reglas_contadas(reglas_compiladas))
+
+    def _compuesto_contando(partes):
+        contador[0] += 1
+        return codigo_compuesto_mas_largo(partes)
+
+    sustitutos = {
+        'diccionario_masculino': _PertenenciaContada(nucleo.diccionario_masculino, contador),
+        'diccionario_femenino': _PertenenciaContada(nucleo.diccionario_femenino, contador),
+        'codigo_compuesto_mas_largo': _compuesto_contando,
+        '_evaluar_reglas': _evaluar_reglas_contando,
+        '_heuristica_primer_nombre': nucleo._heuristica_primer_nombre.__wrapped__,
+        '_clasificar_ultimo_nombre': nucleo._clasificar_ultimo_nombre.__wrapped__,
+    }
+    originales = {nombre: getattr(nucleo, nombre) for nombre in sustitutos}
+    for nombre, sustituto in sustitutos.items():
+        setattr(nucleo, nombre, sustituto)
+    try:
+        yield
+    finally:
+        for nombre, original in originales.items():
+            setattr(nucleo, nombre, original)
+
+class PerfilReglas:
+    """Acumula estadísticas por regla a lo largo de uno o varios chunks."""
+
+    def __init__(self):
+        self._por_metodo = {} # (metodo, genero) -> [nombres_distintos, filas, ns, evaluaciones]
+
+    def inferir_unicos(self, nombres_norm):
+        """
+        Sustituto instrumentado de inferir_genero_unicos: infiere cada nombre distinto
+        una vez, midiendo su regla, y propaga el resultado a todas las filas.
+        """
+        serie = pd.Series(nombres_norm, dtype=object)
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+        filas_por_unico = np.bincount(codigos, minlength=len(unicos))
+        generos = np.empty(len(unicos), dtype=object)
+        metodos = np.empty(len(unicos), dtype=object)
+        reloj = time.perf_counter_ns
+        por_metodo = self._por_metodo
+        contador = [0]
+        with _cascada_contada(contador):
+            inferir = nucleo.inferir_genero_mejorado
+            for i, nombre in enumerate(unicos):
+                contador[0] = 0
+                inicio = reloj()
+                genero, metodo = inferir(nombre)
+                transcurrido = reloj() - inicio
+                acumulado = por_metodo.get((metodo, genero))
+                if acumulado is None:
+                    acumulado = por_metodo[(metodo, genero)] = [0, 0, 0, 0]
+                acumulado[0] += 1
+                acumulado[1] += int(filas_por_unico[i])
+                acumulado[2] += transcurrido
+                acumulado[3] += contador[0]
+                generos[i], metodos[i] = genero, metodo
+        return generos[codigos], metodos[codigos]
+
+    def como_dataframe(self):
+        """Informe por regla, ordenado por tiempo total (las reglas más costosas primero)."""
+        filas_totales = sum(a[1] for a in self._por_metodo.values())
+        registros = []
+        for (metodo, genero), (nombres, filas, ns, evaluaciones) in self._por_metodo.items():
+            registros.append({
+                'metodo_asignacion': metodo,
+                'GENERO': genero,
+                'nombres_distintos': nombres,
+                'filas': filas,
+                'porcentaje_filas': round(100 * filas / filas_totales, 3) if filas_totales else 0.0,
+                'tiempo_total_ms': round(ns / 1e6, 3),
+                'tiempo_medio_us': round(ns / nombres / 1e3, 3),
+                'evaluaciones_medias': round(evaluaciones / nombres, 3),
+            })
+        df = pd.DataFrame(registros, columns=columnas_informe)
+        return df.sort_values(by=['tiempo_total_ms', 'metodo_asignacion'], ascending=[False, True], ignore_index=True)
+
+    def resumen(self):
+        nombres = sum(a[0] for a in self._por_metodo.values())
+        ns = sum(a[2] for a in self._por_metodo.values())
+        evaluaciones = sum(a[3] for a in self._por_metodo.values())
+        return {
+            'nombres_distintos': nombres,
+            'filas': sum(a[1] for a in self._por_metodo.values()),
+            'tiempo_total_ms': ns / 1e6,
+            'evaluaciones_medias': evaluaciones / nombres if nombres else 0.0,
+        }
+
+    def escribir(self, ruta_informe):
+        """Escribe el informe CSV (utf-8-sig, como el resto de salidas)."""
+        self.como_dataframe().to_csv(ruta_informe, sep=',', index=False, encoding='utf-8-sig')
+        return ruta_informe
+
+def informe_anterior(directorio_salida, ruta_actual):
+    """Informe de perfil más reciente del directorio distinto del actual, o None."""
+    candidatos = sorted(
+        (f for f in os.listdir(directorio_salida) if f.endswith(sufijo_informe)
+         and os.path.join(directorio_salida, f) != ruta_actual),
+        reverse=True,
+    )
+    return os.path.join(directorio_salida, candidatos[0]) if candidatos else None
+
+def comparar_informes(ruta_anterior, df_actual):
+    """
+    Cambio del reparto de filas por regla respecto a un informe anterior, en puntos
+    porcentuales, ordenado por la magnitud del cambio.
+    """
+    anterior = pd.read_csv(ruta_anterior).groupby('metodo_asignacion')['porcentaje_filas'].sum()
+    actual = df_actual.groupby('metodo_asignacion')['porcentaje_filas'].sum()
+    cambio = actual.sub(anterior, fill_value=0).round(3)
+    return cambio.reindex(cambio.abs().sort_values(ascending=False).index)
+
+def imprimir_perfil(perfil, ruta_informe):
+    resumen = perfil.resumen()
+    df = perfil.como_dataframe()
+    print(f"ℹ️ Perfil de reglas: {resumen['nombres_distintos']} nombres distintos ({resumen['filas']} filas) en "
+          f"{resumen['tiempo_total_ms']:.1f} ms, {resumen['evaluaciones_medias']:.2f} evaluaciones por nombre.")
+    print(df.head(10).to_string(index=False))
+    ruta_anterior = informe_anterior(os.path.dirname(ruta_informe) or '.', ruta_informe)
+    if ruta_anterior:
+        cambio = comparar_informes(ruta_anterior, df)
+        cambio = cambio[cambio != 0]
+        if not cambio.empty:
+            print(f"ℹ️ Cambio en el reparto de filas respecto a {os.path.basename(ruta_anterior)} (puntos porcentuales):")
+            print(cambio.head(10).to_string())
+    print(f"✅ Informe de perfil {os.path.basename(ruta_informe)} generado.")
@@ -0,0 +1,310 @@
+"""
+Procesamiento de archivos CSV: modo en memoria, streaming por chunks con ordenación
+externa y ejecución en paralelo con un pool de procesos.
+"""
+import csv
+import heapq
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import diccionarios
+from .nucleo import estadisticas_cache, limpiar_caches
+from .lote import normalizar_columna, inferir_genero_unicos
+
+# --- SALIDA ---
+columnas_salida = ['nombre_original', 'GENERO', 'metodo_asignacion']
+columnas_orden = ['metodo_asignacion', 'GENERO', 'nombre_original']
+columna_probabilidad = 'probabilidad_modelo' # Solo con el modelo de n-gramas (--modelo_ngramas)
+MAX_RUNS_ABIERTOS = 128 # Máximo de runs abiertos a la vez durante la fusión externa
+
+# --- EJECUCIÓN EN PARALELO ---
+# Cada proceso abre una sola vez el índice de diccionarios (initializer del pool); cada tarea
+# solo transporta su partición de nombres y devuelve sus resultados en el mismo orden.
+TAMANO_PARTICION_PARALELA = 20_000
+
+def _inicializar_trabajador(ruta_indice):
+    """Abre el índice de diccionarios en el proceso trabajador y vacía sus cachés."""
+    if ruta_indice is not None:
+        diccionarios.cargar_diccionarios(ruta_indice)
+    limpiar_caches()
+
+def _procesar_particion(nombres, fila_a_fila):
+    """Tarea del pool: normaliza e infiere una partición de nombres originales."""
+    inicio = time.perf_counter()
+    normalizados = normalizar_columna(nombres).to_numpy(dtype=object)
+    generos, metodos = inferir_genero_unicos(normalizados, fila_a_fila=fila_a_fila)
+    return normalizados, generos, metodos, os.getpid(), time.perf_counter() - inicio
+
+def crear_pool(numero_trabajadores):
+    """Crea el pool de procesos con los diccionarios ya cargados en cada trabajador."""
+    return ProcessPoolExecutor(
+        max_workers=numero_trabajadores,
+        initializer=_inicializar_trabajador,
+        initargs=(diccionarios.indice_diccionarios.ruta,),
+    )
+
+def procesar_en_paralelo(pool, nombres, fila_a_fila=False, estadisticas_trabajadores=None,
+                         tamano_particion=TAMANO_PARTICION_PARALELA):
+    """
+    Reparte los nombres distintos en particiones contiguas entre los procesos del pool y
+    reensambla los resultados en orden, de modo que la salida es idéntica a la serie.
+    Devuelve (nombre_normalizado, GENERO, metodo_asignacion) alineados con 'nombres'.
+    """
+    codigos, unicos = pd.factorize(pd.Series(nombres, dtype=object), use_na_sentinel=False)
+    particiones = [unicos[i:i + tamano_particion] for i in range(0, len(unicos), tamano_particion)]
+    normalizados, generos, metodos = [], [], []
+    for norm_p, gen_p, met_p, pid, segundos in pool.map(_procesar_particion, particiones, [fila_a_fila] * len(particiones)):
+        normalizados.append(norm_p)
+        generos.append(gen_p)
+        metodos.append(met_p)
+        if estadisticas_trabajadores is not None:
+            acumulado = estadisticas_trabajadores.setdefault(pid, [0, 0.0])
+            acumulado[0] += len(norm_p)
+            acumulado[1] += segundos
+    if not particiones:
+        vacio = np.array([], dtype=object)
+        return vacio, vacio, vacio
+    return (np.concatenate(normalizados)[codigos],
+            np.concatenate(generos)[codigos],
+            np.concatenate(metodos)[codigos])
+
+def imprimir_estadisticas_trabajadores(estadisticas_trabajadores):
+    for pid, (nombres, segundos) in sorted(estadisticas_trabajadores.items()):
+        velocidad = nombres / segundos if segundos else 0.0
+        print(f"ℹ️ Trabajador {pid}: {nombres} nombres en {segundos:.2f}s ({velocidad:,.0f} nombres/s).")
+
+def preparar_nombres(df):
+    """Valida y normaliza un DataFrame (o un chunk) con columna 'nombre', sin inferir."""
+    if 'nombre' not in df.columns:
+        raise ValueError("El archivo debe contener una columna llamada 'nombre'.")
+
+    df = df.dropna(subset=['nombre']).copy() # Eliminar filas donde 'nombre' es NaN
+    df['nombre_original'] = df['nombre']
+    df['nombre_normalizado'] = normalizar_columna(df['nombre'])
+    return df
+
+def aplicar_modelo_ngramas(df, modelo, umbral, estadisticas_modelo=None):
+    """
+    Nivel de respaldo tras las reglas: clasifica con el modelo de n-gramas (ModeloNgramas)
+    las filas 'sin_regla_clara'. Las que llegan al umbral pasan a metodo_asignacion
+    'modelo_ngramas'; todas las evaluadas llevan su probabilidad en columna_probabilidad.
+    """
+    from .ngramas import metodo_modelo
+    generos = df['GENERO'].to_numpy(dtype=object).copy()
+    metodos = df['metodo_asignacion'].to_numpy(dtype=object).copy()
+    probabilidad = np.full(len(df), np.nan)
+    sin_regla = metodos == 'sin_regla_clara'
+    if sin_regla.any():
+        nombres = df['nombre_normalizado'].to_numpy(dtype=object)[sin_regla]
+        generos_modelo, probabilidad_modelo = modelo.clasificar(nombres, umbral)
+        clasificados = generos_modelo != 'desconocido'
+        asignados = np.flatnonzero(sin_regla)[clasificados]
+        generos[asignados] = generos_modelo[clasificados]
+        metodos[asignados] = metodo_modelo
+        probabilidad[sin_regla] = probabilidad_modelo.round(4)
+        if estadisticas_modelo is not None:
+            estadisticas_modelo['evaluados'] = estadisticas_modelo.get('evaluados', 0) + int(sin_regla.sum())
+            estadisticas_modelo['asignados'] = estadisticas_modelo.get('asignados', 0) + len(asignados)
+    df['GENERO'], df['metodo_asignacion'], df[columna_probabilidad] = generos, metodos, probabilidad
+    return df
+
+def imprimir_estadisticas_modelo(estadisticas_modelo, umbral):
+    evaluados = estadisticas_modelo.get('evaluados', 0)
+    asignados = estadisticas_modelo.get('asignados', 0)
+    tasa = asignados / evaluados if evaluados else 0.0
+    print(f"ℹ️ Modelo de n-gramas: {asignados} de {evaluados} registros sin regla clara asignados ({tasa:.1%}, umbral {umbral}).")
+
+def preparar_chunk(df, fila_a_fila=False, pool=None, estadisticas_trabajadores=None, perfil=None,
+                   modelo=None, umbral=None, estadisticas_modelo=None):
+    """
+    Valida, normaliza e infiere el género de un DataFrame (o de un chunk) con columna 'nombre'.
+    Con perfil (PerfilReglas), la inferencia se hace en serie y con instrumentación por regla.
+    Con modelo (ModeloNgramas), los nombres sin regla clara pasan después por el modelo.
+    """
+    if 'nombre' not in df.columns:
+        raise ValueError("El archivo debe contener una columna llamada 'nombre'.")
+
+    if perfil is not None:
+        df = preparar_nombres(df)
+        df['GENERO'], df['metodo_asignacion'] = perfil.inferir_unicos(df['nombre_normalizado'])
+    elif pool is None:
+        df = preparar_nombres(df)
+        df['GENERO'], df['metodo_asignacion'] = inferir_genero_unicos(df['nombre_normalizado'], fila_a_fila=fila_a_fila)
+    else:
+        df = df.dropna(subset=['nombre']).copy() # Eliminar filas donde 'nombre' es NaN
+        df['nombre_original'] = df['nombre']
+        df['nombre_normalizado'], df['GENERO'], df['metodo_asignacion'] = procesar_en_paralelo(
+            pool, df['nombre'], fila_a_fila=fila_a_fila, estadisticas_trabajadores=estadisticas_trabajadores
+        )
+
+    if modelo is not None:
+        df = aplicar_modelo_ngramas(df, modelo, umbral, estadisticas_modelo)
+    return df
+
+def _escribir_run(df_chunk, directorio_runs, indice, columnas=columnas_salida):
+    """Ordena un chunk y lo vuelca a disco como un run (CSV sin cabecera) para la fusión externa."""
+    ruta_run = os.path.join(directorio_runs, f'run_{indice:06d}.csv')
+    df_chunk.sort_values(by=columnas_orden)[columnas].to_csv(ruta_run, index=False, header=False, encoding='utf-8')
+    return ruta_run
+
+def _leer_run(ruta_run):
+    """Lee un run fila a fila sin cargarlo completo en memoria."""
+    with open(ruta_run, newline='', encoding='utf-8') as f:
+        for fila in csv.reader(f):
+            yield fila
+
+def _clave_orden(fila):
+    return fila[2], fila[1], fila[0] # metodo_asignacion, GENERO, nombre_original (columnas_salida)
+
+def _fusionar_runs(rutas_runs, directorio_runs, max_runs_abiertos=MAX_RUNS_ABIERTOS, conservar_entradas=False):
+    """
+    Fusión k-way de runs ordenados. Si hay más runs que max_runs_abiertos, se fusionan
+    primero por grupos en runs intermedios para no agotar los descriptores de archivo
+    (los runs ya fusionados se borran, salvo los de entrada con conservar_entradas).
+    Devuelve un iterador de filas ordenadas por metodo_asignacion, GENERO y nombre_original.
+    """
+    pasada = 0
+    while len(rutas_runs) > max_runs_abiertos:
+        rutas_intermedias = []
+        for inicio in range(0, len(rutas_runs), max_runs_abiertos):
+            grupo = rutas_runs[inicio:inicio + max_runs_abiertos]
+            ruta_intermedia = os.path.join(directorio_runs, f'fusion_{pasada:03d}_{inicio:09d}.csv')
+            with open(ruta_intermedia, 'w', newline='', encoding='utf-8') as f:
+                escritor = csv.writer(f, lineterminator=os.linesep)
+                escritor.writerows(heapq.merge(*[_leer_run(r) for r in grupo], key=_clave_orden))
+            if pasada or not conservar_entradas:
+                for ruta in grupo:
+                    os.remove(ruta)
+            rutas_intermedias.append(ruta_intermedia)
+        rutas_runs = rutas_intermedias
+        pasada += 1
+    return heapq.merge(*[_leer_run(r) for r in rutas_runs], key=_clave_orden)
+
+class EscritorCSVIncremental:
+    """Escribe filas en un CSV de resultados (utf-8-sig, con cabecera) a medida que llegan."""
+
+    def __init__(self, ruta_csv, columnas):
+        self.ruta = ruta_csv
+        self._archivo = open(ruta_csv, 'w', newline='', encoding='utf-8-sig') # utf-8-sig para Excel
+        self._escritor = csv.writer(self._archivo, lineterminator=os.linesep)
+        self._escritor.writerow(columnas)
+
+    def escribir(self, fila):
+        self._escritor.writerow(fila)
+
+    def cerrar(self):
+        self._archivo.close()
+
+def abrir_escritores(ruta_sin_extension, formatos, columnas=columnas_salida):
+    """Abre un escritor incremental por cada formato de salida ('csv', 'parquet')."""
+    escritores = []
+    for formato in formatos:
+        if formato == 'parquet':
+            from .columnar import EscritorParquetIncremental
+            escritores.append(EscritorParquetIncremental(ruta_sin_extension + '.parquet', columnas))
+        else:
+            escritores.append(EscritorCSVIncremental(ruta_sin_extension + '.csv', columnas))
+    return escritores
+
+def guardar_resultados(df, ruta_sin_extension, formatos, columnas=columnas_salida):
+    """Guarda un DataFrame de resultados ya ordenado en cada formato. Devuelve las rutas."""
+    rutas = []
+    for formato in formatos:
+        if formato == 'parquet':
+            from .columnar import escribir_parquet
+            rutas.append(escribir_parquet(df[columnas], ruta_sin_extension + '.parquet'))
+        else:
+            ruta_csv = ruta_sin_extension + '.csv'
+            df[columnas].to_csv(ruta_csv, sep=',', index=False, encoding='utf-8-sig') # utf-8-sig para Excel
+            rutas.append(ruta_csv)
+    return rutas
+
+def indexar_resultados(rutas, registro_grupos):
+    """Escribe el índice de filas del CSV de resultados, si se generó CSV. Devuelve su ruta o None."""
+    from .indice_filas import escribir_indice_filas
+    for ruta in rutas:
+        if ruta.endswith('.csv'):
+            return escribir_indice_filas(ruta, registro_grupos)
+    return None
+
+def escribir_resultados_ordenados(filas, base_completos, base_desconocidos, formatos, columnas=columnas_salida,
+                                  registro_grupos=None):
+    """
+    Escribe de forma incremental filas ya ordenadas (de una fusión k-way) en el archivo
+    completo y, sobre la marcha, en el de desconocidos, en cada formato. El de desconocidos
+    solo se crea si hay alguno. Con registro_grupos se cuentan los grupos para el índice.
+    Devuelve (rutas_completos, rutas_desconocidos, total_filas, total_desconocidos).
+    """
+    total_filas = 0
+    total_desconocidos = 0
+    escritores_completos = abrir_escritores(base_completos, formatos, columnas)
+    escritores_desconocidos = None
+    try:
+        for fila in filas:
+            for escritor in escritores_completos:
+                escritor.escribir(fila)
+            total_filas += 1
+            if registro_grupos is not None:
+                registro_grupos.agregar(fila[2], fila[1])
+            if fila[1] == 'desconocido':
+                if escritores_desconocidos is None:
+                    escritores_desconocidos = abrir_escritores(base_desconocidos, formatos, columnas)
+                for escritor in escritores_desconocidos:
+                    escritor.escribir(fila)
+                total_desconocidos += 1
+    finally:
+        for escritor in escritores_completos + (escritores_desconocidos or []):
+            escritor.cerrar()
+
+    rutas_completos = [escritor.ruta for escritor in escritores_completos]
+    rutas_desconocidos = [escritor.ruta for escritor in escritores_desconocidos or []]
+    return rutas_completos, rutas_desconocidos, total_filas, total_desconocidos
+
+def procesar_en_streaming(archivo_entrada, directorio_salida, tamano_chunk, fecha, fila_a_fila=False,
+                          pool=None, estadisticas_trabajadores=None, formatos=('csv',), perfil=None,
+                          modelo=None, umbral=None, estadisticas_modelo=None, registro_grupos=None):
+    """
+    Procesa el archivo de entrada por chunks con memoria acotada: cada chunk se infiere,
+    se ordena y se vuelca como run temporal; después una fusión externa escribe los
+    resultados con escribir_resultados_ordenados.
+    Con modelo (ModeloNgramas) se añade la columna de probabilidad del modelo. Con
+    registro_grupos (RegistroGrupos) se cuentan los grupos del archivo completo para su índice.
+    Devuelve (rutas_completos, rutas_desconocidos, total_filas, total_desconocidos).
+    """
+    if not os.path.exists(directorio_salida):
+        os.makedirs(directorio_salida)
+
+    base_completos = os.path.join(directorio_salida, f'{fecha}_resultados_completos')
+    base_desconocidos = os.path.join(directorio_salida, f'{fecha}_desconocidos_resultados')
+    total_filas = 0
+    columnas = columnas_salida + [columna_probabilidad] if modelo is not None else columnas_salida
+
+    with tempfile.TemporaryDirectory(prefix='runs_', dir=directorio_salida) as directorio_runs:
+        rutas_runs = []
+        lector = pd.read_csv(archivo_entrada, dtype={'nombre': str}, chunksize=tamano_chunk)
+        for indice, chunk in enumerate(lector):
+            chunk = preparar_chunk(chunk, fila_a_fila=fila_a_fila, pool=pool,
+                                   estadisticas_trabajadores=estadisticas_trabajadores, perfil=perfil,
+                                   modelo=modelo, umbral=umbral, estadisticas_modelo=estadisticas_modelo)
+            if chunk.empty:
+                continue
+            rutas_runs.append(_escribir_run(chunk, directorio_runs, indice, columnas))
+            total_filas += len(chunk)
+            print(f"ℹ️ Chunk {indice + 1}: {len(chunk)} registros inferidos ({total_filas} acumulados).")
+
+        rutas_completos, rutas_desconocidos, _, total_desconocidos = escribir_resultados_ordenados(
+            _fusionar_runs(rutas_runs, directorio_runs), base_completos, base_desconocidos, formatos, columnas,
+            registro_grupos
+        )
+
+    return rutas_completos, rutas_desconocidos, total_filas, total_desconocidos
+
+def imprimir_estadisticas_cache():
+    for nombre_cache, stats in estadisticas_cache().items():
+        if stats['aciertos'] or stats['fallos']:
+            print(f"ℹ️ Caché {nombre_cache}: {stats['aciertos']} aciertos, {stats['fallos']} fallos ({stats['tasa_aciertos']:.1%}), {stats['tamano']}/{stats['tamano_maximo']} entradas.")
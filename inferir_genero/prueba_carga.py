@@ -0,0 +1,100 @@
+"""
+Prueba de carga del servicio de predicción (servicio.py) contra localhost.
+
+Lanza --concurrencia clientes con conexiones persistentes que envían --peticiones en
+total, con nombres del corpus sintético (corpus.py), y reporta peticiones/s, nombres/s
+y latencias p50/p99.
+
+Uso:
+    python3 -m inferir_genero.servicio --port 8000 &
+    python3 -m inferir_genero.prueba_carga --url http://127.0.0.1:8000 --concurrencia 16 --peticiones 20000
+    python3 -m inferir_genero.prueba_carga --lote 100     # peticiones /predict_many de 100 nombres
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import quote, urlparse
+
+from .corpus import generar_nombres
+
+def _cliente(url, nombres, lote, inicio, paso, total, latencias, errores):
+    conexion = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    i = inicio
+    while i < total:
+        desde = (i * lote) % len(nombres)
+        try:
+            t0 = time.perf_counter()
+            if lote == 1:
+                conexion.request('GET', '/predict?nombre=' + quote(nombres[desde]))
+            else:
+                cuerpo = json.dumps({'nombres': nombres[desde:desde + lote]}).encode('utf-8')
+                conexion.request('POST', '/predict_many', body=cuerpo, headers={'Content-Type': 'application/json'})
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            latencias.append(time.perf_counter() - t0)
+            if respuesta.status != 200:
+                errores.append(respuesta.status)
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(repr(e))
+            latencias.append(time.perf_counter() - t0)
+            conexion.close()
+            conexion = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        i += paso
+    conexion.close()
+
+def ejecutar_prueba(url, concurrencia=8, peticiones=10_000, lote=1, semilla=42):
+    """Ejecuta la prueba y devuelve un dict con el resumen."""
+    url = urlparse(url)
+    nombres = next(generar_nombres(max(50_000, lote), semilla=semilla, tamano_bloque=max(50_000, lote)))
+    latencias_por_cliente = [[] for _ in range(concurrencia)]
+    errores = []
+    hilos = [threading.Thread(target=_cliente, args=(url, nombres, lote, c, concurrencia, peticiones,
+                                                     latencias_por_cliente[c], errores))
+             for c in range(concurrencia)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    latencias_ms = sorted(l * 1000 for lista in latencias_por_cliente for l in lista)
+    def percentil(p):
+        return latencias_ms[min(len(latencias_ms) - 1, int(p / 100 * len(latencias_ms)))] if latencias_ms else 0.0
+    return {
+        'peticiones': len(latencias_ms),
+        'errores': len(errores),
+        'segundos': segundos,
+        'peticiones_por_segundo': len(latencias_ms) / segundos if segundos else 0.0,
+        'nombres_por_segundo': len(latencias_ms) * lote / segundos if segundos else 0.0,
+        'p50_ms': percentil(50),
+        'p99_ms': percentil(99),
+        'media_ms': statistics.fmean(latencias_ms) if latencias_ms else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de predicción.")
+    parser.add_argument("--url", type=str, default='http://127.0.0.1:8000', help="URL base del servicio.")
+    parser.add_argument("--concurrencia", type=int, default=8, help="Clientes simultáneos (por defecto: 8).")
+    parser.add_argument("--peticiones", type=int, default=10_000, help="Peticiones en total (por defecto: 10000).")
+    parser.add_argument("--lote", type=int, default=1,
+                        help="Nombres por petición: 1 usa GET /predict, más de 1 usa POST /predict_many (por defecto: 1).")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla de los nombres sintéticos (por defecto: 42).")
+    args = parser.parse_args(argv)
+
+    resumen = ejecutar_prueba(args.url, args.concurrencia, args.peticiones, args.lote, args.semilla)
+    print(f"ℹ️ {resumen['peticiones']} peticiones ({args.lote} nombres c/u) en {resumen['segundos']:.2f}s con "
+          f"{args.concurrencia} clientes: {resumen['peticiones_por_segundo']:,.0f} peticiones/s, "
+          f"{resumen['nombres_por_segundo']:,.0f} nombres/s.")
+    print(f"ℹ️ Latencia: p50 {resumen['p50_ms']:.2f} ms, p99 {resumen['p99_ms']:.2f} ms, media {resumen['media_ms']:.2f} ms.")
+    if resumen['errores']:
+        print(f"❌ {resumen['errores']} peticiones con error.")
+        return 1
+    print("✅ Prueba de carga completada sin errores.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
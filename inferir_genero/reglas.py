@@ -0,0 +1,128 @@
+"""
+Tabla de reglas de terminación y su compilación en un trie de sufijos invertidos.
+"""
+from .diccionarios import diccionario_femenino
+
+# --- TERMINACIONES Y EXCEPCIONES DE LAS HEURÍSTICAS ---
+# Las heurísticas son datos, no ifs anidados: cada grupo de terminaciones se compila una
+# sola vez en un trie de sufijos invertidos, y cada regla indica qué grupos requiere o
+# prohíbe. Añadir cientos de terminaciones no encarece la evaluación de cada nombre.
+grupos_terminaciones = {
+    'f_primer_nombre': ('a', 'ia', 'ina', 'ela', 'isa', 'ana', 'ila', 'ita', 'ada', 'liz', 'luz', 'dad', 'cion', 'ione', ' اسلامیة'), # ' اسلامیة' no es relevante para CR
+    'elias': ('elias',),
+    'm_primer_nombre': ('o', 'ol', 'or', 'an', 'en', 'in', 'on', 'un', 'er', 'el', 'iel', 'tor', 'ron', 'mar', 'air', 'din', 'us', 'ez', 'es', 'is'), # 'ez', 'es', 'is' pueden ser apellidos pero también nombres
+    'ambiguas_m': ('es', 'is', 'ez'),
+    'es': ('es',),
+    'f_ultimo_nombre': ('a', 'ia', 'ina', 'ela', 'ana', 'ada', 'liz', 'luz', 'dad', 'cion'),
+    'm_ultimo_nombre': ('o', 'or', 'an', 'el', 'iel', 'us'),
+    'a': ('a',),
+    'o': ('o',),
+}
+
+excepciones_m_terminacion_f = frozenset(['elias', 'nicolas', 'jonas', 'tobias', 'isaias', 'matias', 'andres', 'zacarias']) # Algunos nombres masculinos terminan en 'as'
+# Excepciones: Paz (F), Consuelo (F), Amparo (F), Rocio (F), Trinidad (F), Carmen (F), Mar (puede ser F)
+excepciones_f_terminacion_m = frozenset(['paz', 'consuelo', 'amparo', 'rocio', 'trinidad', 'carmen', 'marisol', 'isabel', 'dolores', 'mercedes', 'angeles', 'nieves', 'lourdes', 'inés', 'ester', 'raquel'])
+nombres_m_terminados_es = frozenset(['andres', 'moises'])
+excepciones_m_ultimo_nombre = frozenset(['elias', 'nicolas', 'jonas', 'isaias', 'matias'])
+excepciones_f_ultimo_nombre = frozenset(['paz', 'luz', 'marisol', 'isabel'])
+
+# Cada regla se evalúa en orden y gana la primera que cumple todas sus condiciones:
+#   requiere: grupos de terminaciones que el nombre debe cumplir (todos)
+#   prohibe: grupos de terminaciones que el nombre no debe cumplir (ninguno)
+#   excluidos: nombres exactos a los que no se aplica la regla
+#   solo_si_en: si se indica, la regla solo aplica a estos nombres exactos
+#   excluir_diccionario_femenino: no aplicar si el nombre está en diccionario_femenino
+reglas_terminacion_primer_nombre = [
+    # Terminaciones femeninas fuertes
+    {'requiere': ('f_primer_nombre', 'elias'), 'genero': 'masculino', 'metodo': 'heuristica_excepcion'}, # Excepción: Elias es M
+    {'requiere': ('f_primer_nombre',), 'excluidos': excepciones_m_terminacion_f, 'genero': 'femenino', 'metodo': 'heuristica_terminacion_f'},
+    # Terminaciones masculinas fuertes (ser más cuidadoso con 'es', 'is', 'ez')
+    {'requiere': ('m_primer_nombre', 'es'), 'excluidos': excepciones_f_terminacion_m, 'solo_si_en': nombres_m_terminados_es,
+     'genero': 'masculino', 'metodo': 'heuristica_terminacion_m'}, # Nombres M terminados en 'es'
+    {'requiere': ('m_primer_nombre',), 'prohibe': ('ambiguas_m',), 'excluidos': excepciones_f_terminacion_m,
+     'genero': 'masculino', 'metodo': 'heuristica_terminacion_m'},
+    # Si termina en 'es', 'is', 'ez' y no es una excepción femenina, podría ser masculino
+    {'requiere': ('m_primer_nombre', 'ambiguas_m'), 'excluidos': excepciones_f_terminacion_m, 'excluir_diccionario_femenino': True,
+     'genero': 'masculino', 'metodo': 'heuristica_terminacion_m_es_is_ez'},
+]
+
+reglas_terminacion_ultimo_nombre = [
+    {'requiere': ('f_ultimo_nombre',), 'excluidos': excepciones_m_ultimo_nombre, 'genero': 'femenino', 'metodo': 'heuristica_ultimonombre_f'},
+    {'requiere': ('m_ultimo_nombre',), 'excluidos': excepciones_f_ultimo_nombre, 'genero': 'masculino', 'metodo': 'heuristica_ultimonombre_m'},
+]
+
+# Fallback MUY conservador (última letra del primer nombre significativo).
+# Evitar 'e' como indicador femenino fuerte en fallback.
+reglas_fallback_primer_nombre = [
+    {'requiere': ('a',), 'genero': 'femenino', 'metodo': 'fallback_primera_a'},
+    {'requiere': ('o',), 'genero': 'masculino', 'metodo': 'fallback_primera_o'},
+]
+
+def _compilar_trie_sufijos(grupos):
+    """
+    Construye un trie con las terminaciones invertidas. Cada nodo es [mascara, hijos],
+    donde la máscara tiene un bit por cada grupo con una terminación que acaba en ese nodo.
+    Devuelve (raiz, bit_por_grupo).
+    """
+    bit_por_grupo = {nombre: 1 << i for i, nombre in enumerate(grupos)}
+    raiz = [0, {}]
+    for nombre_grupo, terminaciones in grupos.items():
+        for terminacion in terminaciones:
+            nodo = raiz
+            for caracter in reversed(terminacion):
+                nodo = nodo[1].setdefault(caracter, [0, {}])
+            nodo[0] |= bit_por_grupo[nombre_grupo]
+    return raiz, bit_por_grupo
+
+def _mascara_terminaciones(nombre):
+    """Recorre el nombre desde el final una sola vez y devuelve la máscara de grupos que cumple."""
+    nodo = _trie_terminaciones
+    mascara = 0
+    for caracter in reversed(nombre):
+        nodo = nodo[1].get(caracter)
+        if nodo is None:
+            break
+        mascara |= nodo[0]
+    return mascara
+
+def _compilar_reglas(reglas):
+    """Convierte una tabla de reglas en tuplas con máscaras de bits listas para evaluar."""
+    compiladas = []
+    for regla in reglas:
+        requiere = 0
+        for grupo in regla['requiere']:
+            requiere |= _bit_por_grupo[grupo]
+        prohibe = 0
+        for grupo in regla.get('prohibe', ()):
+            prohibe |= _bit_por_grupo[grupo]
+        compiladas.append((
+            requiere,
+            prohibe,
+            frozenset(regla.get('excluidos', ())),
+            regla.get('solo_si_en'),
+            regla.get('excluir_diccionario_femenino', False),
+            (regla['genero'], regla['metodo']),
+        ))
+    return tuple(compiladas)
+
+def _evaluar_reglas(nombre, reglas_compiladas):
+    """Devuelve (genero, metodo) de la primera regla que aplica al nombre, o None."""
+    mascara = _mascara_terminaciones(nombre)
+    if not mascara:
+        return None
+    for requiere, prohibe, excluidos, solo_si_en, excluir_dic_f, resultado in reglas_compiladas:
+        if mascara & requiere != requiere or mascara & prohibe:
+            continue
+        if nombre in excluidos:
+            continue
+        if solo_si_en is not None and nombre not in solo_si_en:
+            continue
+        if excluir_dic_f and nombre in diccionario_femenino:
+            continue
+        return resultado
+    return None
+
+_trie_terminaciones, _bit_por_grupo = _compilar_trie_sufijos(grupos_terminaciones)
+_reglas_primer_nombre = _compilar_reglas(reglas_terminacion_primer_nombre)
+_reglas_ultimo_nombre = _compilar_reglas(reglas_terminacion_ultimo_nombre)
+_reglas_fallback = _compilar_reglas(reglas_fallback_primer_nombre)
@@ -0,0 +1,251 @@
+"""
+Servicio HTTP local de predicción de género (solo biblioteca estándar, sin pandas).
+
+Mantiene los diccionarios residentes (índice mapeado en memoria) y la caché LRU de
+resultados del núcleo entre peticiones. Las peticiones concurrentes se agrupan en
+micro-lotes: un único hilo despachador toma todo lo que está en cola (hasta --max_lote
+nombres) y lo resuelve de una vez con predict_many; mientras resuelve un lote, se va
+formando el siguiente. Con --ventana_ms > 0 espera además ese tiempo a que lleguen más
+peticiones, a cambio de latencia con poca carga.
+Como toda la inferencia pasa por ese hilo, la recarga de diccionarios se aplica entre
+dos lotes y ninguna petición ve un diccionario a medio recargar.
+
+Endpoints:
+    GET  /predict?nombre=María José        -> {"nombre", "GENERO", "metodo_asignacion"}
+    POST /predict       {"nombre": "..."}  -> ídem
+    POST /predict_many  {"nombres": [...]} -> {"resultados": [...]}
+    POST /recargar                          -> recarga los diccionarios sin reiniciar
+    GET  /salud                             -> estado, índice y estadísticas de caché
+
+Uso:
+    python3 -m inferir_genero.servicio --port 8000
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import diccionarios
+from .nucleo import estadisticas_cache, limpiar_caches, predict_many
+
+VENTANA_MS_POR_DEFECTO = 0.0
+MAX_LOTE_POR_DEFECTO = 512
+MAX_NOMBRES_POR_PETICION = 10_000
+VIGILAR_SEGUNDOS_POR_DEFECTO = 2.0
+
+def recargar_diccionarios():
+    """Reabre el índice (regenerándolo si las fuentes cambiaron) y vacía las cachés."""
+    indice = diccionarios.cargar_diccionarios()
+    limpiar_caches()
+    return indice
+
+class DespachadorMicroLotes:
+    """
+    Agrupa las peticiones concurrentes y las resuelve en un único hilo.
+    enviar() devuelve un Future con la lista de (GENERO, metodo_asignacion).
+    """
+
+    def __init__(self, ventana_ms=VENTANA_MS_POR_DEFECTO, max_lote=MAX_LOTE_POR_DEFECTO):
+        self.ventana = ventana_ms / 1000
+        self.max_lote = max_lote
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, name='despachador', daemon=True)
+        self.lotes = 0
+        self.nombres = 0
+        self.recargas = 0
+        self._hilo.start()
+
+    def enviar(self, nombres):
+        futuro = Future()
+        self._cola.put(('predecir', nombres, futuro))
+        return futuro
+
+    def recargar(self):
+        """Programa una recarga de diccionarios entre dos lotes; el Future devuelve el índice."""
+        futuro = Future()
+        self._cola.put(('recargar', None, futuro))
+        return futuro
+
+    def _bucle(self):
+        while True:
+            pendientes = [self._cola.get()]
+            total = len(pendientes[0][1] or ())
+            limite = time.perf_counter() + self.ventana
+            # Se agrupa lo que ya está en cola y, con ventana, lo que llegue antes del límite;
+            # se corta antes si el lote se llena o llega una recarga
+            while total < self.max_lote and pendientes[-1][0] == 'predecir':
+                try:
+                    tarea = self._cola.get_nowait()
+                except queue.Empty:
+                    restante = limite - time.perf_counter()
+                    if restante <= 0:
+                        break
+                    try:
+                        tarea = self._cola.get(timeout=restante)
+                    except queue.Empty:
+                        break
+                pendientes.append(tarea)
+                total += len(tarea[1] or ())
+            self._procesar(pendientes)
+
+    def _procesar(self, pendientes):
+        peticiones = [t for t in pendientes if t[0] == 'predecir']
+        if peticiones:
+            nombres = [n for _, lista, _ in peticiones for n in lista]
+            try:
+                resultados = predict_many(nombres)
+            except Exception as e:
+                for _, _, futuro in peticiones:
+                    futuro.set_exception(e)
+            else:
+                inicio = 0
+                for _, lista, futuro in peticiones:
+                    futuro.set_result(resultados[inicio:inicio + len(lista)])
+                    inicio += len(lista)
+                self.lotes += 1
+                self.nombres += len(nombres)
+        for tarea, _, futuro in pendientes:
+            if tarea == 'recargar':
+                try:
+                    futuro.set_result(recargar_diccionarios())
+                    self.recargas += 1
+                except Exception as e:
+                    futuro.set_exception(e)
+
+class VigilanteDiccionarios(threading.Thread):
+    """Programa una recarga cuando cambian las fuentes de nombres o el índice en disco."""
+
+    def __init__(self, despachador, intervalo=VIGILAR_SEGUNDOS_POR_DEFECTO):
+        super().__init__(name='vigilante', daemon=True)
+        self.despachador = despachador
+        self.intervalo = intervalo
+        self._firma = self._firma_actual()
+
+    def _firma_actual(self):
+        rutas = list(diccionarios.fuentes_diccionarios.values()) + [diccionarios.ruta_indice_por_defecto]
+        return tuple(os.path.getmtime(r) if os.path.exists(r) else None for r in rutas)
+
+    def run(self):
+        while True:
+            time.sleep(self.intervalo)
+            firma = self._firma_actual()
+            if firma != self._firma:
+                try:
+                    indice = self.despachador.recargar().result()
+                    print(f"🔄 Diccionarios recargados en caliente ({indice.numero_nombres} nombres).", flush=True)
+                except Exception as e:
+                    print(f"❌ Error al recargar los diccionarios: {e}", flush=True)
+                self._firma = self._firma_actual()
+
+class ManejadorPrediccion(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Conexiones persistentes (keep-alive)
+    disable_nagle_algorithm = True # Cabeceras y cuerpo salen en escrituras separadas: sin esto, +40 ms por ACK retardado
+    despachador = None
+
+    def log_message(self, formato, *args):
+        pass # Sin registro por petición: el coste de escribir en consola domina la latencia
+
+    def _responder(self, estado, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _leer_json(self):
+        longitud = int(self.headers.get('Content-Length') or 0)
+        if not longitud:
+            return {}
+        return json.loads(self.rfile.read(longitud))
+
+    def _predecir(self, nombres):
+        resultados = self.despachador.enviar(nombres).result()
+        return [{'nombre': n, 'GENERO': g, 'metodo_asignacion': m} for n, (g, m) in zip(nombres, resultados)]
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/predict':
+            nombre = parse_qs(url.query, keep_blank_values=True).get('nombre')
+            if not nombre:
+                return self._responder(400, {'error': "Falta el parámetro 'nombre'."})
+            return self._responder(200, self._predecir(nombre[:1])[0])
+        if url.path == '/salud':
+            indice = diccionarios.indice_diccionarios
+            return self._responder(200, {
+                'estado': 'ok',
+                'indice': {'ruta': indice.ruta, 'nombres': indice.numero_nombres},
+                'lotes': self.despachador.lotes,
+                'nombres': self.despachador.nombres,
+                'recargas': self.despachador.recargas,
+                'cache': estadisticas_cache(),
+            })
+        return self._responder(404, {'error': f"Ruta desconocida: {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            cuerpo = self._leer_json()
+        except ValueError as e:
+            return self._responder(400, {'error': f"JSON inválido: {e}"})
+        if url.path == '/predict':
+            if not isinstance(cuerpo, dict) or not isinstance(cuerpo.get('nombre'), str):
+                return self._responder(400, {'error': "El cuerpo debe ser {\"nombre\": \"...\"}."})
+            return self._responder(200, self._predecir([cuerpo['nombre']])[0])
+        if url.path == '/predict_many':
+            nombres = cuerpo.get('nombres') if isinstance(cuerpo, dict) else None
+            if not isinstance(nombres, list) or not all(isinstance(n, str) for n in nombres):
+                return self._responder(400, {'error': "El cuerpo debe ser {\"nombres\": [\"...\", ...]}."})
+            if len(nombres) > MAX_NOMBRES_POR_PETICION:
+                return self._responder(413, {'error': f"Máximo {MAX_NOMBRES_POR_PETICION} nombres por petición."})
+            return self._responder(200, {'resultados': self._predecir(nombres)})
+        if url.path == '/recargar':
+            try:
+                indice = self.despachador.recargar().result()
+            except Exception as e:
+                return self._responder(500, {'error': f"No se pudieron recargar los diccionarios: {e}"})
+            return self._responder(200, {'estado': 'recargado', 'nombres': indice.numero_nombres})
+        return self._responder(404, {'error': f"Ruta desconocida: {url.path}"})
+
+def crear_servidor(host='127.0.0.1', puerto=8000, ventana_ms=VENTANA_MS_POR_DEFECTO, max_lote=MAX_LOTE_POR_DEFECTO,
+                   vigilar_segundos=VIGILAR_SEGUNDOS_POR_DEFECTO):
+    """Crea el servidor (sin arrancarlo) con su despachador y, si se pide, el vigilante de diccionarios."""
+    despachador = DespachadorMicroLotes(ventana_ms=ventana_ms, max_lote=max_lote)
+    manejador = type('Manejador', (ManejadorPrediccion,), {'despachador': despachador})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    if vigilar_segundos > 0:
+        VigilanteDiccionarios(despachador, vigilar_segundos).start()
+    return servidor
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de predicción de género.")
+    parser.add_argument("--host", type=str, default='127.0.0.1', help="Interfaz de escucha (por defecto: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8000, help="Puerto (por defecto: 8000).")
+    parser.add_argument("--ventana_ms", type=float, default=VENTANA_MS_POR_DEFECTO,
+                        help="Espera adicional para agrupar peticiones concurrentes en un micro-lote (por defecto: 0, solo lo que ya está en cola).")
+    parser.add_argument("--max_lote", type=int, default=MAX_LOTE_POR_DEFECTO,
+                        help="Nombres por micro-lote antes de despacharlo sin esperar (por defecto: 512).")
+    parser.add_argument("--vigilar_segundos", type=float, default=VIGILAR_SEGUNDOS_POR_DEFECTO,
+                        help="Cada cuánto se comprueba si cambiaron los diccionarios; 0 desactiva la recarga automática.")
+    args = parser.parse_args(argv)
+
+    servidor = crear_servidor(args.host, args.port, args.ventana_ms, args.max_lote, args.vigilar_segundos)
+    print(f"✅ Servicio de predicción escuchando en http://{args.host}:{servidor.server_port} "
+          f"({diccionarios.indice_diccionarios.numero_nombres} nombres en diccionario).", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print("🔄 Servicio detenido.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+"""
+Lectura de archivos de resultados: el CSV devuelve los mismos valores que el Parquet.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from inferir_genero.columnar import escribir_parquet, iterar_resultados, leer_resultados
+
+nombres_parecidos_a_nulos = ['Na', 'NA', 'Nan', 'NaN', 'Null', 'NULL', 'None', 'n/a', '-nan']
+
+def _resultados():
+    return pd.DataFrame({
+        'nombre_original': nombres_parecidos_a_nulos + ['María'],
+        'GENERO': ['desconocido'] * len(nombres_parecidos_a_nulos) + ['femenino'],
+        'metodo_asignacion': ['sin_regla_clara'] * len(nombres_parecidos_a_nulos) + ['dic_completo'],
+        'probabilidad_modelo': [np.nan] * len(nombres_parecidos_a_nulos) + [0.75],
+    })
+
+def _escribir_csv(df, ruta):
+    df.to_csv(ruta, sep=',', index=False, encoding='utf-8-sig')
+    return str(ruta)
+
+def test_csv_conserva_nombres_parecidos_a_nulos(tmp_path):
+    ruta = _escribir_csv(_resultados(), tmp_path / 'resultados.csv')
+    df = leer_resultados(ruta)
+    assert df['nombre_original'].tolist() == nombres_parecidos_a_nulos + ['María']
+    assert df['probabilidad_modelo'].isna().sum() == len(nombres_parecidos_a_nulos)
+    assert df['probabilidad_modelo'].iloc[-1] == 0.75
+
+def test_iterar_csv_conserva_nombres_parecidos_a_nulos(tmp_path):
+    ruta = _escribir_csv(_resultados(), tmp_path / 'resultados.csv')
+    lotes = iterar_resultados(ruta, columnas=['nombre_original'], filtros={'GENERO': 'desconocido'}, filas_por_lote=4)
+    assert pd.concat(lotes)['nombre_original'].tolist() == nombres_parecidos_a_nulos
+
+def test_csv_y_parquet_coinciden(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = _resultados()
+    ruta_csv = _escribir_csv(df, tmp_path / 'resultados.csv')
+    ruta_parquet = escribir_parquet(df, str(tmp_path / 'resultados.parquet'))
+    desde_csv = leer_resultados(ruta_csv)
+    desde_parquet = leer_resultados(ruta_parquet)
+    for columna in ('nombre_original', 'GENERO', 'metodo_asignacion'):
+        assert desde_csv[columna].tolist() == desde_parquet[columna].astype(object).tolist()
+    assert np.allclose(desde_csv['probabilidad_modelo'], desde_parquet['probabilidad_modelo'], equal_nan=True)
+
+def test_csv_celda_vacia_sigue_siendo_nula(tmp_path):
+    ruta = tmp_path / 'validacion.csv'
+    ruta.write_text('GENERO,GENERO_VALIDADO\nfemenino,femenino\nmasculino,\n', encoding='utf-8')
+    df = leer_resultados(str(ruta))
+    assert df['GENERO_VALIDADO'].isna().tolist() == [False, True]
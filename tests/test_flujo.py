@@ -0,0 +1,85 @@
+"""
+Clasificador en flujo: una línea de salida por línea de entrada en todos los formatos.
+"""
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from inferir_genero.flujo import MAX_AVISOS, RegistroErrores, clasificar_flujo, clasificar_lineas, metodo_json_no_valido
+from inferir_genero.nucleo import predict
+
+class _Lector:
+    """Entrega los datos en bloques de tamaño fijo, para partir líneas entre lecturas."""
+
+    def __init__(self, datos, tamano=7):
+        self._datos = datos
+        self._tamano = tamano
+
+    async def read(self, n):
+        bloque, self._datos = self._datos[:self._tamano], self._datos[self._tamano:]
+        return bloque
+
+class _Escritor:
+    def __init__(self):
+        self.datos = bytearray()
+
+    def write(self, datos):
+        self.datos += datos
+
+    async def drain(self):
+        pass
+
+def _clasificar(texto, entrada, salida):
+    escritor = _Escritor()
+    total, errores = asyncio.run(clasificar_flujo(_Lector(texto.encode('utf-8')), escritor, entrada, salida))
+    return escritor.datos.decode('utf-8'), total, errores
+
+lineas_texto = ['María José', '', 'Juan', '   ', 'zzqx', '']
+
+@pytest.mark.parametrize('salida', ['csv', 'json'])
+def test_texto_una_salida_por_linea(salida):
+    texto, total, errores = _clasificar('\n'.join(lineas_texto) + '\n', 'texto', salida)
+    filas = texto.splitlines()
+    assert len(filas) == total == len(lineas_texto) and errores == 0
+    if salida == 'csv':
+        metodos = [fila[2] for fila in csv.reader(io.StringIO(texto))]
+    else:
+        metodos = [json.loads(fila)['metodo_asignacion'] for fila in filas]
+    assert metodos == [predict(n)[1] for n in lineas_texto]
+
+@pytest.mark.parametrize('salida', ['csv', 'json'])
+def test_json_lineas_en_blanco_y_no_validas_se_conservan(salida):
+    entrada = ['"Ana"', '', '{"nombre": "Juan", "id": 7}', '{no es json', '  ', '[1, 2]', '{"nombre": 3}']
+    texto, total, errores = _clasificar('\n'.join(entrada), 'json', salida)
+    filas = texto.splitlines()
+    assert len(filas) == total == len(entrada)
+    assert errores == 3
+    if salida == 'csv':
+        metodos = [fila[2] for fila in csv.reader(io.StringIO(texto))]
+    else:
+        registros = [json.loads(fila) for fila in filas]
+        metodos = [r['metodo_asignacion'] for r in registros]
+        assert registros[2]['id'] == 7
+    assert metodos == ['dic_completo', 'nombre_vacio', 'dic_completo', metodo_json_no_valido, 'nombre_vacio',
+                       metodo_json_no_valido, metodo_json_no_valido]
+
+def test_mismo_comportamiento_con_lineas_en_blanco_en_ambos_formatos():
+    errores = RegistroErrores()
+    texto, _ = clasificar_lineas(['', 'Ana', ''], 'texto', 'csv', errores)
+    json_, _ = clasificar_lineas(['', '"Ana"', ''], 'json', 'csv', errores)
+    assert texto == json_
+
+def test_muchas_lineas_no_validas_se_cuentan_y_solo_se_guardan_las_primeras(capsys):
+    entrada = [f'{{no valida {i}' for i in range(10_000)]
+    texto, total, errores = _clasificar('\n'.join(entrada) + '\n', 'json', 'csv')
+    assert total == errores == len(entrada)
+    assert len(texto.splitlines()) == len(entrada)
+    assert capsys.readouterr().err.count('Línea JSON no válida') == MAX_AVISOS
+
+    registro = RegistroErrores()
+    clasificar_lineas(entrada, 'json', 'csv', registro)
+    assert registro.total == len(entrada)
+    assert registro.primeras == entrada[:MAX_AVISOS]
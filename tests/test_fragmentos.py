@@ -0,0 +1,35 @@
+"""
+Modo por fragmentos: las filas del manifiesto son las que escribe la fusión.
+"""
+import json
+import os
+
+import pytest
+
+from inferir_genero.fragmentos import fusionar_fragmentos, nombre_manifiesto, planificar, procesar_fragmento
+
+opciones = {'fila_a_fila': False, 'modelo_ngramas': None, 'umbral_modelo': 0.8}
+
+def _planificar_y_procesar(tmp_path, lineas, numero_fragmentos=3):
+    entrada = tmp_path / 'entrada.csv'
+    entrada.write_text('\n'.join(['nombre'] + lineas) + '\n', encoding='utf-8')
+    directorio = str(tmp_path / 'fragmentos')
+    manifiesto = planificar(str(entrada), directorio, numero_fragmentos, opciones)
+    for fragmento in manifiesto['fragmentos']:
+        procesar_fragmento(directorio, manifiesto, fragmento['id'])
+    return directorio, manifiesto
+
+def test_nombres_nulos_no_cuentan_en_el_manifiesto(tmp_path):
+    directorio, manifiesto = _planificar_y_procesar(tmp_path, ['Juan', 'Maria', '""', 'NA'])
+    assert manifiesto['filas'] == 2
+    assert sum(f['filas'] for f in manifiesto['fragmentos']) == 2
+    _, _, total_filas, _, _ = fusionar_fragmentos(directorio, str(tmp_path / 'salida'), '20260101000000')
+    assert total_filas == 2
+
+def test_fusion_rechaza_filas_distintas_del_manifiesto(tmp_path):
+    directorio, manifiesto = _planificar_y_procesar(tmp_path, ['Juan', 'Maria', 'Ana'])
+    manifiesto['filas'] += 1
+    with open(os.path.join(directorio, nombre_manifiesto), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f)
+    with pytest.raises(ValueError, match='el manifiesto planificó 4'):
+        fusionar_fragmentos(directorio, str(tmp_path / 'salida'), '20260101000000')
@@ -0,0 +1,123 @@
+"""
+Paridad de la inferencia por lotes (inferir_genero_lote) con la inferencia fila a fila
+(inferir_genero_mejorado), nombre a nombre, sobre un corpus de casos límite.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inferir_genero.diccionarios import indice_diccionarios
+from inferir_genero.lote import inferir_genero_lote, inferir_genero_unicos, normalizar_columna
+from inferir_genero.nucleo import inferir_genero_mejorado, normalizar_nombre
+from inferir_genero.reglas import (excepciones_f_terminacion_m, excepciones_f_ultimo_nombre,
+                                   excepciones_m_terminacion_f, excepciones_m_ultimo_nombre,
+                                   grupos_terminaciones, nombres_m_terminados_es)
+
+DESCONOCIDO = 'zzqx' # Token que no está en los diccionarios ni cumple ninguna terminación
+
+casos_limite = [
+    # Vacíos y solo partículas
+    '', 'de', 'del', 'la', 'los', 'las', 'de la', 'de los', 'del la las',
+    # Un solo token
+    'jose', 'maria', 'ana', 'juan', DESCONOCIDO, 'x', 'a', 'o', 'es',
+    # Partículas alrededor de nombres
+    'de maria', 'maria de', 'juan de la cruz', 'jose de jesus', 'maria de los angeles',
+    'del carmen', 'de la zzqa', f'{DESCONOCIDO} de la zzqo', f'la {DESCONOCIDO} del zzqina',
+    # Compuestos del diccionario al inicio del nombre
+    'jose maria', 'maria jose', 'jose maria perez', 'maria jose perez',
+    'maria del carmen', 'maria del carmen rodriguez', 'maria del carmen de la cruz',
+    'juan carlos', 'juan carlos zzqa', 'miguel angel zzqina', 'jose luis maria',
+    # Casos especiales jose/maria sin compuesto en el diccionario
+    'jose de maria', 'maria de jose', 'jose zzqx maria', 'maria zzqx jose',
+    # Último nombre significativo
+    f'{DESCONOCIDO} juan', f'{DESCONOCIDO} ana', f'{DESCONOCIDO} zzqina', f'{DESCONOCIDO} zzqor',
+    f'{DESCONOCIDO} {DESCONOCIDO}', f'{DESCONOCIDO} de {DESCONOCIDO}', f'{DESCONOCIDO} paz', f'{DESCONOCIDO} elias',
+    # Nombres desconocidos sin regla
+    'zzqe', 'zzqu', 'zzqy zzqk', 'qwerty asdf zxcv',
+]
+
+def _corpus_terminaciones():
+    """Cada terminación de cada grupo como primer nombre, último nombre y nombre simple."""
+    nombres = []
+    terminaciones = sorted({t for grupo in grupos_terminaciones.values() for t in grupo})
+    for terminacion in terminaciones:
+        for raiz in ('', 'zzq', 'b'):
+            token = raiz + terminacion
+            nombres += [token, f'{token} {DESCONOCIDO}', f'{DESCONOCIDO} {token}',
+                        f'{DESCONOCIDO} de la {token}', f'{token} {token}']
+    return nombres
+
+def _corpus_excepciones():
+    """Nombres exceptuados o restringidos por las reglas, en cada posición."""
+    nombres = []
+    for conjunto in (excepciones_m_terminacion_f, excepciones_f_terminacion_m, nombres_m_terminados_es,
+                     excepciones_m_ultimo_nombre, excepciones_f_ultimo_nombre):
+        for nombre in sorted(conjunto):
+            nombres += [nombre, f'{nombre} {DESCONOCIDO}', f'{DESCONOCIDO} {nombre}', f'zzq{nombre}']
+    return nombres
+
+def _corpus_diccionarios():
+    """Todas las entradas del diccionario, solas y seguidas o precedidas de un token desconocido."""
+    nombres = []
+    for nombre, _ in indice_diccionarios.items():
+        nombres += [nombre, f'{nombre} {DESCONOCIDO}', f'{DESCONOCIDO} {nombre}']
+    return nombres
+
+def _corpus_aleatorio(cantidad=5000, semilla=42):
+    """Combinaciones reproducibles de tokens del resto del corpus y partículas."""
+    generador = random.Random(semilla)
+    tokens = sorted({t for n in casos_limite + _corpus_terminaciones() + _corpus_excepciones() for t in n.split()})
+    tokens += ['de', 'del', 'la', 'los', 'las']
+    return [' '.join(generador.choice(tokens) for _ in range(generador.randint(1, 5))) for _ in range(cantidad)]
+
+def _diferencias(nombres):
+    generos, metodos = inferir_genero_lote(nombres)
+    diferencias = []
+    for nombre, genero, metodo in zip(nombres, generos, metodos):
+        esperado = inferir_genero_mejorado(nombre)
+        if (genero, metodo) != esperado:
+            diferencias.append((nombre, esperado, (genero, metodo)))
+    return diferencias
+
+@pytest.mark.parametrize('nombre', casos_limite)
+def test_casos_limite(nombre):
+    generos, metodos = inferir_genero_lote([nombre])
+    assert (generos[0], metodos[0]) == inferir_genero_mejorado(nombre)
+
+@pytest.mark.parametrize('corpus', [_corpus_terminaciones, _corpus_excepciones, _corpus_diccionarios, _corpus_aleatorio])
+def test_paridad_corpus(corpus):
+    assert _diferencias(corpus()) == []
+
+def test_corpus_cubre_todas_las_reglas_de_diccionario():
+    metodos = {inferir_genero_mejorado(n)[1] for n in casos_limite + _corpus_terminaciones() + _corpus_diccionarios()}
+    assert {'nombre_vacio', 'solo_particulas', 'dic_completo', 'dic_compuesto_prefijo', 'dic_primer_nombre',
+            'dic_ultimo_nombre', 'heuristica_terminacion_f', 'heuristica_terminacion_m',
+            'heuristica_terminacion_m_es_is_ez', 'heuristica_ultimonombre_f', 'heuristica_ultimonombre_m',
+            'sin_regla_clara'} <= metodos
+
+def test_valores_nulos_e_indice_no_contiguo():
+    serie = pd.Series(['maria', None, np.nan, 'juan', ''], index=[10, 3, 7, 1, 0], dtype=object)
+    generos, metodos = inferir_genero_lote(serie)
+    esperado = [inferir_genero_mejorado('maria'), inferir_genero_mejorado(''), inferir_genero_mejorado(''),
+                inferir_genero_mejorado('juan'), inferir_genero_mejorado('')]
+    assert list(zip(generos, metodos)) == esperado
+
+def test_lote_vacio():
+    generos, metodos = inferir_genero_lote([])
+    assert len(generos) == 0 and len(metodos) == 0
+
+def test_unicos_propaga_igual_que_fila_a_fila():
+    nombres = _corpus_aleatorio(2000, semilla=7) * 2
+    por_lote = inferir_genero_unicos(nombres)
+    fila_a_fila = inferir_genero_unicos(nombres, fila_a_fila=True)
+    assert list(por_lote[0]) == list(fila_a_fila[0])
+    assert list(por_lote[1]) == list(fila_a_fila[1])
+    assert list(zip(*por_lote)) == [inferir_genero_mejorado(n) for n in nombres]
+
+def test_normalizar_columna_y_lote_desde_nombres_originales():
+    originales = ['María José', 'JOSÉ  MARÍA', ' Juan de la Cruz ', "D'Angelo", 'Ñuñez', np.nan, 12, 'María del Carmen Ruiz']
+    normalizados = normalizar_columna(originales)
+    assert list(normalizados) == [normalizar_nombre(n) for n in originales]
+    assert _diferencias(list(normalizados)) == []
@@ -0,0 +1,87 @@
+"""
+Paridad de la normalización rápida (nombre a nombre, por listas y por columnas) con
+normalizar_nombre_original, en casos límite explícitos y un corpus aleatorio reproducible.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inferir_genero.lote import normalizar_columna
+from inferir_genero.normalizacion import normalizar_lista, normalizar_nombre_rapido
+from inferir_genero.nucleo import normalizar_nombre_original
+
+casos_limite = [
+    # Letras con diacríticos del español y otras lenguas latinas
+    'ñ', 'Ñ', 'ü', 'Ü', 'NUÑEZ', 'Güell', 'María José', 'JOSÉ MARÍA', 'Zoë', 'Çelik', 'İlker', 'ß', 'ẞ', 'Æsa', 'Œdipo',
+    'Øyvind', 'Łukasz', 'Đorđe', 'ı', 'ĳ', 'ﬁona', 'Ｊｏｓｅ', '½', 'ª', 'º', '™', '€',
+    # Apóstrofos, guiones y acentos sueltos
+    "o'neil", "D'Angelo", 'D’Angelo', 'd`arc', 'jean-luc', '´', '¨', '^', '~', 'á', 'ñ', '́',
+    # Espacios y blancos
+    '', ' ', '  ', '\t', '\n', '\xa0', ' ', '　', '​', '﻿', ' maria  del \t carmen ',
+    'maria\xa0jose', 'ana luz',
+    # Otros alfabetos y caracteres no representables
+    'ΣΟΦΙΑ', 'σοφιας', 'Дмитрий', '中文', 'ひらがな', '한국', '😀', '\ud800', '\x00', 'ana\x00luz',
+]
+no_cadenas = [None, float('nan'), np.nan, pd.NA, pd.NaT, 0, 12, -3, 3.5, 1e20, True, False, b'bytes', ('tupla',), ['lista']]
+
+_alfabeto = (
+    [chr(c) for c in range(32, 127)]
+    + list('\t\n\r\x0b\x0c\xa0 　​﻿')
+    + [chr(c) for c in range(0xC0, 0x250)]
+    + list("ñÑüÜçÇ'’`´¨^~ßẞæÆœŒøØłŁđĐıİĳﬁﬂ½²ºª€©®™")
+    + ['́', '̃', '̈', '̧', '̌'] # Marcas combinantes sueltas
+    + list('ΣσςΑαДдЖж中文ひらがな한국') + ['Ａ', 'ｚ', 'Ｚ', '０', '😀']
+)
+_tokens = ['maria', 'josé', 'MARÍA', 'NUÑEZ', 'müller', "o'neil", "D'Angelo", 'de los', 'del', 'jean-luc',
+           'Zoë', 'Çelik', 'İlker', 'ΣΟΦΙΑ', 'Ｊｏｓｅ', 'ﬁona', '  ', '\t', '']
+
+def corpus_aleatorio(cantidad=50_000, semilla=42):
+    """Cadenas sobre un alfabeto con casos límite y combinaciones de tokens con blancos variados."""
+    generador = random.Random(semilla)
+    casos = []
+    while len(casos) < cantidad:
+        if generador.random() < 0.5:
+            casos.append(''.join(generador.choice(_alfabeto) for _ in range(generador.randint(0, 24))))
+        else:
+            partes = [generador.choice(_tokens) for _ in range(generador.randint(1, 4))]
+            casos.append(generador.choice([' ', '  ', ' \t', '\xa0']).join(partes))
+    return casos
+
+@pytest.mark.parametrize('valor', casos_limite + no_cadenas, ids=repr)
+def test_nombre_a_nombre(valor):
+    assert normalizar_nombre_rapido(valor) == normalizar_nombre_original(valor)
+
+@pytest.mark.parametrize('valor', casos_limite + no_cadenas, ids=repr)
+def test_lista_de_un_valor(valor):
+    assert normalizar_lista([valor]) == [normalizar_nombre_original(valor)]
+
+def test_lista_y_columna_de_casos_limite():
+    valores = casos_limite + no_cadenas + casos_limite[::-1]
+    esperado = [normalizar_nombre_original(v) for v in valores]
+    assert normalizar_lista(valores) == esperado
+    assert list(normalizar_columna(valores)) == esperado
+
+def test_columna_conserva_el_indice():
+    serie = pd.Series(['María', None, 'José', np.nan, 'María'], index=[5, 9, 1, 0, 7], dtype=object)
+    resultado = normalizar_columna(serie)
+    assert list(resultado.index) == [5, 9, 1, 0, 7]
+    assert list(resultado) == ['maria', 'none', 'jose', 'nan', 'maria']
+
+def test_lista_vacia():
+    assert normalizar_lista([]) == []
+    assert normalizar_columna([]).empty
+
+@pytest.mark.parametrize('semilla', [1, 42])
+def test_corpus_aleatorio(semilla):
+    casos = corpus_aleatorio(semilla=semilla)
+    esperado = [normalizar_nombre_original(c) for c in casos]
+    assert [normalizar_nombre_rapido(c) for c in casos] == esperado
+    assert normalizar_lista(casos) == esperado
+    assert list(normalizar_columna(casos)) == esperado
+
+def test_lista_con_separador_interno():
+    # Un NUL dentro de un valor obliga a normalizar_lista a ir nombre a nombre
+    valores = ['ana\x00luz', 'María', '\x00']
+    assert normalizar_lista(valores) == [normalizar_nombre_original(v) for v in valores]
@@ -0,0 +1,38 @@
+"""
+Propiedades de la normalización rápida con hypothesis: para cualquier texto coincide con
+normalizar_nombre_original, y el resultado es estable y solo contiene [a-z ].
+"""
+import re
+
+import pytest
+
+hypothesis = pytest.importorskip('hypothesis')
+from hypothesis import given, settings, strategies as st
+
+from inferir_genero.lote import normalizar_columna
+from inferir_genero.normalizacion import normalizar_lista, normalizar_nombre_rapido
+from inferir_genero.nucleo import normalizar_nombre_original
+
+# Texto general más uno sesgado a letras latinas, blancos, apóstrofos y marcas combinantes
+_latino = st.text(st.sampled_from(list("abcxyzABCXYZñÑüÜáéíóúÁÉÍÓÚçÇ'’`´¨- \t\xa0 ́̃̈ßẞİıﬁĳ")), max_size=30)
+textos = st.one_of(st.text(max_size=30), _latino)
+valores = st.one_of(textos, st.none(), st.integers(), st.floats(allow_nan=True), st.booleans())
+
+@settings(max_examples=2000, deadline=None)
+@given(valores)
+def test_igual_que_la_original(valor):
+    assert normalizar_nombre_rapido(valor) == normalizar_nombre_original(valor)
+
+@settings(max_examples=500, deadline=None)
+@given(st.lists(valores, max_size=40))
+def test_lista_y_columna_igual_que_la_original(lista):
+    esperado = [normalizar_nombre_original(v) for v in lista]
+    assert normalizar_lista(lista) == esperado
+    assert list(normalizar_columna(lista)) == esperado
+
+@settings(max_examples=1000, deadline=None)
+@given(textos)
+def test_resultado_estable_y_en_alfabeto(texto):
+    normalizado = normalizar_nombre_rapido(texto)
+    assert re.fullmatch(r'(?:[a-z]+(?: [a-z]+)*)?', normalizado)
+    assert normalizar_nombre_rapido(normalizado) == normalizado
@@ -0,0 +1,32 @@
+"""
+El modo de instrumentación recorre la cascada real de reglas y deja nucleo como estaba.
+"""
+from inferir_genero import nucleo
+from inferir_genero.nucleo import inferir_genero_mejorado
+from inferir_genero.perfil import PerfilReglas
+
+nombres = ['', 'de la', 'maria', 'juan', 'maria del carmen rodriguez', 'jose maria perez',
+           'zzqx ana', 'zzqina', 'zzqor', 'zzqx zzqina', 'zzqe', 'maria', 'juan']
+
+def test_perfil_da_el_mismo_resultado_que_la_inferencia():
+    generos, metodos = PerfilReglas().inferir_unicos(nombres)
+    assert list(zip(generos, metodos)) == [inferir_genero_mejorado(n) for n in nombres]
+
+def test_perfil_restaura_nucleo_y_no_usa_sus_caches():
+    originales = {nombre: getattr(nucleo, nombre) for nombre in
+                  ('diccionario_masculino', 'diccionario_femenino', 'codigo_compuesto_mas_largo',
+                   '_evaluar_reglas', '_heuristica_primer_nombre', '_clasificar_ultimo_nombre')}
+    nucleo.limpiar_caches()
+    PerfilReglas().inferir_unicos(nombres)
+    assert all(getattr(nucleo, nombre) is funcion for nombre, funcion in originales.items())
+    assert nucleo._heuristica_primer_nombre.cache_info().currsize == 0
+    assert nucleo._clasificar_ultimo_nombre.cache_info().currsize == 0
+
+def test_perfil_cuenta_busquedas_y_reglas():
+    perfil = PerfilReglas()
+    perfil.inferir_unicos(['', 'juan', 'maria'])
+    df = perfil.como_dataframe()
+    evaluaciones = dict(zip(zip(df['metodo_asignacion'], df['GENERO']), df['evaluaciones_medias']))
+    # Vacío: ninguna búsqueda; 'juan'/'maria': nombre completo en el diccionario masculino y luego el femenino
+    assert evaluaciones == {('nombre_vacio', 'desconocido'): 0, ('dic_completo', 'masculino'): 1,
+                            ('dic_completo', 'femenino'): 2}
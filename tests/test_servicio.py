@@ -0,0 +1,50 @@
+"""
+Respuestas del servicio HTTP ante cuerpos válidos e inválidos.
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from inferir_genero.servicio import crear_servidor
+
+@pytest.fixture(scope='module')
+def url_servicio():
+    servidor = crear_servidor(puerto=0, vigilar_segundos=0)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f'http://127.0.0.1:{servidor.server_port}'
+    servidor.shutdown()
+    servidor.server_close()
+
+def _post(url, datos):
+    peticion = urllib.request.Request(url, data=datos, method='POST', headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(peticion, timeout=10) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_predict(url_servicio):
+    estado, cuerpo = _post(url_servicio + '/predict', json.dumps({'nombre': 'María José'}).encode('utf-8'))
+    assert estado == 200
+    assert (cuerpo['GENERO'], cuerpo['metodo_asignacion']) == ('femenino', 'dic_completo')
+
+def test_predict_many(url_servicio):
+    estado, cuerpo = _post(url_servicio + '/predict_many', json.dumps({'nombres': ['Juan', 'Ana']}).encode('utf-8'))
+    assert estado == 200
+    assert [r['GENERO'] for r in cuerpo['resultados']] == ['masculino', 'femenino']
+
+@pytest.mark.parametrize('ruta', ['/predict', '/predict_many'])
+@pytest.mark.parametrize('datos', [b'[1]', b'"x"', b'3', b'null', b'{}', b'{"nombre": 1, "nombres": "x"}'])
+def test_cuerpo_no_valido_responde_400(url_servicio, ruta, datos):
+    estado, cuerpo = _post(url_servicio + ruta, datos)
+    assert estado == 400
+    assert 'El cuerpo debe ser' in cuerpo['error']
+
+def test_json_invalido_responde_400(url_servicio):
+    estado, cuerpo = _post(url_servicio + '/predict', b'{no es json')
+    assert estado == 400
+    assert cuerpo['error'].startswith('JSON inválido')